@@ -1,12 +1,25 @@
 import os
+import csv
 import math
 import lzma
 import zlib
+import argparse
 import numpy as np
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
 import pandas as pd
 
-from ppm.main import main
+from entropy_analysis import text_entropy_spectrum
+from ppm.main import main_measure
+from ppm.processors.ppm_processor import PPMProcessor
+
+# Constants for the sweep
+REGIONS = ["nordeste", "norte", "sul", "sudeste"]
+COMPRESSORS = ["ppm", "lzma", "lz77"]
+PPM_K_MAX = 2
+# Column names used in the per-region CSV files
+COLUMN_NAMES = {"ppm": "PPM", "lzma": "LZMA", "lz77": "LZ77"}
 
 def load_text(filepath):
     """Load text from a file."""
@@ -14,12 +27,10 @@ def load_text(filepath):
         return file.read()
 
 def calculate_entropy(text):
-    """Calculate Shannon entropy of a text."""
-    counter = Counter(text)
-    length = len(text)
-    probabilities = [count / length for count in counter.values()]
-    entropy = -sum(p * math.log2(p) for p in probabilities)
-    return entropy
+    """Calculate Shannon (order-0) entropy of a text."""
+    if not text:
+        return 0
+    return text_entropy_spectrum(text, 0)["block_entropy"].iloc[0]
 
 def calculate_binary_entropy(data):
     """Calculate Shannon entropy of binary data."""
@@ -29,50 +40,66 @@ def calculate_binary_entropy(data):
     entropy = -sum(p * math.log2(p) for p in probabilities)
     return entropy
 
-def calculate_compressor_entropy(text, compression_func):
+def _compressed_sizes(chunks, compression_func):
+    """Compressed size in bytes of each chunk (one thread-pool task)."""
+    sizes = []
+    for chunk in chunks:
+        compressed = compression_func(chunk)
+        if isinstance(compressed, tuple):
+            # If compression_func returns (compressed_data, ratio)
+            compressed = compressed[0]
+        sizes.append(len(compressed))
+    return sizes
+
+def calculate_compressor_entropy(text, compression_func, workers=None):
     """
     Estimate the entropy of a compression algorithm by comparing
     original size to compressed size.
+
+    The chunks are memoryview slices of the UTF-8 bytes (no copies), passed
+    straight to the compressor, and compressed in a thread pool: lzma and
+    zlib release the GIL, so the whole text can be used instead of a sample.
     
     Args:
-        text: The input text
-        compression_func: Function that takes text and returns compressed data
+        text: The input text (str or UTF-8 bytes)
+        compression_func: Function that takes a bytes-like chunk and returns compressed data
+        workers: Number of threads (default: number of CPUs); 1 compresses serially
     
     Returns:
         Entropy estimate in bits per symbol
     """
-    text_bytes = text.encode('utf-8')
-    text_length = len(text_bytes)
+    text_bytes = text.encode('utf-8') if isinstance(text, str) else text
+    view = memoryview(text_bytes)
+    text_length = len(view)
     
     # Split text into chunks to analyze compression patterns
     # We'll use chunks of different sizes to get a better estimate
-    chunk_sizes = [100, 200, 500, 1000, 2000, 5000]
-    bits_per_symbol_values = []
-    
-    for chunk_size in chunk_sizes:
-        if chunk_size > text_length:
-            continue
-            
-        chunks = [text_bytes[i:i+chunk_size] for i in range(0, text_length, chunk_size) if i+chunk_size <= text_length]
-        
-        if not chunks:
-            continue
-            
-        compressed_sizes = []
-        for chunk in chunks:
-            compressed = compression_func(chunk.decode('utf-8', errors='ignore'))
-            if isinstance(compressed, tuple):
-                # If compression_func returns (compressed_data, ratio)
-                compressed = compressed[0]
-            compressed_sizes.append(len(compressed))
-        
-        # Calculate average compression ratio and convert to bits per symbol
-        avg_compressed_size = sum(compressed_sizes) / len(compressed_sizes)
-        avg_bits_per_symbol = (avg_compressed_size * 8) / chunk_size
-        bits_per_symbol_values.append(avg_bits_per_symbol)
-    
-    if not bits_per_symbol_values:
+    chunk_sizes = [size for size in [100, 200, 500, 1000, 2000, 5000] if size <= text_length]
+    if not chunk_sizes:
         return 0
+
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for chunk_size in chunk_sizes:
+        chunks = [view[i:i+chunk_size] for i in range(0, text_length - chunk_size + 1, chunk_size)]
+        # A few tasks per thread, each compressing a run of chunks
+        step = max(1, -(-len(chunks) // (4 * workers)))
+        tasks.extend((chunk_size, chunks[i:i+step]) for i in range(0, len(chunks), step))
+
+    if workers == 1:
+        results = [_compressed_sizes(chunks, compression_func) for _, chunks in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_compressed_sizes, (chunks for _, chunks in tasks),
+                                        [compression_func] * len(tasks)))
+
+    compressed_sizes = defaultdict(list)
+    for (chunk_size, _), sizes in zip(tasks, results):
+        compressed_sizes[chunk_size].extend(sizes)
+
+    # Calculate average compression ratio per chunk size and convert to bits per symbol
+    bits_per_symbol_values = [(sum(sizes) / len(sizes)) * 8 / chunk_size
+                              for chunk_size, sizes in compressed_sizes.items()]
         
     # Return average bits per symbol across different chunk sizes
     return sum(bits_per_symbol_values) / len(bits_per_symbol_values)
@@ -90,7 +117,7 @@ def calculate_avg_sequence_length(text, compression_func):
         Comprimento médio da sequência em bytes
     """
     # Vamos comprimir trechos de texto e analisar os padrões de repetição
-    text_bytes = text.encode('utf-8')
+    text_bytes = memoryview(text.encode('utf-8') if isinstance(text, str) else text)
     
     # Tamanhos variados para análise
     chunk_sizes = [1000, 2000, 5000]
@@ -104,7 +131,7 @@ def calculate_avg_sequence_length(text, compression_func):
         chunk = text_bytes[:chunk_size]
         
         # Comprime o trecho
-        compressed = compression_func(chunk.decode('utf-8', errors='ignore'))
+        compressed = compression_func(chunk)
         if isinstance(compressed, tuple):
             compressed = compressed[0]
             
@@ -144,14 +171,14 @@ def calculate_avg_length(text):
     return sum(len(word) for word in words) / len(words)
 
 def compress_lzma(text):
-    """Compress text using LZMA algorithm."""
-    text_bytes = text.encode('utf-8')
+    """Compress text (str, or bytes-like such as a memoryview slice) using LZMA algorithm."""
+    text_bytes = text.encode('utf-8') if isinstance(text, str) else text
     compressed = lzma.compress(text_bytes)
     return compressed, len(compressed) / len(text_bytes)
 
 def compress_zlib(text):
-    """Compress text using zlib (LZ77)."""
-    text_bytes = text.encode('utf-8')
+    """Compress text (str, or bytes-like such as a memoryview slice) using zlib (LZ77)."""
+    text_bytes = text.encode('utf-8') if isinstance(text, str) else text
     compressed = zlib.compress(text_bytes)
     return compressed, len(compressed) / len(text_bytes)
 
@@ -198,7 +225,7 @@ def run_compression_analysis(filepath, i):
     
     # Run PPM compression
     print("\nPPM compression:")
-    ppm_entropy, ppm_avg_seq_length = main(filepath)
+    ppm_entropy, ppm_avg_seq_length = main_measure(filepath)
     print(f"PPM entropy estimate: {ppm_entropy:.4f} bits per symbol")
     print(f"PPM avg sequence length: {ppm_avg_seq_length:.4f} bytes")
 
@@ -212,21 +239,21 @@ def run_compression_analysis(filepath, i):
     theoretical_min_size = (entropy * len(text)) / 8  # Convert bits to bytes
     print(f"Theoretical minimum size (based on entropy): {theoretical_min_size:.2f} bytes")
     
-    # Calculate entropy for each compressor
-    # We'll use a sample of the text for computational efficiency
-    sample_text = text[:20000]  # Use a 20K sample
+    # Calculate entropy for each compressor over the whole batch
+    # (encoded once; the chunks are views of the same bytes)
+    text_bytes = text.encode('utf-8')
     
     # LZMA entropy estimation
-    lzma_entropy = calculate_compressor_entropy(sample_text, compress_lzma)
-    lzma_avg_seq_length = calculate_avg_sequence_length(sample_text, compress_lzma)
+    lzma_entropy = calculate_compressor_entropy(text_bytes, compress_lzma)
+    lzma_avg_seq_length = calculate_avg_sequence_length(text_bytes, compress_lzma)
     
     # LZ77 entropy estimation  
-    lz77_entropy = calculate_compressor_entropy(sample_text, compress_zlib)
-    lz77_avg_seq_length = calculate_avg_sequence_length(sample_text, compress_zlib)
+    lz77_entropy = calculate_compressor_entropy(text_bytes, compress_zlib)
+    lz77_avg_seq_length = calculate_avg_sequence_length(text_bytes, compress_zlib)
     
     # LZMA Compression
     print("\nLZMA Compression:")
-    lzma_compressed, lzma_ratio = compress_lzma(text)
+    lzma_compressed, lzma_ratio = compress_lzma(text_bytes)
     print(f"Compressed size: {len(lzma_compressed)} bytes")
     print(f"Compression ratio: {lzma_ratio:.4f}")
     print(f"Space saving: {(1 - lzma_ratio) * 100:.2f}%")
@@ -235,7 +262,7 @@ def run_compression_analysis(filepath, i):
     
     # LZ77 (zlib) Compression
     print("\nLZ77 (zlib) Compression:")
-    zlib_compressed, zlib_ratio = compress_zlib(text)
+    zlib_compressed, zlib_ratio = compress_zlib(text_bytes)
     print(f"Compressed size: {len(zlib_compressed)} bytes")
     print(f"Compression ratio: {zlib_ratio:.4f}")
     print(f"Space saving: {(1 - zlib_ratio) * 100:.2f}%")
@@ -301,7 +328,7 @@ def run_compression_analysis(filepath, i):
     '''
 
     print("\nCompression Summary:")
-    print(f"Original size: {len(text.encode('utf-8'))} bytes")
+    print(f"Original size: {len(text_bytes)} bytes")
     print(f"Original entropy: {entropy:.4f} bits per symbol")
     print(f"PPM entropy estimate: {ppm_entropy:.4f} bits per symbol")
     print(f"PPM avg sequence length: {ppm_avg_seq_length:.4f} bytes")
@@ -334,110 +361,110 @@ def ensure_dir(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+def batch_files(region, split_type="train", db_root="db"):
+    """Return the batch files of a region split, ordered by batch number."""
+    split_path = Path(db_root) / region / "splits" / split_type
+    return sorted(split_path.glob(f"{split_type}_batch_*.txt"),
+                  key=lambda path: int(path.stem.rsplit("_", 1)[-1]))
+
+def run_compressor_task(task):
+    """
+    Run one (region, split, batch file, compressor) task of the sweep and
+    return its result row. Runs in a worker process.
+    """
+    region, split_type, filepath, compressor = task
+    text = load_text(filepath)
+
+    if compressor == "ppm":
+        processor = PPMProcessor(PPM_K_MAX)
+        measurement = processor.measure_text(processor.model.filter_text(text))
+        entropy, avg_length = measurement["entropy"], measurement["mean_code_length"]
+    else:
+        compression_func = compress_lzma if compressor == "lzma" else compress_zlib
+        # Whole batch, as in run_compression_analysis; the sweep already runs one
+        # task per process, so the chunks are compressed serially here
+        text_bytes = text.encode('utf-8')
+        entropy = calculate_compressor_entropy(text_bytes, compression_func, workers=1)
+        avg_length = calculate_avg_sequence_length(text_bytes, compression_func)
+
+    return {
+        "region": region,
+        "split": split_type,
+        "text": Path(filepath).name,
+        "compressor": compressor,
+        "entropy": entropy,
+        "avg_length": avg_length,
+    }
+
+def save_region_results(region, rows, results_dir="results"):
+    """Write the per-region CSV files (one per metric, mean and all_compressors)."""
+    ensure_dir(f"{results_dir}/{region}")
+    texts = sorted({row["text"] for row in rows}, key=lambda name: int(Path(name).stem.rsplit("_", 1)[-1]))
+    values = {(row["text"], row["compressor"]): row for row in rows}
+    compressors = [c for c in COMPRESSORS if any(row["compressor"] == c for row in rows)]
+
+    summary = {"Text": texts}
+    means = {"Text": [f"mean_{region}"]}
+    for compressor in compressors:
+        name = COLUMN_NAMES[compressor]
+        for metric, label in (("entropy", "Entropy"), ("avg_length", "Avg Length")):
+            column = [values[(text, compressor)][metric] if (text, compressor) in values else np.nan
+                      for text in texts]
+            df = pd.DataFrame({"Text": texts, f"{name} {label}": column})
+            df.to_csv(f"{results_dir}/{region}/{compressor}_{metric}.csv", index=False)
+            summary[f"{name} {label}"] = column
+            means[f"{name} {label}"] = [np.nanmean(column)]
+
+    pd.DataFrame(means).to_csv(f"{results_dir}/{region}/mean.csv", index=False)
+    pd.DataFrame(summary).to_csv(f"{results_dir}/{region}/all_compressors.csv", index=False)
+    print(f"Results saved to {results_dir}/{region}/")
+
+def run_parallel_sweep(regions=REGIONS, split_type="train", compressors=COMPRESSORS, workers=None,
+                       db_root="db", results_dir="results"):
+    """
+    Run the region x batch x compressor sweep over a process pool.
+
+    Batches are discovered from db/<region>/splits/<split>. Every finished
+    task is appended to results/sweep_<split>.csv right away, and the
+    per-region CSV files are written as soon as all tasks of a region finish.
+    """
+    tasks = [(region, split_type, str(filepath), compressor)
+             for compressor in compressors  # PPM tasks are the longest: submit them first
+             for region in regions
+             for filepath in batch_files(region, split_type, db_root)]
+    remaining = Counter(task[0] for task in tasks)
+    region_rows = defaultdict(list)
+    print(f"Running {len(tasks)} tasks on {workers or os.cpu_count()} workers")
+
+    ensure_dir(results_dir)
+    fieldnames = ["region", "split", "text", "compressor", "entropy", "avg_length"]
+    with open(f"{results_dir}/sweep_{split_type}.csv", "w", newline="") as sweep_file, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(sweep_file, fieldnames=fieldnames)
+        writer.writeheader()
+        futures = [executor.submit(run_compressor_task, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            writer.writerow(row)
+            sweep_file.flush()
+            print(f"[{done}/{len(tasks)}] {row['region']} {row['text']} {row['compressor']}: "
+                  f"{row['entropy']:.4f} bits/symbol")
+
+            region = row["region"]
+            region_rows[region].append(row)
+            remaining[region] -= 1
+            if not remaining[region]:
+                save_region_results(region, region_rows[region], results_dir)
+
+    return [row for region in regions for row in region_rows[region]]
+
 if __name__ == "__main__":
-    # Set the filepath to the text file
-    # Run the analysis
-    
-    for i in range(1, 5):
-        if i == 1:
-            regiao = "nordeste"
-        if i == 2:
-            regiao = "norte"
-        if i == 3:
-            regiao = "sul"
-        if i == 4:
-            regiao = "sudeste"
-        
-        print(f"Running analysis for {regiao} region")
-
-        # Make sure results directory exists
-        ensure_dir(f"results/{regiao}")
-
-        txts = []
-        ppm_entropy = []
-        ppm_avg_length = []
-        lzma_entropy = []
-        lzma_avg_length = []
-        lz77_entropy = []
-        lz77_avg_length = []
-
-        for i in range(1, 45):
-            filepath = "db/"+regiao+"/splits/train/train_batch_"+  str(i) + ".txt"
-            results = run_compression_analysis(filepath, i)
-            txts.append(f"train_batch_{i}.txt")
-            ppm_entropy.append(results["ppm_entropy"])
-            ppm_avg_length.append(results["ppm_avg_length"])
-            lzma_entropy.append(results["lzma_entropy"])
-            lzma_avg_length.append(results["lzma_avg_seq_length"])
-            lz77_entropy.append(results["lz77_entropy"])
-            lz77_avg_length.append(results["lz77_avg_seq_length"])
-        
-        # Save results to CSV files
-        df = pd.DataFrame({
-            "Text": txts,
-            "PPM Entropy": ppm_entropy,
-        })
-        df.to_csv(f"results/{regiao}/ppm_entropy.csv", index=False)
-        
-        df = pd.DataFrame({
-            "Text": txts,
-            "PPM Avg Length": ppm_avg_length,
-        })
-        df.to_csv(f"results/{regiao}/ppm_avg_length.csv", index=False)
-        
-        df = pd.DataFrame({
-            "Text": txts,
-            "LZMA Entropy": lzma_entropy,
-        })
-        df.to_csv(f"results/{regiao}/lzma_entropy.csv", index=False)
-        
-        df = pd.DataFrame({
-            "Text": txts,
-            "LZMA Avg Length": lzma_avg_length,
-        })
-        df.to_csv(f"results/{regiao}/lzma_avg_length.csv", index=False)
-        
-        df = pd.DataFrame({
-            "Text": txts,
-            "LZ77 Entropy": lz77_entropy,
-        })
-        df.to_csv(f"results/{regiao}/lz77_entropy.csv", index=False)
-        
-        df = pd.DataFrame({
-            "Text": txts,
-            "LZ77 Avg Length": lz77_avg_length,
-        })
-        df.to_csv(f"results/{regiao}/lz77_avg_length.csv", index=False)
-        
-        # Save CSV with averages for all three compression methods
-        ppm_entropy_mean = np.mean(ppm_entropy)
-        ppm_avg_length_mean = np.mean(ppm_avg_length)
-        lzma_entropy_mean = np.mean(lzma_entropy)
-        lzma_avg_length_mean = np.mean(lzma_avg_length)
-        lz77_entropy_mean = np.mean(lz77_entropy)
-        lz77_avg_length_mean = np.mean(lz77_avg_length)
-        
-        df = pd.DataFrame({
-            "Text": [f"mean_{regiao}"],
-            "PPM Entropy": [ppm_entropy_mean],
-            "PPM Avg Length": [ppm_avg_length_mean],
-            "LZMA Entropy": [lzma_entropy_mean],
-            "LZMA Avg Length": [lzma_avg_length_mean],
-            "LZ77 Entropy": [lz77_entropy_mean],
-            "LZ77 Avg Length": [lz77_avg_length_mean]
-        })
-        df.to_csv(f"results/{regiao}/mean.csv", index=False)
-        
-        # Save a comprehensive summary with all compression methods
-        df = pd.DataFrame({
-            "Text": txts,
-            "PPM Entropy": ppm_entropy,
-            "PPM Avg Length": ppm_avg_length,
-            "LZMA Entropy": lzma_entropy,
-            "LZMA Avg Length": lzma_avg_length,
-            "LZ77 Entropy": lz77_entropy,
-            "LZ77 Avg Length": lz77_avg_length
-        })
-        df.to_csv(f"results/{regiao}/all_compressors.csv", index=False)
-        
-        print(f"Results saved to results/{regiao}/")
+    parser = argparse.ArgumentParser(description="Region x batch compression sweep")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: number of CPUs)")
+    parser.add_argument("--split", default="train", choices=["train", "valid", "test"])
+    parser.add_argument("--regions", nargs="+", default=REGIONS)
+    parser.add_argument("--compressors", nargs="+", default=COMPRESSORS, choices=COMPRESSORS)
+    args = parser.parse_args()
+
+    run_parallel_sweep(args.regions, args.split, args.compressors, args.workers)
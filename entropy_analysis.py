@@ -1 +1,172 @@
-q
\ No newline at end of file
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Constants for the analysis
+REGIONS = ["nordeste", "norte", "sul", "sudeste"]
+RESULTS_DIR = "results/entropy_spectrum"
+# Above this many (context, symbol) codes the counts are taken with np.unique instead of np.bincount
+BINCOUNT_LIMIT = 1 << 24
+
+def load_text(filepath):
+    """Load text from a file."""
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def batch_files(region, split_type, batch_limit=None, db_root="db"):
+    """Return the batch files of a region split, ordered by batch number."""
+    split_path = Path(db_root) / region / "splits" / split_type
+    files = sorted(split_path.glob(f"{split_type}_batch_*.txt"),
+                   key=lambda path: int(path.stem.rsplit("_", 1)[-1]))
+    return files[:batch_limit] if batch_limit else files
+
+def text_to_ids(texts, alphabet=None):
+    """
+    Map one text (or a list of texts) to dense symbol ids in a single array.
+
+    Returns (ids, doc_ends, alphabet): ids is uint8 (uint16 for alphabets with
+    more than 256 symbols), doc_ends holds the end offset of each text in ids
+    so that n-grams never span two texts, and alphabet is the sorted array of
+    code points. With an explicit alphabet, characters outside it are dropped.
+    """
+    if isinstance(texts, str):
+        texts = [texts]
+    codepoints = [np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32) for text in texts]
+    if alphabet is None:
+        alphabet = np.unique(np.concatenate(codepoints)) if codepoints else np.zeros(0, dtype=np.uint32)
+    else:
+        alphabet = np.unique(np.frombuffer(''.join(alphabet).encode('utf-32-le'), dtype=np.uint32))
+        codepoints = [points[np.isin(points, alphabet)] for points in codepoints]
+
+    dtype = np.uint8 if len(alphabet) <= 256 else np.uint16
+    ids = np.searchsorted(alphabet, np.concatenate(codepoints)).astype(dtype) if codepoints else np.zeros(0, dtype)
+    doc_ends = np.cumsum([len(points) for points in codepoints], dtype=np.int64)
+    return ids, doc_ends, alphabet
+
+def _count_codes(codes, valid, n_codes):
+    """
+    Count the valid codes. Returns (present codes, counts, dense rank of every
+    code), with the ranks used as the prefix of the next order.
+    """
+    if n_codes <= BINCOUNT_LIMIT:
+        counts = np.bincount(codes[valid], minlength=n_codes)
+        present = np.flatnonzero(np.bincount(codes, minlength=n_codes))
+        lookup = np.zeros(n_codes, dtype=np.int64)
+        lookup[present] = np.arange(len(present))
+        return present, counts[present], lookup[codes]
+    present, ranks = np.unique(codes, return_inverse=True)
+    counts = np.bincount(ranks[valid], minlength=len(present))
+    return present, counts, ranks
+
+def entropy_spectrum(ids, k_max, doc_ends=None, n_symbols=None):
+    """
+    Block and conditional entropies of a symbol id sequence for k = 0..k_max.
+
+    The (k+1)-grams are identified by rolling integer codes: the dense rank of
+    the k-gram starting at each position times n_symbols plus the next symbol,
+    re-ranked after every order so codes never overflow. Returns a DataFrame
+    with, per order k:
+      - block_entropy: H(X_1..X_{k+1}) in bits
+      - conditional_entropy: H(X_{k+1} | X_1..X_k) in bits per symbol
+      - entropy_rate: block_entropy / (k + 1)
+      - distinct_ngrams / ngrams: number of distinct and total (k+1)-grams
+    N-grams that would cross a boundary in doc_ends are not counted.
+    """
+    ids = np.asarray(ids)
+    n = len(ids)
+    if doc_ends is None:
+        doc_ends = np.array([n], dtype=np.int64)
+    if n_symbols is None:
+        n_symbols = int(ids.max()) + 1 if n else 1
+    # End of the text each position belongs to
+    doc_end = np.repeat(doc_ends, np.diff(np.concatenate(([0], doc_ends))))
+    positions = np.arange(n)
+
+    rows = []
+    ranks, n_ranks = None, 1
+    for k in range(k_max + 1):
+        m = n - k  # Number of (k+1)-grams, including those that cross a boundary
+        if m <= 0:
+            break
+        if k == 0:
+            codes = ids.astype(np.int64)
+        else:
+            codes = ranks[:m] * n_symbols + ids[k:]
+        valid = positions[:m] + k + 1 <= doc_end[:m]
+        present, counts, ranks = _count_codes(codes, valid, n_ranks * n_symbols)
+        n_ranks = len(present)
+
+        seen = counts > 0
+        total = counts.sum()
+        if not total:
+            break
+        counts_seen = counts[seen]
+        p = counts_seen / total
+        block_entropy = float(-np.sum(p * np.log2(p)))
+        if k == 0:
+            conditional_entropy = block_entropy
+        else:
+            # Context (k-gram) counts aggregated over the same positions
+            prefixes = present // n_symbols
+            context_counts = np.bincount(prefixes, weights=counts)
+            conditional_entropy = float(np.sum(counts_seen * np.log2(context_counts[prefixes[seen]] / counts_seen))
+                                        / total)
+
+        rows.append({
+            "k": k,
+            "block_entropy": block_entropy,
+            "conditional_entropy": conditional_entropy,
+            "entropy_rate": block_entropy / (k + 1),
+            "distinct_ngrams": int(seen.sum()),
+            "ngrams": int(total),
+        })
+
+    return pd.DataFrame(rows)
+
+def text_entropy_spectrum(texts, k_max, alphabet=None):
+    """Entropy spectrum of one text or of a list of texts counted together."""
+    ids, doc_ends, alphabet = text_to_ids(texts, alphabet)
+    return entropy_spectrum(ids, k_max, doc_ends, len(alphabet))
+
+def region_entropy_spectrum(region, k_max, split_type="train", batch_limit=None, db_root="db"):
+    """
+    Entropy spectra of a region split: one curve over the whole split (all
+    batches in a single call) and one per batch, all over the split alphabet.
+    Returns (region_spectrum, batch_spectra).
+    """
+    files = batch_files(region, split_type, batch_limit, db_root)
+    texts = [load_text(filepath) for filepath in files]
+    ids, doc_ends, alphabet = text_to_ids(texts)
+    region_spectrum = entropy_spectrum(ids, k_max, doc_ends, len(alphabet))
+    region_spectrum.insert(0, "region", region)
+
+    batch_spectra = []
+    start = 0
+    for filepath, end in zip(files, doc_ends):
+        spectrum = entropy_spectrum(ids[start:end], k_max, n_symbols=len(alphabet))
+        spectrum.insert(0, "text", filepath.name)
+        spectrum.insert(0, "region", region)
+        batch_spectra.append(spectrum)
+        start = end
+    return region_spectrum, pd.concat(batch_spectra, ignore_index=True)
+
+def ensure_dir(directory):
+    """Make sure a directory exists, creating it if necessary"""
+    os.makedirs(directory, exist_ok=True)
+
+if __name__ == "__main__":
+    K_MAX = 8
+    SPLIT = "train"
+
+    ensure_dir(RESULTS_DIR)
+    region_spectra = []
+    for region in REGIONS:
+        region_spectrum, batch_spectra = region_entropy_spectrum(region, K_MAX, SPLIT)
+        batch_spectra.to_csv(f"{RESULTS_DIR}/{region}_{SPLIT}_batches.csv", index=False)
+        region_spectra.append(region_spectrum)
+        print(f"\n{region} ({SPLIT}):")
+        print(region_spectrum.to_string(index=False))
+
+    pd.concat(region_spectra, ignore_index=True).to_csv(f"{RESULTS_DIR}/regions_{SPLIT}.csv", index=False)
+    print(f"\nResults saved to {RESULTS_DIR}/")
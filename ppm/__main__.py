@@ -0,0 +1,203 @@
+"""
+Linha de comando do PPM: `python -m ppm <comando> [arquivos...]`.
+
+Sem arquivos (ou com "-"), lê da entrada padrão e escreve na saída padrão,
+em blocos, para uso em pipelines. Com vários arquivos, um único processo
+atende todos (os modelos são carregados uma vez):
+
+    cat lote.txt | python -m ppm compress -k 3 > lote.ppm
+    python -m ppm decompress < lote.ppm > lote.txt
+    python -m ppm compress -k 3 --workers 4 --drop-unknown -o comprimidos db/*/splits/test/*.txt
+    python -m ppm score --model nordeste.snap --model sul.snap db/sul/splits/test/*.txt
+    python -m ppm bench -k 2 --block-size 16384,65536 texto.txt
+
+A compressão recusa caracteres fora do alfabeto do modelo; com
+--drop-unknown eles são descartados (e contados na saída de erro), e a
+descompressão devolve o texto filtrado.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import argparse
+import io
+import os
+import sys
+
+# Garante que os módulos possam ser encontrados diretamente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ppm.processors.ppm_blocks import benchmark_blocks
+from ppm.processors.ppm_file import compress_files, compress_stream, decompress_files, decompress_stream
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.utils.file_format import CHUNK_SIZE
+from ppm.utils.file_handler import FileHandler
+
+STDIN = "-"
+
+
+def _stdin_text() -> io.TextIOWrapper:
+    return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+
+
+def _read_text(filename: str) -> str:
+    """Lê um arquivo de texto, ou a entrada padrão com "-"."""
+    if filename == STDIN:
+        return _stdin_text().read()
+    return FileHandler.read_file(filename)
+
+
+def _sizes(value: str) -> List[int]:
+    """Lista de tamanhos separados por vírgula ("16384,65536")."""
+    try:
+        sizes = [int(size) for size in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanhos inválidos: {value!r}")
+    if any(size <= 0 for size in sizes):
+        raise argparse.ArgumentTypeError(f"tamanhos devem ser positivos: {value!r}")
+    return sizes
+
+
+def _print_rows(columns: List[str], rows: List[Dict[str, Any]]) -> None:
+    """Escreve as linhas em TSV, com cabeçalho, na saída padrão."""
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join(f"{row[column]:.6f}" if isinstance(row[column], float) else str(row[column])
+                        for column in columns))
+
+
+def _measure_file(task) -> Dict[str, Any]:
+    filename, k_max, coder = task
+    processor = PPMProcessor(k_max, coder=coder)
+    measurement = processor.measure_text(processor.model.filter_text(_read_text(filename)))
+    return {"file": filename, "k": k_max, "chars": measurement["chars"],
+            "mean_code_length": measurement["mean_code_length"], "entropy": measurement["entropy"]}
+
+
+def _report_dropped(filename: str, dropped: int) -> None:
+    if dropped:
+        print(f"{filename}: {dropped} caracteres fora do alfabeto descartados (não voltam na descompressão)",
+              file=sys.stderr)
+
+
+def command_compress(args: argparse.Namespace) -> None:
+    if args.files == [STDIN]:
+        _, dropped = compress_stream(_stdin_text(), sys.stdout.buffer, args.k, args.coder, args.chunk_size,
+                                     args.drop_unknown)
+        sys.stdout.buffer.flush()
+        _report_dropped(STDIN, dropped)
+        return
+    results = compress_files(args.files, args.output, args.k, args.coder, args.workers, args.drop_unknown)
+    for filename, (output, dropped) in zip(args.files, results):
+        print(output, file=sys.stderr)
+        _report_dropped(filename, dropped)
+
+
+def command_decompress(args: argparse.Namespace) -> None:
+    if args.files == [STDIN]:
+        output = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', write_through=True)
+        decompress_stream(sys.stdin.buffer, output, args.chunk_size)
+        output.flush()
+        return
+    for output in decompress_files(args.files, args.output, args.workers):
+        print(output, file=sys.stderr)
+
+
+def command_score(args: argparse.Namespace) -> None:
+    if not args.model:
+        # Sem modelo: comprimento médio do PPM adaptativo (modo de medição)
+        tasks = [(filename, args.k, args.coder) for filename in args.files]
+        if args.workers == 1 or len(tasks) <= 1:
+            rows = [_measure_file(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                rows = list(executor.map(_measure_file, tasks))
+        _print_rows(["file", "k", "chars", "mean_code_length", "entropy"], rows)
+        return
+
+    # Modelos congelados: carregados uma vez e avaliados juntos em cada arquivo
+    from ppm.processors.ppm_scorer import MultiPPMScorer
+    names = args.name or [os.path.splitext(os.path.basename(model))[0] for model in args.model]
+    if len(names) != len(args.model):
+        raise SystemExit("--name deve ser repetido uma vez por --model")
+    scorer = MultiPPMScorer(args.model, names)
+    columns = ["file", "chars"] + names + ["best"]
+    print("\t".join(columns))
+    for filename in args.files:
+        ids = scorer.text_ids(_read_text(filename))
+        bits = scorer.score_ids(ids) / len(ids) if len(ids) else [0.0] * len(names)
+        best = names[min(range(len(names)), key=lambda index: bits[index])]
+        print("\t".join([filename, str(len(ids))] + [f"{value:.6f}" for value in bits] + [best]))
+
+
+def command_bench(args: argparse.Namespace) -> None:
+    workers_list = (1,) if args.workers == 1 else (1, args.workers)
+    rows = []
+    for filename in args.files:
+        text = PPMProcessor(args.k).model.filter_text(_read_text(filename))
+        results = benchmark_blocks(text, args.block_size, workers_list, args.k, args.coder, args.primer)
+        rows.extend(dict(result, file=filename) for result in results)
+    _print_rows(["file", "block_size", "workers", "blocks", "bytes", "bits_per_char", "encode_time",
+                 "decode_time", "ok"], rows)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ppm",
+                                     description="Compressão e avaliação de textos com PPM")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name: str, function, help: str, model_options: bool = True) -> argparse.ArgumentParser:
+        command = subparsers.add_parser(name, help=help)
+        command.set_defaults(function=function)
+        command.add_argument("files", nargs="*", default=[STDIN],
+                             help='arquivos de entrada (padrão: "-", a entrada padrão)')
+        if model_options:
+            command.add_argument("-k", "--order", dest="k", type=int, default=2, help="ordem máxima k_max")
+            command.add_argument("--coder", choices=("huffman", "range"), default="huffman",
+                                 help="codificador de entropia")
+        command.add_argument("--workers", type=int, default=None,
+                             help="processos para vários arquivos (padrão: número de CPUs; 1 = sem pool)")
+        return command
+
+    compress = add_command("compress", command_compress, "comprime arquivos ou a entrada padrão")
+    decompress = add_command("decompress", command_decompress, "descomprime arquivos ou a entrada padrão",
+                             model_options=False)
+    for command in (compress, decompress):
+        command.add_argument("-o", "--output", default=None,
+                             help="diretório de saída (padrão: ao lado de cada arquivo)")
+        command.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                             help="caracteres (ou bytes) lidos por vez da entrada padrão")
+
+    compress.add_argument("--drop-unknown", action="store_true",
+                          help="descarta (em vez de recusar) caracteres fora do alfabeto; a compressão "
+                               "deixa de ser sem perdas")
+
+    score = add_command("score", command_score, "bits por caractere de cada arquivo")
+    score.add_argument("--model", action="append", default=[],
+                       help="snapshot de um modelo congelado (repetível); sem modelo, mede o PPM adaptativo")
+    score.add_argument("--name", action="append", default=None, help="nome de cada --model, na mesma ordem")
+
+    bench = add_command("bench", command_bench, "tempos e taxa do modo em blocos")
+    bench.add_argument("--block-size", type=_sizes, default=[1 << 14, 1 << 16, 1 << 18],
+                       help="tamanhos de bloco comparados, separados por vírgula (ex.: 16384,65536)")
+    bench.add_argument("--primer", default=None, help="snapshot usado como primer dos blocos")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command in ("compress", "decompress"):
+        if STDIN in args.files and len(args.files) > 1:
+            raise SystemExit('"-" (entrada padrão) não pode ser combinado com outros arquivos')
+        if args.files == [STDIN] and args.output is not None:
+            raise SystemExit("-o vale só para arquivos; a entrada padrão vai para a saída padrão")
+    elif args.files.count(STDIN) > 1:
+        raise SystemExit('"-" (entrada padrão) só pode aparecer uma vez')
+    try:
+        args.function(args)
+    except (ValueError, OSError) as error:
+        # Arquivo inválido ou inacessível: uma linha de erro, sem traceback
+        print(f"ppm {args.command}: {error}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
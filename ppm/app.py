@@ -1,4 +1,4 @@
-from typing import List, Any
+from typing import Any, List, Optional
 import json
 import os
 import sys
@@ -10,22 +10,80 @@ sys.path.append(os.path.dirname(current_dir))
 
 from ppm.utils.file_handler import FileHandler
 from ppm.processors.ppm_processor import PPMProcessor
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_blocks import decode_blocks, encode_blocks
+from ppm.models.snapshot import save_snapshot
+from ppm.utils.frames import FRAME_HEADER, iter_chunks
 
 class PPMApp:
     """Aplicação principal que usa o modelo PPM."""
     
-    def __init__(self, k_max: int = 2):
+    def __init__(self, k_max: int = 2, coder: str = "huffman"):
         self.k_max = k_max
         self.file_handler = FileHandler()
-        self.processor = PPMProcessor(k_max)
+        self.processor = PPMProcessor(k_max, coder=coder)
         self.text=""
     
     def run(self, filename: str) -> List[Any]:
-        """Executa o processamento completo em um arquivo."""
-        self.text = self.file_handler.read_file(filename)
+        """
+        Executa o processamento completo em um arquivo.
+
+        Caracteres fora do alfabeto do modelo (por exemplo, dígitos que
+        sobraram na limpeza do corpus) são descartados antes da codificação,
+        pois não têm código e impediriam a decodificação.
+        """
+        self.text = self.processor.model.filter_text(self.file_handler.read_file(filename))
         text = self.text
         return self.processor.process_text(text) 
 
+    def compress_file(self, filename: str, output_filename: str, chunk_size: int = 1 << 16) -> int:
+        """
+        Comprime um arquivo em blocos, sem carregá-lo inteiro na memória, e
+        grava os quadros em `output_filename`. Como em run, caracteres fora do
+        alfabeto do modelo são descartados. Retorna o número de caracteres codificados.
+        """
+        filter_text = self.processor.model.filter_text
+        n_chars = 0
+        with open(filename, 'r', encoding='utf-8') as source, open(output_filename, 'wb') as output:
+            chunks = (filter_text(chunk) for chunk in iter_chunks(source, chunk_size))
+            for frame in self.processor.encode_stream(chunks):
+                n_chars += FRAME_HEADER.unpack_from(frame)[0]
+                output.write(frame)
+        return n_chars
+
+    def decompress_file(self, filename: str, output_filename: str) -> int:
+        """Descomprime um arquivo gerado por compress_file. Retorna o número de caracteres."""
+        decoder = PPMDecoder(self.k_max, coder=self.processor.model.coder.name)
+        n_chars = 0
+        with open(filename, 'rb') as source, open(output_filename, 'w', encoding='utf-8') as output:
+            for text in decoder.decode_stream(source):
+                n_chars += len(text)
+                output.write(text)
+        return n_chars
+
+    def compress_file_blocks(self, filename: str, output_filename: str, block_size: int = 1 << 16,
+                             primer: Optional[str] = None, workers: Optional[int] = None) -> int:
+        """
+        Comprime um arquivo em blocos independentes, codificados em paralelo
+        (ver ppm.processors.ppm_blocks), opcionalmente a partir de um snapshot
+        de primer. Retorna o número de caracteres codificados.
+        """
+        self.text = self.processor.model.filter_text(self.file_handler.read_file(filename))
+        data = encode_blocks(self.text, self.k_max, self.processor.model.coder.name, block_size,
+                             primer, workers)
+        with open(output_filename, 'wb') as output:
+            output.write(data)
+        return len(self.text)
+
+    def decompress_file_blocks(self, filename: str, output_filename: str, primer: Optional[str] = None,
+                               workers: Optional[int] = None) -> int:
+        """Descomprime um arquivo gerado por compress_file_blocks. Retorna o número de caracteres."""
+        with open(filename, 'rb') as source:
+            text = decode_blocks(source.read(), primer, workers)
+        with open(output_filename, 'w', encoding='utf-8') as output:
+            output.write(text)
+        return len(text)
+
     def get_model_structure_json(self, indent: int = 4) -> str:
         """
         Converte a estrutura do modelo PPM em uma string JSON formatada.
@@ -37,15 +95,16 @@ class PPMApp:
             String contendo a representação JSON da estrutura do modelo
         """
         # Obter a estrutura do modelo
-        structure = self.processor.model.structure
+        model = self.processor.model
+        structure = model.structure
         
         # Converter a estrutura para um formato serializável para JSON
         json_structure = {}
         for k, contexts in structure.items():
             json_structure[str(k)] = {}
             for context_key, context_obj in contexts.items():
-                # Converter o objeto Context em um dicionário simples
-                json_structure[str(k)][context_key] = dict(context_obj.char_counts)
+                # Converter o objeto Context em um dicionário simples (chave como string do contexto)
+                json_structure[str(k)][model.key_string(k, context_key)] = dict(context_obj.char_counts)
         
         # Converter para string JSON formatada
         return json.dumps(json_structure, indent=indent, ensure_ascii=False)
@@ -58,4 +117,11 @@ class PPMApp:
             filename: Nome do arquivo para salvar o JSON
         """
         json_data = self.get_model_structure_json()
-        self.file_handler.write_file(filename, json_data)
\ No newline at end of file
+        self.file_handler.write_file(filename, json_data)
+
+    def save_model_snapshot(self, filename: str) -> None:
+        """
+        Salva o modelo em um snapshot binário compacto (ver ppm.models.snapshot),
+        que pode ser reaberto com ModelSnapshot.load sem cópia.
+        """
+        save_snapshot(self.processor.model, filename)
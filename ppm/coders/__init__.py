@@ -0,0 +1,2 @@
+# Torna o diretório coders um pacote
+# Deixando vazio para evitar ciclos de importação
\ No newline at end of file
@@ -0,0 +1,64 @@
+from typing import Any, Union
+
+
+class EntropyCoder:
+    """
+    Interface dos codificadores de entropia usados pelo modelo PPM.
+
+    O modelo decide em qual contexto cada símbolo (ou escape) é codificado e
+    entrega ao codificador o id do símbolo e a máscara de candidatos daquele
+    contexto, já sem os símbolos excluídos; as frequências são lidas de
+    `context.counts`. Símbolos determinísticos (um único candidato) não
+    chegam ao codificador.
+    """
+
+    name = ""
+    stats = None  # Contadores opcionais (ver ppm.utils.stats.PPMStats)
+
+    def start_encoding(self) -> None:
+        """Prepara o codificador para uma nova sequência."""
+        raise NotImplementedError
+
+    def forget_contexts(self) -> None:
+        """Descarta o que o codificador guarda por contexto (o modelo descartou ou substituiu contextos)."""
+
+    def encode(self, context, symbol: int, candidates: int) -> Any:
+        """Codifica `symbol` entre os `candidates` do contexto e retorna o tamanho do código emitido (se conhecido)."""
+        raise NotImplementedError
+
+    def code_length(self, context, symbol: int, candidates: int) -> float:
+        """Tamanho em bits que encode emitiria para `symbol`, sem escrever nada (modo de medição)."""
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        """Finaliza a codificação e retorna os bytes produzidos."""
+        raise NotImplementedError
+
+    def bit_length(self) -> int:
+        """Quantidade de bits significativos produzidos (sem o preenchimento do último byte)."""
+        raise NotImplementedError
+
+    def start_decoding(self, data: bytes, padding_bits: int = 0) -> None:
+        """Prepara o codificador para decodificar `data`, ignorando `padding_bits` bits finais."""
+        raise NotImplementedError
+
+    def decode(self, context, candidates: int) -> int:
+        """Decodifica o id do próximo símbolo entre os `candidates` do contexto."""
+        raise NotImplementedError
+
+    def has_data(self) -> bool:
+        """Indica se ainda há dados a decodificar."""
+        raise NotImplementedError
+
+
+def get_coder(coder: Union[str, EntropyCoder] = "huffman") -> EntropyCoder:
+    """Retorna uma instância de codificador a partir do nome ('huffman' ou 'range')."""
+    if isinstance(coder, EntropyCoder):
+        return coder
+    if coder == "huffman":
+        from ppm.coders.huffman_coder import HuffmanCoder
+        return HuffmanCoder()
+    if coder == "range":
+        from ppm.coders.range_coder import RangeCoder
+        return RangeCoder()
+    raise ValueError(f"Codificador desconhecido: {coder}")
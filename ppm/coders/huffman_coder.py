@@ -0,0 +1,142 @@
+from time import perf_counter
+from typing import Any, Callable, Dict, Union
+
+from ppm.coders.base import EntropyCoder
+from ppm.models.context import iter_symbols
+from ppm.utils.bitstream import BitReader, BitWriter
+from ppm.utils.canonical_huffman import CanonicalCodebook, huffman_code_lengths
+from ppm.utils.codebook_cache import CodebookCache
+
+
+class StringBitReader:
+    """Leitura de bits de uma string de '0'/'1' com peek/skip (formato antigo)."""
+
+    def __init__(self, data: str):
+        self.data = data
+        self.cursor = 0
+
+    def peek(self, n: int) -> int:
+        """Retorna os próximos n bits como inteiro, completando com zeros no fim."""
+        if not n:
+            return 0
+        return int(self.data[self.cursor:self.cursor + n].ljust(n, '0'), 2)
+
+    def skip(self, n: int) -> None:
+        if self.cursor + n > len(self.data):
+            raise ValueError("Fim inesperado da sequência codificada")
+        self.cursor += n
+
+    def remaining(self) -> int:
+        return len(self.data) - self.cursor
+
+
+class HuffmanCoder(EntropyCoder):
+    """
+    Codificador de Huffman por contexto (caminho original do projeto).
+
+    A cada símbolo um código canônico é construído com as frequências do
+    contexto (os comprimentos são os da árvore original, com o mesmo
+    desempate) e escrito em um BitWriter. No contexto k=-1 usa
+    códigos equiprováveis. A decodificação consulta a tabela do código
+    canônico em vez de crescer o código bit a bit.
+
+    Os códigos ficam em um cache LRU de `cache_size` entradas, indexado pela
+    ordem, chave e versão do contexto e pela máscara de candidatos (e, como
+    segunda chave, pelas próprias frequências); com `cache_size=0` toda árvore
+    é reconstruída. As chaves não guardam referências aos contextos, e o cache
+    é esvaziado quando o modelo descarta ou substitui contextos (ver
+    forget_contexts), pois um contexto recriado recomeça da versão 0.
+    """
+
+    name = "huffman"
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache = CodebookCache(cache_size)
+        self.start_encoding()
+
+    def codebook(self, context, candidates: int) -> CanonicalCodebook:
+        """Retorna o código canônico para os candidatos do contexto."""
+        # A máscara de candidatos identifica a exclusão para uma mesma versão do contexto
+        key = (context.order, context.key, context.version, candidates)
+
+        def build():
+            if context.order == -1:
+                return CanonicalCodebook.equiprovable(iter_symbols(candidates))
+            counts = context.counts
+            return CanonicalCodebook.from_frequencies(
+                {symbol: counts[symbol] for symbol in iter_symbols(candidates)})
+
+        if self.stats is not None:
+            build = self.counted_build(build, candidates)
+        # No modelo adaptativo todo contexto visitado é atualizado logo após o
+        # uso; a chave compartilhada (candidatos e vetor de contagens) reaproveita
+        # árvores de contagens idênticas
+        return self.cache.get_or_build(
+            key, build, lambda: (context.order == -1, candidates, context.counts.tobytes()))
+
+    def lengths(self, context, candidates: int) -> Dict[int, int]:
+        """
+        Retorna apenas os comprimentos dos códigos dos candidatos (modo de
+        medição), sem montar o código canônico. Usa o mesmo cache dos códigos,
+        com chaves próprias.
+        """
+        key = (context.order, context.key, context.version, candidates, "lengths")
+
+        def build():
+            if context.order == -1:
+                return CanonicalCodebook.equiprovable(iter_symbols(candidates)).lengths
+            counts = context.counts
+            return huffman_code_lengths({symbol: counts[symbol] for symbol in iter_symbols(candidates)})
+
+        if self.stats is not None:
+            build = self.counted_build(build, candidates)
+        return self.cache.get_or_build(
+            key, build, lambda: (context.order == -1, candidates, context.counts.tobytes(), "lengths"))
+
+    def counted_build(self, build: Callable[[], Any], candidates: int) -> Callable[[], Any]:
+        """Envolve a construção de um código para registrá-la em `stats` (tamanho e tempo)."""
+        stats = self.stats
+
+        def counted():
+            start = perf_counter() if stats.timers else None
+            codebook = build()
+            stats.record_build(bin(candidates).count("1"), start)
+            return codebook
+
+        return counted
+
+    def forget_contexts(self) -> None:
+        self.cache.clear()
+
+    def start_encoding(self) -> None:
+        self.writer = BitWriter()
+
+    def encode(self, context, symbol: int, candidates: int) -> int:
+        code, length = self.codebook(context, candidates).codes[symbol]
+        self.writer.write(code, length)
+        return length
+
+    def code_length(self, context, symbol: int, candidates: int) -> int:
+        rest = candidates & (candidates - 1)
+        if not rest & (rest - 1):
+            # Dois candidatos: um bit para cada, sem consultar o cache
+            return 1
+        return self.lengths(context, candidates)[symbol]
+
+    def finish(self) -> bytes:
+        return self.writer.getvalue()
+
+    def bit_length(self) -> int:
+        return self.writer.bit_length
+
+    def start_decoding(self, data: Union[bytes, str], padding_bits: int = 0) -> None:
+        if isinstance(data, str):
+            self.reader = StringBitReader(data)
+        else:
+            self.reader = BitReader(data, len(data) * 8 - padding_bits)
+
+    def decode(self, context, candidates: int) -> int:
+        return self.codebook(context, candidates).decode(self.reader)
+
+    def has_data(self) -> bool:
+        return self.reader.remaining() > 0
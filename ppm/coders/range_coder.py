@@ -0,0 +1,177 @@
+import math
+from typing import List, Tuple
+
+from ppm.coders.base import EntropyCoder
+from ppm.models.context import iter_symbols
+
+TOP = 1 << 24  # Limite de renormalização do intervalo
+MASK = 0xFFFFFFFF
+MAX_TOTAL = 1 << 16  # Maior frequência total aceita sem reescala
+
+
+def scale_frequencies(context, candidates: int) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    Converte as contagens dos candidatos do contexto em uma lista (símbolo,
+    frequência) e o total, reduzindo as contagens por potências de 2 quando o
+    total excede MAX_TOTAL. Toda frequência continua >= 1, então nenhum
+    símbolo some.
+    """
+    counts = context.counts
+    symbols = list(iter_symbols(candidates))
+    total = context.masked_total(candidates)
+    shift = 0
+    while (total >> shift) + len(symbols) > MAX_TOTAL:
+        shift += 1
+    if not shift:
+        return [(symbol, counts[symbol]) for symbol in symbols], total
+    items = [(symbol, (counts[symbol] >> shift) or 1) for symbol in symbols]
+    return items, sum(count for _, count in items)
+
+
+class RangeEncoder:
+    """Codificador de faixa (range coder) inteiro de 32 bits com propagação de carry."""
+
+    def __init__(self):
+        self.low = 0
+        self.range = MASK
+        self.cache = 0
+        self.cache_size = 1
+        self.output = bytearray()
+
+    def encode(self, cum_freq: int, freq: int, total: int) -> None:
+        """Estreita o intervalo para [cum_freq, cum_freq + freq) de `total`."""
+        r = self.range // total
+        self.low += r * cum_freq
+        self.range = r * freq
+        while self.range < TOP:
+            self.range <<= 8
+            self._shift_low()
+
+    def _shift_low(self) -> None:
+        if self.low < 0xFF000000 or self.low > MASK:
+            carry = self.low >> 32
+            temp = self.cache
+            while True:
+                self.output.append((temp + carry) & 0xFF)
+                temp = 0xFF
+                self.cache_size -= 1
+                if not self.cache_size:
+                    break
+            self.cache = (self.low >> 24) & 0xFF
+        self.cache_size += 1
+        self.low = (self.low << 8) & MASK
+
+    def finish(self) -> bytes:
+        """Descarrega o estado pendente e retorna os bytes codificados."""
+        for _ in range(5):
+            self._shift_low()
+        return bytes(self.output)
+
+
+class RangeDecoder:
+    """Decodificador correspondente a RangeEncoder."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.range = MASK
+        self.code = 0
+        for _ in range(5):
+            self.code = ((self.code << 8) | self._next_byte()) & MASK
+
+    def _next_byte(self) -> int:
+        if self.position < len(self.data):
+            byte = self.data[self.position]
+        else:
+            byte = 0
+        self.position += 1
+        return byte
+
+    def get_freq(self, total: int) -> int:
+        """Retorna a frequência acumulada alvo dentro de `total`."""
+        self.r = self.range // total
+        return min(self.code // self.r, total - 1)
+
+    def decode(self, cum_freq: int, freq: int) -> None:
+        """Consome o símbolo cujo intervalo é [cum_freq, cum_freq + freq)."""
+        self.code -= self.r * cum_freq
+        self.range = self.r * freq
+        while self.range < TOP:
+            self.code = ((self.code << 8) | self._next_byte()) & MASK
+            self.range <<= 8
+
+
+class RangeCoder(EntropyCoder):
+    """
+    Codificação aritmética (range coder) das frequências de cada contexto.
+
+    As frequências acumuladas são somadas diretamente do vetor de contagens do
+    contexto, sem construir árvores, e a saída são bytes. O custo por símbolo fica
+    próximo de -log2(p), sem a perda de até 1 bit por símbolo do Huffman.
+    """
+
+    name = "range"
+
+    def __init__(self):
+        self.start_encoding()
+
+    def start_encoding(self) -> None:
+        self.encoder = RangeEncoder()
+        self.output = None
+
+    def encode(self, context, symbol: int, candidates: int) -> None:
+        if not candidates >> symbol & 1:
+            raise ValueError(f"Símbolo {symbol} ausente do contexto")
+        total = context.masked_total(candidates)
+        if total + len(context.counts) > MAX_TOTAL:
+            # Contagens grandes: mesma lista reescalada usada na decodificação
+            items, total = scale_frequencies(context, candidates)
+            cum_freq = 0
+            for candidate, freq in items:
+                if candidate == symbol:
+                    break
+                cum_freq += freq
+            self.encoder.encode(cum_freq, freq, total)
+            return None
+        # Frequência acumulada: soma dos candidatos com id menor que `symbol`
+        counts = context.counts
+        cum_freq = 0
+        for candidate in iter_symbols(candidates & ((1 << symbol) - 1)):
+            cum_freq += counts[candidate]
+        self.encoder.encode(cum_freq, counts[symbol], total)
+        return None
+
+    def code_length(self, context, symbol: int, candidates: int) -> float:
+        # Custo ideal -log2(p) com as frequências (reescaladas) do codificador;
+        # a saída real difere apenas pelos bytes de finalização
+        items, total = scale_frequencies(context, candidates)
+        for candidate, freq in items:
+            if candidate == symbol:
+                return math.log2(total / freq)
+        raise ValueError(f"Símbolo {symbol} ausente do contexto")
+
+    def finish(self) -> bytes:
+        self.output = self.encoder.finish()
+        return self.output
+
+    def bit_length(self) -> int:
+        if self.output is None:
+            return len(self.encoder.output) * 8
+        return len(self.output) * 8
+
+    def start_decoding(self, data: bytes, padding_bits: int = 0) -> None:
+        self.decoder = RangeDecoder(data)
+
+    def decode(self, context, candidates: int) -> int:
+        items, total = scale_frequencies(context, candidates)
+        target = self.decoder.get_freq(total)
+        cum_freq = 0
+        for candidate, freq in items:
+            if target < cum_freq + freq:
+                self.decoder.decode(cum_freq, freq)
+                return candidate
+            cum_freq += freq
+        raise ValueError("Frequência acumulada fora do contexto")
+
+    def has_data(self) -> bool:
+        return self.decoder.position < len(self.decoder.data)
@@ -1,85 +1,70 @@
 from ppm.app import PPMApp
+import sys
 import time
 #from processors.ppm_processor import PPMProcessor
-from processors.ppm_decoder import PPMDecoder
-from utils.file_handler import write_string_to_file, FileHandler
+from ppm.processors.ppm_blocks import benchmark_blocks
+from ppm.processors.ppm_file import decompress_payload, make_header
+from ppm.utils.file_format import load_compressed, save_compressed
+from ppm.utils.file_handler import write_string_to_file, FileHandler
 
-bits_extra = 0
 
-
-def comprimir_texto(codigo_binario):
+def comprimir_texto(caminho, model, texto, dados):
     """
-    Converte o texto em um código binário comprimido usando Shannon-Fano.
+    Grava no arquivo binário os bytes já empacotados pelo codificador, com o
+    cabeçalho do formato (k_max, alfabeto, escape, tamanho original, bits de
+    alinhamento e CRC32), e retorna o cabeçalho gravado.
     """
-    # Descobre quantos bits sobram para completar um byte
-    sobra_bits = len(codigo_binario) % 8
-    sobra_bits = 8 - sobra_bits if sobra_bits != 0 else 0
-
-    # Adiciona zeros extras para completar o último byte
-    codigo_binario += "0" * sobra_bits
-
-    # Grava o código binário comprimido em um arquivo binário
-    with open('/Users/lucas/OneDrive/Documentos/lucas/pdi/ITI/PrimeiroProjetoITI/Modulo2/ppm/data/comprimido.bin', 'wb') as arquivo:
-        for i in range(0, len(codigo_binario), 8):
-            byte = int(codigo_binario[i:i+8], 2)  # Converte para inteiro
-            arquivo.write(bytes([byte]))  # Escreve no arquivo
+    cabecalho = make_header(model, texto, dados, model.coder.bit_length())
+    save_compressed(caminho, cabecalho, dados)
+    return cabecalho
 
-    return sobra_bits  # Retorna a quantidade de bits adicionados para alinhamento
 
-
-def ler_arquivo_comprimido(bits_extra):
+def ler_arquivo_comprimido(caminho):
     """
-    Lê o arquivo binário comprimido e retorna seu conteúdo em formato binário.
+    Lê o arquivo binário comprimido e retorna seu cabeçalho e seus bytes.
     """
-    with open('/Users/lucas/OneDrive/Documentos/lucas/pdi/ITI/PrimeiroProjetoITI/Modulo2/ppm/data/comprimido.bin', 'rb') as arquivo:
-        conteudo = arquivo.read()
-        conteudo_binario = ''.join(format(byte, '08b') for byte in conteudo)
-
-    # Remove os bits adicionados para alinhamento
-    return conteudo_binario[:len(conteudo_binario)-bits_extra]
+    return load_compressed(caminho)
 
 
-def main(filepath):
-    # Valores configuráveis
-    K_MAX = 2
-    #INPUT_FILE = '/Users/lucas/OneDrive/Documentos/lucas/pdi/ITI/PrimeiroProjetoITI/Modulo2/ppm/data/MemoriasPostumas_preprocessado.txt'
-
+def main(filepath, output_path=None, k_max=2):
+    """
+    Comprime `filepath` e imprime entropia e comprimento médio. Com
+    `output_path`, grava o arquivo comprimido e confere a leitura de volta.
+    """
     # Criação e execução da aplicação
-    app = PPMApp(K_MAX)
+    app = PPMApp(k_max)
 
     inicio = time.time()
     encoded_sequence = app.run(filepath)
     fim = time.time()
     # print(encoded_sequence)
-    string_encoded = ''
     entropia = 0
     # tamanho da mensagem original
     N = len(app.text)
 
     for i in encoded_sequence:
-        string_encoded += i[3]
         entropia += i[5]
 
-    # código da mensagem
-    # print(f"Encoded antes da compressão: {string_encoded}")
+    # bytes da mensagem codificada
+    dados = app.processor.finish()
+    total_bits = app.processor.bit_length()
 
     # comprime o código em um arquivo binário
-    #bits_extra = comprimir_texto(string_encoded)
-    #codigo_descomprimido = ler_arquivo_comprimido(bits_extra)
-    # print(f"encoded depois da descompressão: {codigo_descomprimido}")
-
-    # if string_encoded == codigo_descomprimido:
-    #     print("A descompreção é IGUAL ao código comprimido")
-    # else:
-    #     print("A descompreção é DIFERENTE ao código comprimido")
+    if output_path is not None:
+        comprimir_texto(output_path, app.processor.model, app.text, dados)
+        _, codigo_descomprimido = ler_arquivo_comprimido(output_path)
+        if dados == codigo_descomprimido:
+            print("A descompreção é IGUAL ao código comprimido")
+        else:
+            print("A descompreção é DIFERENTE ao código comprimido")
 
-    print(f"para k: {K_MAX}")
+    print(f"para k: {k_max}")
 
     # tempo de compressão
     print(f"Tempo de compressão: {fim - inicio:.4f} segundos")
 
     entropia = abs(entropia/N)
-    comprimento_medio = len(string_encoded) / len(app.text)
+    comprimento_medio = total_bits / len(app.text)
 
     # entropia
     print(f"Entropia: {abs(entropia/N)}")
@@ -93,36 +78,94 @@ def main(filepath):
     return entropia, comprimento_medio
 
 
-def main_decoder():
-    # Parâmetros
-    k_max = 5
-    verbose = False
+def main_measure(filepath, k_max=2, coder="huffman"):
+    """
+    Mesmos números de main (entropia e comprimento médio por caractere) pelo
+    modo de medição: o modelo é atualizado, mas nenhum código é escrito nem
+    registrado.
+    """
+    app = PPMApp(k_max, coder=coder)
+    app.text = app.processor.model.filter_text(app.file_handler.read_file(filepath))
+
+    inicio = time.time()
+    medidas = app.processor.measure_text(app.text)
+    fim = time.time()
+
+    print(f"para k: {k_max}")
+    print(f"Tempo de medição: {fim - inicio:.4f} segundos")
+    print(f"Entropia: {medidas['entropy']}")
+    print(f"Comprimento Médio: {medidas['mean_code_length']}")
 
-    filename = '/Users/lucas/OneDrive/Documentos/lucas/pdi/ITI/PrimeiroProjetoITI/Modulo2/ppm/data/MemoriasPostumas_preprocessado_.txt'
+    return medidas['entropy'], medidas['mean_code_length']
 
-    file = FileHandler()
 
-    text = ler_arquivo_comprimido(bits_extra)
-    # print(text)
+def main_order_sweep(filepath, k_max=5, coder="huffman"):
+    """
+    Avalia todas as ordens k = 0..k_max em uma única passada pelo texto (ver
+    PPMProcessor.measure_orders). Retorna uma lista com, para cada k, a
+    entropia, o comprimento médio e o número de escapes.
+    """
+    app = PPMApp(k_max, coder=coder)
+    app.text = app.processor.model.filter_text(app.file_handler.read_file(filepath))
+
+    inicio = time.time()
+    ordens = app.processor.measure_orders(app.text)
+    fim = time.time()
+
+    print(f"Tempo da varredura (k = 0..{k_max}): {fim - inicio:.4f} segundos")
+    for medidas in ordens:
+        print(f"k={medidas['k']}: Entropia: {medidas['entropy']:.4f} "
+              f"Comprimento Médio: {medidas['mean_code_length']:.4f} Escapes: {medidas['escapes']}")
+
+    return ordens
+
+
+def main_block_benchmark(filepath, k_max=2, block_sizes=(1 << 14, 1 << 16, 1 << 18), workers_list=(1, None),
+                         coder="huffman", primer=None):
+    """
+    Compara tamanhos de bloco e números de processos no modo em blocos:
+    bits por caractere (custo de reiniciar o modelo a cada bloco) ao lado
+    dos tempos de codificação e decodificação.
+    """
+    app = PPMApp(k_max, coder=coder)
+    texto = app.processor.model.filter_text(app.file_handler.read_file(filepath))
+
+    resultados = benchmark_blocks(texto, block_sizes, workers_list, k_max, coder, primer)
+    for r in resultados:
+        print(f"bloco {r['block_size']:>7} | processos {r['workers']:>2} | {r['bits_per_char']:.4f} bits/caractere | "
+              f"codificação {r['encode_time']:.2f}s | decodificação {r['decode_time']:.2f}s | ok: {r['ok']}")
+
+    return resultados
+
+
+def main_decoder(compressed_path, output_path=None):
+    """
+    Descomprime um arquivo gravado por main: k_max, codificador e bits de
+    alinhamento vêm do cabeçalho, e o texto é conferido com o CRC32 gravado.
+    """
+    cabecalho, dados = ler_arquivo_comprimido(compressed_path)
 
     # Decodifica os dados
     inicio = time.time()
-    decoder = PPMDecoder(k_max, verbose)
-    decoded_text = decoder.decode_sequence(text)
+    decoded_text = decompress_payload(cabecalho, dados)
     fim = time.time()
 
     # print("\n--- Resultado ---")
     # print(f"Texto decodificado: {decoded_text}")
 
     # tempo de compressão
+    print(f"para k: {cabecalho.k_max}")
     print(f"Tempo de descompressão: {fim - inicio:.4f} segundos")
 
     # Escreve o resultado em um arquivo (opcional)
-    file_handler = FileHandler()
-    file_handler.write_file(
-        '/Users/lucas/OneDrive/Documentos/lucas/pdi/ITI/PrimeiroProjetoITI/Modulo2/ppm/data/MemoriasPostumas_preprocessado_descomprimido.txt', decoded_text)
+    if output_path is not None:
+        file_handler = FileHandler()
+        file_handler.write_file(output_path, decoded_text)
+
+    return decoded_text
 
 
 if __name__ == "__main__":
-    main()
-    #main_decoder()
+    # python ppm/main.py texto.txt [comprimido.bin]
+    main(*sys.argv[1:3])
+    #main_decoder(sys.argv[2])
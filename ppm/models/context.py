@@ -1,29 +1,103 @@
-from collections import defaultdict
-from typing import Set
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Chave dos contextos de ordem -1 e 0 (os de ordem k >= 1 usam o código na
+# base len(symbols) dos k últimos ids, o mais antigo como dígito mais significativo)
+NO_CONTEXT = 0
+
+
+def iter_symbols(mask: int) -> Iterator[int]:
+    """Percorre os ids dos símbolos presentes em uma máscara de bits, em ordem crescente."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
 
 class Context:
-    """Representa um contexto no modelo PPM."""
-    
-    def __init__(self):
-        self.char_counts = defaultdict(int)
-    
-    def add_character(self, char: str):
-        """Adiciona um caractere ao contexto ou incrementa sua contagem."""
-        self.char_counts[char] += 1
-    
-    def remove_character(self, char: str):
-        """Remove um caractere do contexto."""
-        if char in self.char_counts:
-            del self.char_counts[char]
-    
-    def get_characters(self) -> Set[str]:
-        """Retorna o conjunto de caracteres neste contexto."""
-        return set(self.char_counts.keys())
-    
-    def contains(self, char: str) -> bool:
-        """Verifica se um caractere está presente no contexto."""
-        return char in self.char_counts
-    
-    def get_count(self, char: str) -> int:
-        """Retorna a contagem de um caractere específico."""
-        return self.char_counts.get(char, 0) 
\ No newline at end of file
+    """
+    Representa um contexto no modelo PPM (nó da trie de contextos).
+
+    As contagens ficam em um vetor de tamanho fixo indexado pelo id do
+    símbolo (ver PPMModel.symbols), com o total mantido incrementalmente e uma
+    máscara de bits dos símbolos presentes. Assim, presença e completude são
+    testes de máscara, sem percorrer dicionários. O total sob exclusão (também
+    uma máscara) não é mantido: masked_total desconta do total as contagens
+    dos símbolos excluídos, um a um.
+    """
+
+    __slots__ = ("symbols", "counts", "total", "mask", "order", "key", "suffix", "children", "version",
+                 "refs", "last_use")
+
+    def __init__(self, symbols: Sequence[str], order: int = 0, key: int = NO_CONTEXT,
+                 suffix: Optional["Context"] = None):
+        self.symbols = symbols  # Tabela id -> caractere, compartilhada pelo modelo
+        self.counts = array('I', bytes(4 * len(symbols)))  # Contagem por id de símbolo
+        self.total = 0  # Soma das contagens
+        self.mask = 0  # Bit i ligado se o símbolo i está presente
+        self.order = order  # Ordem k do contexto
+        self.key = key  # Chave inteira do contexto na estrutura do modelo (ver NO_CONTEXT)
+        self.suffix = suffix  # Ponteiro de sufixo (vine): contexto de ordem k-1
+        self.children: Optional[Dict[int, "Context"]] = None  # Contextos de ordem k+1
+        self.version = 0  # Incrementada a cada modificação das contagens
+        self.refs = 0  # Quantos contextos de ordem k+1 apontam para este como sufixo
+        self.last_use = 0  # Última posição do texto em que o contexto foi atualizado
+
+    def add_symbol(self, symbol: int, amount: int = 1) -> None:
+        """Adiciona um símbolo ao contexto ou incrementa sua contagem."""
+        self.counts[symbol] += amount
+        self.total += amount
+        self.mask |= 1 << symbol
+        self.version += 1
+
+    def remove_symbol(self, symbol: int) -> None:
+        """Remove um símbolo do contexto."""
+        if self.mask >> symbol & 1:
+            self.total -= self.counts[symbol]
+            self.counts[symbol] = 0
+            self.mask &= ~(1 << symbol)
+            self.version += 1
+
+    def halve(self) -> None:
+        """Divide todas as contagens por 2 (arredondando para cima, nenhum símbolo some)."""
+        counts = self.counts
+        total = 0
+        for symbol in iter_symbols(self.mask):
+            counts[symbol] = (counts[symbol] + 1) >> 1
+            total += counts[symbol]
+        self.total = total
+        self.version += 1
+
+    @property
+    def char_counts(self) -> Dict[str, int]:
+        """Contagens indexadas pelos caracteres (para exportação e depuração)."""
+        return {self.symbols[symbol]: self.counts[symbol] for symbol in iter_symbols(self.mask)}
+
+    def get_symbols(self) -> List[int]:
+        """Retorna os ids dos símbolos presentes neste contexto."""
+        return list(iter_symbols(self.mask))
+
+    def contains(self, symbol: int) -> bool:
+        """Verifica se um símbolo está presente no contexto."""
+        return bool(self.mask >> symbol & 1)
+
+    def get_count(self, symbol: int) -> int:
+        """Retorna a contagem de um símbolo específico."""
+        return self.counts[symbol]
+
+    def masked_total(self, candidates: int) -> int:
+        """
+        Soma das contagens dos símbolos presentes em `candidates`: o total
+        menos as contagens dos símbolos do contexto fora de `candidates`
+        (custo proporcional ao número de símbolos excluídos).
+        """
+        total = self.total
+        for symbol in iter_symbols(self.mask & ~candidates):
+            total -= self.counts[symbol]
+        return total
+
+    def get_child(self, symbol: int) -> Optional["Context"]:
+        """Retorna o contexto estendido por `symbol` (ordem k+1), se já existir."""
+        if self.children is None:
+            return None
+        return self.children.get(symbol)
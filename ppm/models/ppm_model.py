@@ -1,6 +1,10 @@
 import string
 import math
-from typing import Dict, List
+import heapq
+from array import array
+from collections import deque
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple, Union
 import os
 import sys
 
@@ -8,170 +12,645 @@ import sys
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
 
-from ppm.models.context import Context
-from ppm.utils.encoder import codificar_ppm  # Importando a função
+from ppm.models.context import NO_CONTEXT, Context, iter_symbols
+from ppm.coders.base import EntropyCoder, get_coder
+
+
+# Políticas de memória quando o número de contextos excede max_contexts
+EVICTION_POLICIES = ("restart", "lru", "least_count")
 
 
 class PPMModel:
-    """Modelo principal do PPM (Prediction by Partial Matching)."""
+    """
+    Modelo principal do PPM (Prediction by Partial Matching).
+
+    Por padrão o modelo só cresce. Com `max_contexts`, o número de contextos de
+    ordem >= 1 fica limitado (cada contexto ocupa algumas centenas de bytes) e,
+    ao ultrapassá-lo, a política `eviction` é aplicada: "restart" recomeça o
+    modelo do zero (como o PPMd), "lru" descarta os contextos usados há mais
+    tempo e "least_count" os de menor contagem total. Só são descartadas folhas
+    da trie que não são sufixo de outro contexto nem fazem parte da posição
+    atual. Com `max_count`, as contagens de um contexto são divididas por 2
+    quando seu total passa do limite. Todas as decisões dependem apenas do
+    texto já processado, então codificador e decodificador continuam em sincronia.
+    """
 
-    def __init__(self, k_max: int = 2, verbose: bool = False):
+    def __init__(self, k_max: int = 2, verbose: bool = False,
+                 coder: Union[str, EntropyCoder] = "huffman", keep_records: bool = True,
+                 max_contexts: Optional[int] = None, eviction: str = "lru",
+                 max_count: Optional[int] = None):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Política de memória desconhecida: {eviction}")
         self.k_max = k_max
         self.structure = {k: {} for k in range(-1, k_max + 1)}
-        self.ignore_chars = set()
         self.esc_symbol = 'ç'  # Símbolo de escape (ro)
-        self.encoded_bits = []  # Lista para armazenar os bits codificados
+        self.encoded_bits = []  # Registros (símbolo, k, contexto, bits do código, probabilidade, log2 p)
+        self.keep_records = keep_records  # Se False, encoded_bits não cresce com o texto
+        # Modo de medição: acumula apenas bits de código e -log2(p) por ordem (índice k+1)
+        self.measuring = False
+        self.measure_code_lengths = True  # Se False, a medição soma só -log2(p)
+        self.reset_measurement()
+        # Traço opcional por símbolo (ver ppm.utils.trace.CodeTrace): bits de
+        # código e -log2(p) exatos do símbolo atual, somados entre os escapes
+        self.trace = None
+        self.symbol_code_bits = 0.0
+        self.symbol_info_bits = 0.0
+        # Contadores opcionais do caminho de codificação (ver ppm.utils.stats.PPMStats)
+        self.stats = None
+        # Snapshot de primer consultado ao criar cada contexto (ver attach_primer)
+        self.primer = None
         self.verbose = verbose
         self.alphabet = string.ascii_lowercase + "_"
         # self.alphabet = "abcdr"
+        # Ids dos símbolos (alfabeto + escape) em ordem decrescente de código,
+        # a mesma ordem de desempate das árvores de Huffman ('ç' antes de 'z')
+        self.symbols = tuple(sorted(self.alphabet + self.esc_symbol, key=ord, reverse=True))
+        self.symbol_ids = {char: index for index, char in enumerate(self.symbols)}
+        # Base das chaves inteiras dos contextos (um dígito por símbolo do contexto)
+        self.base = len(self.symbols)
+        self.esc_id = self.symbol_ids[self.esc_symbol]
+        self.esc_mask = 1 << self.esc_id
+        self.alphabet_mask = sum(1 << self.symbol_ids[char] for char in self.alphabet)
+        self.exclusion = 0  # Máscara dos símbolos excluídos após escapes
+        self.max_contexts = max_contexts
+        self.eviction = eviction
+        self.max_count = max_count
+        self.n_contexts = 0  # Contextos de ordem >= 1 existentes
+        self.tick = 0  # Posição atual no texto (para a política LRU)
+        self.evictions = 0
+        self.restarts = 0
+        self.halvings = 0
+        self.coder = get_coder(coder)  # Codificador de entropia ('huffman' ou 'range')
+        self.coder.start_encoding()
         self.initialize_alphabet()
 
+    def reset_measurement(self) -> None:
+        """Zera os totais acumulados pelo modo de medição."""
+        self.measured_chars = 0
+        self.code_bits = [0] * (self.k_max + 2)
+        self.info_bits = [0.0] * (self.k_max + 2)
+        self.coded_events = [0] * (self.k_max + 2)
+        # Varredura de ordens (measure_orders): custos de um modelo de ordem k, índice k
+        self.order_code_bits = [0] * (self.k_max + 1)
+        self.order_info_bits = [0.0] * (self.k_max + 1)
+        self.order_escapes = [0] * (self.k_max + 1)
+
+    def new_context(self, order: int, key: int = NO_CONTEXT, suffix: Context = None) -> Context:
+        """Cria um contexto vazio com um contador para cada símbolo."""
+        return Context(self.symbols, order, key, suffix)
+
     def initialize_alphabet(self):
-        """Inicializa o modelo com o alfabeto para k=-1."""
-        self.structure[-1]["NO_CONTEXT"] = Context()
+        """Inicializa o modelo com o alfabeto para k=-1 e a raiz (k=0) da trie."""
+        self.structure[-1][NO_CONTEXT] = self.new_context(-1)
         for letra in self.alphabet:
-            self.structure[-1]["NO_CONTEXT"].add_character(letra)
+            self.structure[-1][NO_CONTEXT].add_symbol(self.symbol_ids[letra])
+        self.root = self.new_context(0, suffix=self.structure[-1][NO_CONTEXT])
+        self.structure[0][NO_CONTEXT] = self.root
+        if self.primer is not None:
+            self.prime_context(self.structure[-1][NO_CONTEXT])
+            self.prime_context(self.root)
+        # Contexto mais longo (ordem min(len(histórico), k_max)) da posição atual
+        self.cursor = self.root
+        # Últimos k_max caracteres, do mais recente para o mais antigo
+        self.history = deque(maxlen=self.k_max)
+
+    def symbol_id(self, char: str) -> int:
+        """
+        Retorna o id de um caractere do alfabeto. O símbolo de escape também
+        tem id, mas não pode aparecer no texto: é rejeitado como os demais
+        caracteres de fora do alfabeto.
+        """
+        symbol = self.symbol_ids.get(char, self.esc_id)
+        if symbol == self.esc_id:
+            raise ValueError(f"Caractere fora do alfabeto do modelo: {char!r}")
+        return symbol
 
-    def get_context(self, k: int, context_str: str) -> Context:
-        """Retorna o contexto para um determinado k e string de contexto."""
-        context_key = context_str if context_str else "NO_CONTEXT"
-        # Se não existe o contexto, cria um novo
-        if context_key not in self.structure[k]:
-            self.structure[k][context_key] = Context()
-        return self.structure[k][context_key]
+    def filter_text(self, text: str) -> str:
+        """Remove do texto os caracteres que não pertencem ao alfabeto do modelo."""
+        alphabet = set(self.alphabet)
+        return ''.join(char for char in text if char in alphabet)
+
+    def get_child(self, context: Context, symbol: int) -> Context:
+        """
+        Retorna o contexto de ordem k+1 obtido ao estender `context` com `symbol`,
+        criando-o (e a cadeia de sufixos necessária) se ainda não existir.
+        """
+        children = context.children
+        if children is None:
+            children = context.children = {}
+        child = children.get(symbol)
+        if child is None:
+            # A chave do filho acrescenta `symbol` como dígito menos significativo
+            if context.order == 0:
+                suffix, key = self.root, symbol
+            else:
+                suffix, key = self.get_child(context.suffix, symbol), context.key * self.base + symbol
+            child = self.new_context(context.order + 1, key, suffix)
+            if suffix.order > 0:
+                suffix.refs += 1
+            if self.primer is not None:
+                self.prime_context(child)
+            children[symbol] = child
+            self.structure[child.order][key] = child
+            self.n_contexts += 1
+            if self.stats is not None:
+                self.stats.contexts_created += 1
+        return child
+
+    def context_key(self, context_str: str) -> int:
+        """Chave inteira de uma string de contexto (caractere mais antigo primeiro)."""
+        key = 0
+        for char in context_str:
+            key = key * self.base + self.symbol_id(char)
+        return key
+
+    def key_string(self, order: int, key: int) -> str:
+        """String de um contexto a partir da sua chave (apenas para depuração e exportação)."""
+        if order <= 0:
+            return "NO_CONTEXT"
+        chars = []
+        for _ in range(order):
+            key, symbol = divmod(key, self.base)
+            chars.append(self.symbols[symbol])
+        return ''.join(reversed(chars))
+
+    def get_context(self, k: int, context_str: str) -> Optional[Context]:
+        """
+        Retorna o contexto para um determinado k e string de contexto, ou None
+        se ele ainda não existe (a consulta não cria contextos).
+        """
+        if k <= 0:
+            return self.structure[k][NO_CONTEXT]
+        if len(context_str) < k:
+            return None
+        try:
+            return self.structure[k].get(self.context_key(context_str[-k:]))
+        except ValueError:
+            return None
 
     def is_context_complete(self, context: Context) -> bool:
         """Verifica se um contexto contém todos os símbolos do alfabeto incluindo espaço."""
-        alphabet = set(self.alphabet)
-        context_chars = context.get_characters()
-        return alphabet.issubset(context_chars)
-
-    def process_character(self, char: str, context_stack: List[str]) -> None:
-        """Processa um caractere no modelo PPM."""
-        element_found = False
-        numerador = 0
-        denominador = 0
-        entropia = 0
-        if not context_stack:
-            # Caso especial para o primeiro caractere
-            # Codifica o caractere no contexto -1
-            encoded_bits = codificar_ppm(
-                self.structure, -1, "NO_CONTEXT", char, self.ignore_chars, False)
-            if encoded_bits:
-                # Calcula a probabilidade como tupla (numerador, denominador)
-                # pega o contexto -1
-                context = self.get_context(-1, "NO_CONTEXT")
-                numerador = context.char_counts[char]
-                denominador = sum(context.char_counts.values())
-                entropia = round(math.log2(numerador/denominador), 4)
-                self.encoded_bits.append(
-                    (char, -1, "NO_CONTEXT", encoded_bits, (numerador, denominador), entropia))
-                if self.verbose:
-                    # print(
-                    #     f"Codificando '{char}' no contexto -1 com bits: {encoded_bits}")
-                    pass
-
-            self.structure[-1]["NO_CONTEXT"].remove_character(char)
-            self.get_context(0, "NO_CONTEXT").add_character(char)
-            self.get_context(0, "NO_CONTEXT").add_character(self.esc_symbol)
+        return context.mask & self.alphabet_mask == self.alphabet_mask
+
+    def advance(self, symbol: int) -> None:
+        """Move o cursor para o contexto mais longo da próxima posição."""
+        if self.k_max == 0:
+            return
+        parent = self.cursor if self.cursor.order < self.k_max else self.cursor.suffix
+        self.cursor = self.get_child(parent, symbol)
+
+    def candidates(self, context: Context) -> int:
+        """
+        Retorna a máscara dos símbolos do contexto sem os caracteres excluídos.
+        No contexto -1 a exclusão não se aplica (códigos equiprováveis).
+        """
+        if context.order == -1:
+            return context.mask
+        return context.mask & ~self.exclusion
+
+    def candidate_frequencies(self, context: Context) -> Dict[str, int]:
+        """Retorna as frequências do contexto sem os caracteres excluídos."""
+        return {self.symbols[symbol]: context.counts[symbol]
+                for symbol in iter_symbols(self.candidates(context))}
+
+    def encode_symbol(self, context: Context, symbol: int) -> None:
+        """Codifica um símbolo (caractere ou escape) em um contexto e registra o resultado."""
+        candidates = self.candidates(context)
+        # Um único candidato é determinístico e não emite nada
+        if not candidates & (candidates - 1) or not candidates >> symbol & 1:
+            if self.stats is not None:
+                self.stats.deterministic[context.order + 1] += 1
+            return
+        if self.trace is not None:
+            self.trace_symbol(context, symbol, candidates)
+        if self.measuring:
+            # Apenas custos: nada é escrito no codificador nem registrado
+            order = context.order + 1
+            if self.measure_code_lengths:
+                self.code_bits[order] += self.coder.code_length(context, symbol, candidates)
+            self.info_bits[order] += math.log2(context.masked_total(candidates) / context.counts[symbol])
+            self.coded_events[order] += 1
+            return
+        # Tamanho do código em bits (None quando o codificador não o define por símbolo)
+        code_length = self.coder.encode(context, symbol, candidates)
+        if not self.keep_records:
+            return
+        # Calcula a probabilidade como tupla (numerador, denominador)
+        numerador = context.counts[symbol]
+        denominador = context.masked_total(candidates)
+        entropia = round(math.log2(numerador/denominador), 4)
+        self.encoded_bits.append((self.symbols[symbol], context.order, context.key, code_length,
+                                  (numerador, denominador), entropia))
+
+    def trace_symbol(self, context: Context, symbol: int, candidates: int) -> None:
+        """Soma o custo exato de um evento codificado ao símbolo atual do traço."""
+        self.symbol_code_bits += self.coder.code_length(context, symbol, candidates)
+        self.symbol_info_bits += math.log2(context.masked_total(candidates) / context.counts[symbol])
+
+    def exclude_characters(self, context: Context) -> None:
+        """Exclui os caracteres de um contexto que escapou dos contextos de ordem menor."""
+        self.exclusion |= context.mask & ~self.esc_mask
+
+    def process_character(self, char: str, context_stack: List[str] = None) -> None:
+        """
+        Processa um caractere no modelo PPM.
+
+        Os contextos são visitados do mais longo (cursor) até k=-1 seguindo os
+        ponteiros de sufixo da trie; `context_stack` é mantido apenas por
+        compatibilidade, pois a posição é acompanhada pelo próprio cursor (e o
+        histórico recente por `history`).
+        Caracteres fora do alfabeto geram ValueError (ver filter_text).
+        """
+        symbol = self.symbol_id(char)
+        stats = self.stats
+        if stats is not None:
+            return self.process_character_with_stats(symbol, stats)
+        context = self.cursor
+        escapes = 0
+        # Verifica cada nível de k, começando pelo maior possível
+        while context is not None:
+            if context.mask:
+                if context.mask >> symbol & 1:
+                    self.encode_symbol(context, symbol)
+                    break
+                if context.order != -1:
+                    # Codifica o caractere de escape (ro) e exclui os caracteres do contexto
+                    self.encode_symbol(context, self.esc_id)
+                    self.exclude_characters(context)
+                    escapes += 1
+            context = context.suffix
+
+        if self.trace is not None:
+            self.trace.append(self.symbol_code_bits, self.symbol_info_bits, context.order, escapes)
+            self.symbol_code_bits = 0.0
+            self.symbol_info_bits = 0.0
+        self.update(symbol)
+
+    def process_character_with_stats(self, symbol: int, stats: Any) -> None:
+        """
+        Mesmo caminho de process_character, contando contextos visitados,
+        escapes e símbolos por ordem e, com `stats.timers`, o tempo do
+        codificador em cada ordem e o da atualização do modelo.
+        """
+        timers = stats.timers
+        context = self.cursor
+        escapes = 0
+        while context is not None:
+            order = context.order + 1
+            stats.lookups[order] += 1
+            if context.mask:
+                found = context.mask >> symbol & 1
+                if found or context.order != -1:
+                    start = perf_counter() if timers else 0.0
+                    self.encode_symbol(context, symbol if found else self.esc_id)
+                    if timers:
+                        stats.encode_time[order] += perf_counter() - start
+                if found:
+                    stats.coded[order] += 1
+                    break
+                if context.order != -1:
+                    self.exclude_characters(context)
+                    stats.escapes[order] += 1
+                    escapes += 1
+            context = context.suffix
+
+        if self.trace is not None:
+            self.trace.append(self.symbol_code_bits, self.symbol_info_bits, context.order, escapes)
+            self.symbol_code_bits = 0.0
+            self.symbol_info_bits = 0.0
+        stats.chars += 1
+        start = perf_counter() if timers else 0.0
+        self.update(symbol)
+        if timers:
+            stats.update_time += perf_counter() - start
+
+    def measure_orders(self, char: str) -> None:
+        """
+        Acumula o custo do caractere para cada ordem k = 0..k_max, como se ele
+        fosse codificado por um modelo de ordem k, e atualiza o modelo.
+
+        Com atualização completa, as contagens dos contextos de ordem <= k
+        não dependem de k_max, então um modelo de ordem k_max contém os de
+        todas as ordens menores: a ordem k começa a descida pelo contexto de
+        ordem min(k, ordem do cursor). Além disso, os símbolos de um contexto
+        também estão no seu sufixo, então abaixo do ponto de partida a
+        exclusão é a mesma para todas as ordens, e basta uma descida completa
+        (do cursor) mais o custo do contexto inicial de cada ordem.
+        Não vale com max_contexts, pois o descarte depende da estrutura toda.
+        """
+        symbol = self.symbol_id(char)
+        esc_id = self.esc_id
+        esc_mask = self.esc_mask
+        code_length = self.coder.code_length
+
+        def cost(context: Context, coded: int, candidates: int) -> Tuple[int, float]:
+            # Um único candidato é determinístico e não emite nada
+            if not candidates & (candidates - 1) or not candidates >> coded & 1:
+                return 0, 0.0
+            return (code_length(context, coded, candidates),
+                    math.log2(context.masked_total(candidates) / context.counts[coded]))
+
+        # Descida completa a partir do cursor: custos acumulados do contexto
+        # i da cadeia (ordem cursor - i) até o contexto que contém o símbolo
+        chain = []
+        context = self.cursor
+        while context is not None:
+            chain.append(context)
+            context = context.suffix
+        walk_bits = []
+        walk_info = []
+        walk_escapes = []
+        exclusion = 0
+        for context in chain:
+            mask = context.mask
+            if not mask:
+                walk_bits.append(0)
+                walk_info.append(0.0)
+                walk_escapes.append(0)
+                continue
+            found = mask >> symbol & 1
+            bits, info = cost(context, symbol if found else esc_id,
+                              mask if context.order == -1 else mask & ~exclusion)
+            walk_bits.append(bits)
+            walk_info.append(info)
+            walk_escapes.append(0 if found else 1)
+            if found:
+                break
+            exclusion |= mask & ~esc_mask
+        found_index = len(walk_bits) - 1
+        # Sufixos acumulados: custo da descida do contexto i até o símbolo
+        for i in range(found_index - 1, -1, -1):
+            walk_bits[i] += walk_bits[i + 1]
+            walk_info[i] += walk_info[i + 1]
+            walk_escapes[i] += walk_escapes[i + 1]
+
+        # Até o primeiro contexto não vazio da cadeia a descida completa não
+        # exclui nada: uma ordem que começa nele tem exatamente o custo da
+        # descida a partir dali, sem novas consultas ao codificador
+        first = 0
+        while first < found_index and not chain[first].mask:
+            first += 1
+
+        top = self.cursor.order
+        for k in range(self.k_max + 1):
+            # Primeiro contexto não vazio a partir da ordem min(k, cursor)
+            start = max(top - k, 0)
+            while start < found_index and not chain[start].mask:
+                start += 1
+            context = chain[start]
+            if start == first:
+                bits, info, escapes = walk_bits[start], walk_info[start], walk_escapes[start]
+            elif start >= found_index:
+                # O contexto inicial já contém o símbolo (sem exclusão)
+                bits, info = cost(context, symbol, context.mask)
+                escapes = 0
+            else:
+                # Escape sem exclusão no contexto inicial; dali para baixo, a descida completa
+                bits, info = cost(context, esc_id, context.mask)
+                bits += walk_bits[start + 1]
+                info += walk_info[start + 1]
+                escapes = 1 + walk_escapes[start + 1]
+            self.order_code_bits[k] += bits
+            self.order_info_bits[k] += info
+            self.order_escapes[k] += escapes
+
+        self.measured_chars += 1
+        self.update(symbol)
+
+    def get_order_sweep(self) -> List[Dict[str, Any]]:
+        """
+        Retorna os totais de measure_orders para cada ordem k = 0..k_max:
+        bits de código, informação (-log2 p), escapes e as médias por caractere.
+        """
+        n = self.measured_chars
+        return [
+            {
+                "k": k,
+                "chars": n,
+                "code_bits": self.order_code_bits[k],
+                "info_bits": self.order_info_bits[k],
+                "escapes": self.order_escapes[k],
+                "mean_code_length": self.order_code_bits[k] / n if n else 0.0,
+                "entropy": self.order_info_bits[k] / n if n else 0.0,
+            }
+            for k in range(self.k_max + 1)
+        ]
+
+    def decode_character(self) -> str:
+        """Decodifica o próximo caractere com o codificador e atualiza o modelo."""
+        context = self.cursor
+        while context is not None:
+            if context.mask:
+                candidates = self.candidates(context)
+                if not candidates & (candidates - 1):
+                    symbol = candidates.bit_length() - 1
+                else:
+                    symbol = self.coder.decode(context, candidates)
+                if symbol != self.esc_id:
+                    self.update(symbol)
+                    return self.symbols[symbol]
+                self.exclude_characters(context)
+            context = context.suffix
+        raise ValueError("Erro ao decodificar o contexto")
+
+    def update(self, symbol: int) -> None:
+        """Atualiza as contagens de todos os contextos da posição atual e avança o cursor."""
+        esc_id = self.esc_id
+        max_count = self.max_count
+        self.tick += 1
+        context = self.cursor
+        while context is not None:
+            if context.order == -1:
+                context.remove_symbol(symbol)
+            elif context.mask >> symbol & 1:
+                context.add_symbol(symbol)
+            else:
+                # Adiciona escape symbol e o caractere
+                context.add_symbol(esc_id)
+                context.add_symbol(symbol)
+
+                # verifica se o contexto está completo para poder remover ro
+                if self.is_context_complete(context):
+                    context.remove_symbol(esc_id)
+            if max_count is not None and context.total > max_count:
+                context.halve()
+                self.halvings += 1
+            context.last_use = self.tick
+            context = context.suffix
+
+        self.exclusion = 0
+        self.history.appendleft(self.symbols[symbol])
+        self.advance(symbol)
+        if self.max_contexts is not None and self.n_contexts > self.max_contexts:
+            self.enforce_memory_budget()
+
+    def enforce_memory_budget(self) -> None:
+        """Aplica a política de memória quando há mais de max_contexts contextos."""
+        if self.eviction == "restart":
+            self.restart()
+            return
+        # Contextos da posição atual (cursor e seus sufixos) não podem sair
+        protected = set()
+        context = self.cursor
+        while context is not None:
+            protected.add(id(context))
+            context = context.suffix
+        candidates = [context for k in range(1, self.k_max + 1) for context in self.structure[k].values()
+                      if not context.children and not context.refs and id(context) not in protected]
+        if self.eviction == "lru":
+            key = lambda context: (context.last_use, context.order, context.key)
         else:
-            stack_size = len(context_stack)
-            stack_size = min(stack_size, self.k_max)
+            key = lambda context: (context.total, context.last_use, context.order, context.key)
+        # Descarta em lote (10% do limite) para não percorrer a estrutura a cada símbolo
+        n_evict = self.n_contexts - self.max_contexts + max(1, self.max_contexts // 10)
+        for context in heapq.nsmallest(n_evict, candidates, key=key):
+            self.evict(context)
+        self.coder.forget_contexts()
+
+    def evict(self, context: Context) -> None:
+        """Remove uma folha da trie (e do registro em structure)."""
+        # O pai na trie tem a chave sem o dígito menos significativo
+        parent_key, symbol = divmod(context.key, self.base)
+        parent = self.root if context.order == 1 else self.structure[context.order - 1][parent_key]
+        del parent.children[symbol]
+        del self.structure[context.order][context.key]
+        if context.suffix.order > 0:
+            context.suffix.refs -= 1
+        self.n_contexts -= 1
+        self.evictions += 1
+
+    def restart(self) -> None:
+        """
+        Recomeça o modelo do zero, mantendo apenas o histórico recente, a
+        partir do qual o cursor é reconstruído.
+        """
+        history = self.history
+        for contexts in self.structure.values():
+            contexts.clear()
+        self.n_contexts = 0
+        self.initialize_alphabet()
+        self.history = history
+        if self.k_max > 0:
+            for char in reversed(history):
+                self.cursor = self.get_child(self.cursor, self.symbol_ids[char])
+        self.coder.forget_contexts()
+        self.restarts += 1
 
-            # Verifica cada nível de k, começando pelo maior possível
-            for k in range(stack_size, -2, -1):
-                if k > 0:
-                    context_str = ''.join(context_stack[k-1::-1])
+    def load_snapshot(self, snapshot: Any) -> None:
+        """
+        Substitui as contagens do modelo pelas de um ModelSnapshot (mesmo
+        k_max e mesmos símbolos), reconstruindo a trie, para que a adaptação
+        continue a partir de um modelo treinado. O cursor volta para a raiz
+        (nenhum histórico), igual no codificador e no decodificador.
+        """
+        if snapshot.k_max != self.k_max or snapshot.symbols != self.symbols:
+            raise ValueError("Snapshot incompatível com o modelo (k_max ou símbolos diferentes)")
+        for contexts in self.structure.values():
+            contexts.clear()
+        self.n_contexts = 0
+        self.primer = None
+        self.initialize_alphabet()
+        base = self.base
+        for k in range(-1, self.k_max + 1):
+            keys, totals, masks, counts = snapshot.orders[k]
+            structure = self.structure[k]
+            for index, key in enumerate(keys):
+                if k <= 0:
+                    context = structure[NO_CONTEXT]
                 else:
-                    context_str = "NO_CONTEXT"
-
-                context = self.get_context(k, context_str)
-                # print(f"Contexto: {context.char_counts}")
-                if context.contains(char):  # se o caractere está no contexto
-                    if k == -1:  # se o contexto é -1
-                        # Codifica o caractere no contexto -1
-                        encoded_bits = codificar_ppm(
-                            self.structure, -1, "NO_CONTEXT", char, {}, False)
-                        if encoded_bits:
-                            # Calcula a probabilidade como tupla (numerador, denominador)
-                            numerador = context.char_counts[char]
-                            denominador = sum(
-                                count for c, count in context.char_counts.items() if c not in self.ignore_chars)
-                            entropia = round(
-                                math.log2(numerador/denominador), 4)
-                            self.encoded_bits.append(
-                                (char, -1, "NO_CONTEXT", encoded_bits, (numerador, denominador), entropia))
-                            if self.verbose:
-                                # print(
-                                #     f"Codificando '{char}' no contexto -1 com bits: {encoded_bits}")
-                                pass
-
-                        context.remove_character(char)
-                    else:  # se o contexto não é -1
-                        if not element_found:
-                            # Codifica o caractere no contexto atual
-                            encoded_bits = codificar_ppm(
-                                self.structure, k, context_str, char, self.ignore_chars, False)
-                            if encoded_bits:
-                                # Calcula a probabilidade como tupla (numerador, denominador)
-                                numerador = context.char_counts[char]
-                                denominador = sum(
-                                    count for c, count in context.char_counts.items() if c not in self.ignore_chars)
-                                entropia = round(
-                                    math.log2(numerador/denominador), 4)
-                                self.encoded_bits.append(
-                                    (char, k, context_str, encoded_bits, (numerador, denominador), entropia))
-                                if self.verbose:
-                                    # print(
-                                    #     f"Codificando '{char}' no contexto {k}:{context_str} com bits: {encoded_bits}")
-                                    pass
-
-                        element_found = True
-                        context.add_character(char)
-                else:  # se o caractere não está no contexto
-                    if k != -1:  # se o contexto não é -1
-                        if len(context.char_counts):
-                            if not element_found:
-                                # Codifica o caractere de escape (ro)
-                                escape_bits = codificar_ppm(
-                                    self.structure, k, context_str, self.esc_symbol, self.ignore_chars, False)
-                                if escape_bits:
-                                    # Calcula a probabilidade para o símbolo de escape
-                                    numerador = context.char_counts.get(
-                                        self.esc_symbol, 0)
-                                    denominador = sum(
-                                        count for c, count in context.char_counts.items() if c not in self.ignore_chars)
-                                    entropia = round(
-                                        math.log2(numerador/denominador), 4)
-                                    self.encoded_bits.append(
-                                        (self.esc_symbol, k, context_str, escape_bits, (numerador, denominador), entropia))
-                                    if self.verbose:
-                                        # print(
-                                        #     f"Codificando escape '{self.esc_symbol}' no contexto {k}:{context_str} com bits: {escape_bits}")
-                                        pass
-                            # Caracteres que devem ser ignorados na codificação
-                            characters = {
-                                c for c in context.get_characters() if c != self.esc_symbol}
-                            if self.verbose:
-                                # print(f"Contexto caracteres: {characters}")
-                                pass
-
-                            if characters:
-                                self.ignore_chars.update(characters)
-
-                        # Adiciona escape symbol e o caractere
-                        context.add_character(self.esc_symbol)
-                        context.add_character(char)
-
-                        # verifica se o contexto está completo para poder remover ro
-                        if self.is_context_complete(context):
-                            context.remove_character(self.esc_symbol)
+                    # Pai na trie: sem o símbolo mais recente; sufixo: sem o mais antigo
+                    parent = self.root if k == 1 else self.structure[k - 1][key // base]
+                    suffix = self.root if k == 1 else self.structure[k - 1][key % base ** (k - 1)]
+                    context = self.new_context(k, key, suffix)
+                    if parent.children is None:
+                        parent.children = {}
+                    parent.children[key % base] = context
+                    structure[key] = context
+                    if suffix.order > 0:
+                        suffix.refs += 1
+                    self.n_contexts += 1
+                start = index * base
+                context.counts = array('I', counts[start:start + base].tobytes())
+                context.total = totals[index]
+                context.mask = masks[index]
+        self.coder.forget_contexts()
+
+    def attach_primer(self, snapshot: Any) -> None:
+        """
+        Parte das contagens de um ModelSnapshot (mesmo k_max e mesmos
+        símbolos) sem reconstruir a trie: cada contexto recebe as contagens do
+        snapshot quando é criado (ver prime_context). Como o modelo só lê
+        contextos da cadeia de sufixos do cursor, e todos eles passam por
+        get_child ao serem criados, os códigos são os mesmos de load_snapshot,
+        mas o custo é proporcional aos contextos visitados e não ao primer
+        inteiro. O snapshot precisa continuar aberto enquanto o modelo é usado.
+        """
+        if snapshot.k_max != self.k_max or snapshot.symbols != self.symbols:
+            raise ValueError("Snapshot incompatível com o modelo (k_max ou símbolos diferentes)")
+        for contexts in self.structure.values():
+            contexts.clear()
+        self.n_contexts = 0
+        self.primer = snapshot
+        self.initialize_alphabet()
+        self.coder.forget_contexts()
+
+    def prime_context(self, context: Context) -> None:
+        """Copia para um contexto recém-criado as contagens do mesmo contexto no primer, se existir."""
+        primer = self.primer
+        index = primer.find(context.order, context.key)
+        if index >= 0:
+            context.counts = array('I', primer.counts(context.order, index).tobytes())
+            context.total = primer.total(context.order, index)
+            context.mask = primer.mask(context.order, index)
+
+    def get_memory_stats(self) -> Dict[str, int]:
+        """Retorna o número de contextos e os contadores das políticas de memória."""
+        return {
+            "contexts": self.n_contexts,
+            "max_contexts": self.max_contexts,
+            "evictions": self.evictions,
+            "restarts": self.restarts,
+            "halvings": self.halvings,
+        }
+
+    def current_context(self) -> str:
+        """Retorna os últimos k_max caracteres em ordem de leitura (contexto da próxima posição)."""
+        return ''.join(reversed(self.history))
+
+    def get_measurement(self, per_order: bool = False, code_lengths: bool = True) -> Dict[str, Any]:
+        """
+        Retorna os totais do modo de medição: caracteres, bits de código,
+        informação (-log2 p) e as médias por caractere. Com `per_order`,
+        inclui os mesmos totais separados por ordem k do contexto que codificou.
+        Sem `code_lengths` (medição só de -log2 p), os campos de bits de código
+        são omitidos.
+        """
+        n = self.measured_chars
+        info_bits = sum(self.info_bits)
+        measurement = {
+            "chars": n,
+            "info_bits": info_bits,
+            "entropy": info_bits / n if n else 0.0,
+        }
+        if code_lengths:
+            code_bits = sum(self.code_bits)
+            measurement["code_bits"] = code_bits
+            measurement["mean_code_length"] = code_bits / n if n else 0.0
+        if per_order:
+            measurement["per_order"] = {}
+            for k in range(-1, self.k_max + 1):
+                totals = {"info_bits": self.info_bits[k + 1], "events": self.coded_events[k + 1]}
+                if code_lengths:
+                    totals["code_bits"] = self.code_bits[k + 1]
+                measurement["per_order"][k] = totals
+        return measurement
 
     def get_probabilities(self, context_str: str, k: int) -> Dict[str, float]:
         """Calcula as probabilidades para um dado contexto."""
         context = self.get_context(k, context_str)
-        total_count = sum(context.char_counts.values())
-        return {char: count / total_count for char, count in context.char_counts.items()}
+        if context is None or not context.total:
+            return {}
+        return {char: count / context.total for char, count in context.char_counts.items()}
 
     def get_encoded_bits(self) -> List:
         """Retorna os bits codificados até o momento."""
@@ -0,0 +1,185 @@
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+
+# Formato do arquivo (little-endian, seções alinhadas em 8 bytes):
+#   cabeçalho  MAGIC, versão, k_max, número de símbolos, bytes da tabela de símbolos
+#   símbolos   em UTF-8: tabela id -> caractere, símbolo de escape e alfabeto do modelo
+#   índice     por ordem k = -1..k_max: (número de contextos, deslocamento da seção)
+#   seções     por ordem: chaves (uint64, ordenadas), totais (uint32),
+#              máscaras (uint64) e contagens (uint32, n_símbolos por contexto)
+MAGIC = b"PPMS"
+VERSION = 1
+HEADER = struct.Struct('<4sHHHH')
+ORDER_ENTRY = struct.Struct('<QQ')
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def save_snapshot(model, filename: str) -> None:
+    """
+    Congela um PPMModel em um snapshot binário: para cada ordem, as chaves dos
+    contextos ordenadas e as contagens em vetores planos. Ver ModelSnapshot.
+    """
+    with open(filename, 'wb') as file:
+        file.write(snapshot_bytes(model))
+
+
+def snapshot_bytes(model) -> bytes:
+    """Retorna o snapshot binário de um PPMModel (mesmo formato de save_snapshot)."""
+    symbols_bytes = (''.join(model.symbols) + model.esc_symbol + model.alphabet).encode('utf-8')
+    n_symbols = len(model.symbols)
+    orders = range(-1, model.k_max + 1)
+
+    sections = []
+    for k in orders:
+        # As chaves do modelo já são os inteiros do snapshot (base = número de símbolos)
+        contexts = sorted(model.structure[k].items())
+        keys = array('Q', [key for key, _ in contexts])
+        totals = array('I', [context.total for _, context in contexts])
+        masks = array('Q', [context.mask for _, context in contexts])
+        counts = array('I')
+        for _, context in contexts:
+            counts.extend(context.counts)
+        sections.append((len(contexts), [keys, totals, masks, counts]))
+
+    offset = _align(HEADER.size + len(symbols_bytes)) + ORDER_ENTRY.size * len(orders)
+    index = []
+    for n_contexts, arrays in sections:
+        offset = _align(offset)
+        index.append((n_contexts, offset))
+        offset += sum(_align(len(values) * values.itemsize) for values in arrays)
+
+    output = bytearray(HEADER.pack(MAGIC, VERSION, model.k_max, n_symbols, len(symbols_bytes)))
+    output += symbols_bytes
+    output += bytes(_align(len(output)) - len(output))
+    for n_contexts, section_offset in index:
+        output += ORDER_ENTRY.pack(n_contexts, section_offset)
+    for (_, arrays), (_, section_offset) in zip(sections, index):
+        output += bytes(section_offset - len(output))
+        for values in arrays:
+            data = values.tobytes()
+            output += data + bytes(_align(len(data)) - len(data))
+    return bytes(output)
+
+
+class ModelSnapshot:
+    """
+    Modelo PPM congelado, lido de um snapshot binário sem cópia.
+
+    O arquivo é mapeado com mmap e cada seção é exposta como memoryview
+    (cast para uint64/uint32), então carregar o modelo não lê nem converte as
+    contagens; processos que abrem o mesmo arquivo compartilham as páginas do
+    sistema operacional. Um ModelSnapshot serializado com pickle leva apenas o
+    nome do arquivo e é reaberto no processo de destino.
+    """
+
+    def __init__(self, buffer, filename: Optional[str] = None):
+        self.filename = filename
+        self.buffer = buffer
+        view = memoryview(buffer)
+        magic, version, k_max, n_symbols, symbols_size = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Arquivo não é um snapshot de modelo PPM")
+        if version != VERSION:
+            raise ValueError(f"Versão de snapshot não suportada: {version}")
+        self.k_max = k_max
+        self.n_symbols = n_symbols
+        table = bytes(view[HEADER.size:HEADER.size + symbols_size]).decode('utf-8')
+        self.symbols = tuple(table[:n_symbols])
+        self.esc_symbol = table[n_symbols]
+        self.symbol_ids = {char: index for index, char in enumerate(self.symbols)}
+        self.esc_id = self.symbol_ids[self.esc_symbol]
+        self.alphabet = table[n_symbols + 1:]
+
+        # Por ordem: (chaves, totais, máscaras, contagens)
+        self.orders: Dict[int, Tuple[memoryview, memoryview, memoryview, memoryview]] = {}
+        position = _align(HEADER.size + symbols_size)
+        for k in range(-1, k_max + 1):
+            n_contexts, offset = ORDER_ENTRY.unpack_from(view, position)
+            position += ORDER_ENTRY.size
+            sections = []
+            for fmt, length in (('Q', n_contexts), ('I', n_contexts), ('Q', n_contexts),
+                                ('I', n_contexts * n_symbols)):
+                size = length * struct.calcsize(fmt)
+                sections.append(view[offset:offset + size].cast(fmt))
+                offset += _align(size)
+            self.orders[k] = tuple(sections)
+
+    @classmethod
+    def load(cls, filename: str) -> "ModelSnapshot":
+        """Abre um snapshot com mmap (somente leitura)."""
+        with open(filename, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, filename)
+
+    @classmethod
+    def from_model(cls, model, filename: Optional[str] = None) -> "ModelSnapshot":
+        """Congela `model`; com `filename`, salva o snapshot em disco e o abre com mmap."""
+        if filename is None:
+            return cls(snapshot_bytes(model))
+        save_snapshot(model, filename)
+        return cls.load(filename)
+
+    def __getstate__(self):
+        if self.filename is None:
+            return {"data": bytes(self.buffer)}
+        return {"filename": self.filename}
+
+    def __setstate__(self, state):
+        if "filename" in state:
+            loaded = ModelSnapshot.load(state["filename"])
+        else:
+            loaded = ModelSnapshot(state["data"])
+        self.__dict__.update(loaded.__dict__)
+
+    def n_contexts(self, k: int) -> int:
+        """Número de contextos de ordem k."""
+        return len(self.orders[k][0])
+
+    def key(self, context: str) -> int:
+        """Chave inteira de uma string de contexto."""
+        value = 0
+        for char in context:
+            value = value * self.n_symbols + self.symbol_ids[char]
+        return value
+
+    def find(self, k: int, key: int) -> int:
+        """Índice do contexto de ordem k com a chave inteira `key`, ou -1 se não existir."""
+        keys = self.orders[k][0]
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            return index
+        return -1
+
+    def total(self, k: int, index: int) -> int:
+        return self.orders[k][1][index]
+
+    def mask(self, k: int, index: int) -> int:
+        return self.orders[k][2][index]
+
+    def counts(self, k: int, index: int) -> memoryview:
+        """Contagens (por id de símbolo) do contexto `index` de ordem k, sem cópia."""
+        start = index * self.n_symbols
+        return self.orders[k][3][start:start + self.n_symbols]
+
+    def char_counts(self, k: int, context: str = "") -> Dict[str, int]:
+        """Contagens de um contexto indexadas pelos caracteres (vazio se não existir)."""
+        index = self.find(k, self.key(context[-k:] if k > 0 else ""))
+        if index < 0:
+            return {}
+        counts = self.counts(k, index)
+        return {self.symbols[symbol]: counts[symbol] for symbol in range(self.n_symbols) if counts[symbol]}
+
+    def close(self) -> None:
+        """Libera o mapeamento do arquivo."""
+        for sections in self.orders.values():
+            for section in sections:
+                section.release()
+        self.orders = {}
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
@@ -0,0 +1,285 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+# Garante que os módulos possam ser encontrados diretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from ppm.models.ppm_model import PPMModel
+from ppm.models.snapshot import ModelSnapshot
+from ppm.processors.ppm_decoder import PPMDecoder
+
+# Formato do contêiner em blocos (little-endian):
+#   cabeçalho  MAGIC, versão, k_max, codificador, flags, tamanho do bloco,
+#              número de blocos e CRC32 do primer (0 sem primer)
+#   tabela     por bloco: deslocamento da carga no arquivo, caracteres e bytes
+#   cargas     saída do codificador de cada bloco, em sequência
+# Cada bloco é codificado com um modelo novo (vazio ou carregado do primer),
+# então blocos podem ser codificados e decodificados em qualquer ordem.
+MAGIC = b"PPMB"
+VERSION = 1
+HEADER = struct.Struct('<4sHHBBxxIII')
+BLOCK_ENTRY = struct.Struct('<QII')
+CODERS = ("huffman", "range")
+FLAG_PRIMER = 1
+
+# Snapshots de primer abertos (com mmap) em cada processo, por caminho
+_primers: Dict[str, ModelSnapshot] = {}
+
+
+class BlockHeader(NamedTuple):
+    k_max: int
+    coder: str
+    block_size: int
+    n_blocks: int
+    primer_crc: Optional[int]  # None quando os blocos partem do modelo vazio
+
+
+class BlockEntry(NamedTuple):
+    offset: int  # Posição da carga no contêiner
+    n_chars: int
+    n_bytes: int
+
+
+def primer_crc32(primer: str) -> int:
+    """CRC32 do arquivo de snapshot usado como primer (identifica o primer no contêiner)."""
+    with open(primer, 'rb') as file:
+        return zlib.crc32(file.read())
+
+
+def _load_primer(primer: Optional[str]) -> Optional[ModelSnapshot]:
+    if primer is None:
+        return None
+    snapshot = _primers.get(primer)
+    if snapshot is None:
+        snapshot = _primers[primer] = ModelSnapshot.load(primer)
+    return snapshot
+
+
+def _block_model(model: PPMModel, primer: Optional[str]) -> PPMModel:
+    # O primer não é reconstruído a cada bloco: o modelo consulta o snapshot
+    # (aberto uma vez por processo) só nos contextos que o bloco visita
+    snapshot = _load_primer(primer)
+    if snapshot is not None:
+        model.attach_primer(snapshot)
+    return model
+
+
+def encode_block(task: Tuple[str, int, str, Optional[str]]) -> bytes:
+    """Codifica um bloco (texto, k_max, codificador, primer) de forma independente."""
+    text, k_max, coder, primer = task
+    model = _block_model(PPMModel(k_max, coder=coder, keep_records=False), primer)
+    process_character = model.process_character
+    for char in text:
+        process_character(char)
+    return model.coder.finish()
+
+
+def _decode_payload(payload: bytes, n_chars: int, k_max: int, coder: str,
+                    snapshot: Optional[ModelSnapshot]) -> str:
+    decoder = PPMDecoder(k_max, coder=coder)
+    if snapshot is not None:
+        decoder.model.attach_primer(snapshot)
+    return decoder.decode_sequence(payload, n_chars)
+
+
+def decode_block(task: Tuple[bytes, int, int, str, Optional[str]]) -> str:
+    """Decodifica um bloco (carga, caracteres, k_max, codificador, primer)."""
+    payload, n_chars, k_max, coder, primer = task
+    return _decode_payload(payload, n_chars, k_max, coder, _load_primer(primer))
+
+
+def _map(function, tasks: List[Any], workers: Optional[int]) -> List[Any]:
+    """Aplica `function` às tarefas em um pool de processos (ou no próprio processo com workers=1)."""
+    if workers == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def split_blocks(text: str, block_size: int) -> List[str]:
+    """Divide o texto em blocos de `block_size` caracteres (o último pode ser menor)."""
+    return [text[start:start + block_size] for start in range(0, len(text), block_size)]
+
+
+def pack_container(k_max: int, coder: str, block_size: int, blocks: Iterable[Tuple[int, bytes]],
+                   primer_crc: Optional[int] = None) -> bytes:
+    """Monta o contêiner a partir de (caracteres, carga) de cada bloco."""
+    blocks = list(blocks)
+    flags = FLAG_PRIMER if primer_crc is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, k_max, CODERS.index(coder), flags, block_size,
+                         len(blocks), primer_crc or 0)
+    offset = HEADER.size + BLOCK_ENTRY.size * len(blocks)
+    table = bytearray()
+    for n_chars, payload in blocks:
+        table += BLOCK_ENTRY.pack(offset, n_chars, len(payload))
+        offset += len(payload)
+    return b''.join([header, bytes(table)] + [payload for _, payload in blocks])
+
+
+def read_block_table(data: bytes) -> Tuple[BlockHeader, List[BlockEntry]]:
+    """Lê o cabeçalho e a tabela de blocos de um contêiner."""
+    if len(data) < HEADER.size:
+        raise ValueError("Contêiner em blocos truncado")
+    magic, version, k_max, coder, flags, block_size, n_blocks, crc = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Arquivo não é um contêiner PPM em blocos")
+    if version != VERSION:
+        raise ValueError(f"Versão de contêiner não suportada: {version}")
+    header = BlockHeader(k_max, CODERS[coder], block_size, n_blocks, crc if flags & FLAG_PRIMER else None)
+    entries = [BlockEntry(*BLOCK_ENTRY.unpack_from(data, HEADER.size + index * BLOCK_ENTRY.size))
+               for index in range(n_blocks)]
+    if entries and entries[-1].offset + entries[-1].n_bytes > len(data):
+        raise ValueError("Contêiner em blocos truncado")
+    return header, entries
+
+
+def check_primer(header: BlockHeader, primer: Optional[str]) -> None:
+    """Confere se o primer informado é o mesmo usado na codificação do contêiner."""
+    if header.primer_crc is not None:
+        if primer is None:
+            raise ValueError("O contêiner foi codificado com primer; informe o snapshot")
+        if primer_crc32(primer) != header.primer_crc:
+            raise ValueError("O primer informado não é o usado na codificação")
+    elif primer is not None:
+        raise ValueError("O contêiner foi codificado sem primer")
+
+
+def encode_blocks(text: str, k_max: int = 2, coder: str = "huffman", block_size: int = 1 << 16,
+                  primer: Optional[str] = None, workers: Optional[int] = None) -> bytes:
+    """
+    Codifica o texto (já restrito ao alfabeto do modelo) em blocos
+    independentes de `block_size` caracteres, em paralelo, e retorna o
+    contêiner. Com `primer` (caminho de um snapshot salvo com save_snapshot,
+    mesmo k_max), cada bloco parte das contagens do primer em vez do modelo
+    vazio; o mesmo arquivo precisa ser passado a decode_blocks.
+    """
+    blocks = split_blocks(text, block_size)
+    payloads = _map(encode_block, [(block, k_max, coder, primer) for block in blocks], workers)
+    primer_crc = primer_crc32(primer) if primer is not None else None
+    return pack_container(k_max, coder, block_size, zip(map(len, blocks), payloads), primer_crc)
+
+
+def decode_blocks(data: bytes, primer: Optional[str] = None, workers: Optional[int] = None) -> str:
+    """Decodifica um contêiner de encode_blocks, com os blocos em paralelo."""
+    header, entries = read_block_table(data)
+    check_primer(header, primer)
+    view = memoryview(data)
+    tasks = [(bytes(view[entry.offset:entry.offset + entry.n_bytes]), entry.n_chars, header.k_max,
+              header.coder, primer) for entry in entries]
+    return ''.join(_map(decode_block, tasks, workers))
+
+
+class BlockReader:
+    """
+    Acesso aleatório a um contêiner em blocos: a tabela de blocos serve de
+    índice (posição no texto de cada bloco e deslocamento da carga), e
+    read(offset, length) decodifica apenas os blocos que cobrem o trecho, e
+    de cada um só até o último caractere pedido. O arquivo é aberto com mmap;
+    os últimos blocos decodificados ficam em cache para leituras vizinhas.
+    O primer é aberto uma vez, em __init__, e cada bloco só consulta os
+    contextos que visita (ver PPMModel.attach_primer).
+    """
+
+    def __init__(self, data: Any, primer: Optional[str] = None, cache_size: int = 4):
+        self.data = data
+        self.header, self.entries = read_block_table(data)
+        check_primer(self.header, primer)
+        self.primer = primer
+        self.snapshot = ModelSnapshot.load(primer) if primer is not None else None
+        # Posição no texto do início de cada bloco e, no fim, o total de caracteres
+        self.starts = [0] + list(accumulate(entry.n_chars for entry in self.entries))
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[int, str]" = OrderedDict()  # bloco -> prefixo decodificado
+
+    @classmethod
+    def open(cls, filename: str, primer: Optional[str] = None, cache_size: int = 4) -> "BlockReader":
+        """Abre um contêiner salvo em arquivo com mmap (somente leitura)."""
+        with open(filename, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, primer, cache_size)
+
+    def __len__(self) -> int:
+        return self.starts[-1]
+
+    def block_text(self, index: int, n_chars: int) -> str:
+        """Decodifica (ou lê do cache) ao menos os `n_chars` primeiros caracteres do bloco `index`."""
+        text = self.cache.get(index)
+        if text is None or len(text) < n_chars:
+            entry = self.entries[index]
+            payload = bytes(self.data[entry.offset:entry.offset + entry.n_bytes])
+            text = _decode_payload(payload, n_chars, self.header.k_max, self.header.coder, self.snapshot)
+            self.cache[index] = text
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.cache.move_to_end(index)
+        return text
+
+    def read(self, offset: int, length: int) -> str:
+        """Retorna `length` caracteres do texto original a partir de `offset`."""
+        if offset < 0 or length < 0:
+            raise ValueError("Posição e tamanho devem ser não negativos")
+        end = min(offset + length, len(self))
+        parts = []
+        index = bisect_right(self.starts, offset) - 1
+        while offset < end:
+            start = self.starts[index]
+            block_end = min(end, self.starts[index + 1])
+            parts.append(self.block_text(index, block_end - start)[offset - start:block_end - start])
+            offset = block_end
+            index += 1
+        return ''.join(parts)
+
+    def close(self) -> None:
+        """Libera o mapeamento do arquivo e o do primer."""
+        self.cache.clear()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def __enter__(self) -> "BlockReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def benchmark_blocks(text: str, block_sizes: Iterable[int], workers_list: Iterable[int] = (1, None),
+                     k_max: int = 2, coder: str = "huffman",
+                     primer: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Mede, para cada tamanho de bloco e número de processos, o custo em
+    compressão (bits por caractere) e os tempos de codificação e decodificação,
+    conferindo a ida e volta. workers=None usa todos os núcleos.
+    """
+    results = []
+    for block_size in block_sizes:
+        for workers in workers_list:
+            start = time.perf_counter()
+            data = encode_blocks(text, k_max, coder, block_size, primer, workers)
+            encode_time = time.perf_counter() - start
+            start = time.perf_counter()
+            decoded = decode_blocks(data, primer, workers)
+            decode_time = time.perf_counter() - start
+            results.append({
+                "block_size": block_size,
+                "workers": workers or os.cpu_count(),
+                "blocks": len(read_block_table(data)[1]),
+                "bytes": len(data),
+                "bits_per_char": len(data) * 8 / len(text) if text else 0.0,
+                "encode_time": encode_time,
+                "decode_time": decode_time,
+                "ok": decoded == text,
+            })
+    return results
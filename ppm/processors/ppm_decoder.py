@@ -1,216 +1,71 @@
-from typing import List, Dict, Tuple, Any
-from models.ppm_model import PPMModel
-from models.context import Context
-from utils.encoder import decodificar_ppm
-import math
-import string
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+import os
+import sys
+
+# Garante que os módulos possam ser encontrados diretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from ppm.models.ppm_model import PPMModel
+from ppm.utils.frames import read_frames
 
 class PPMDecoder:
     """Decodificador para o modelo PPM (Prediction by Partial Matching)."""
-    
-    def __init__(self, k_max: int = 2, verbose: bool = False):
+
+    def __init__(self, k_max: int = 2, verbose: bool = False, coder: Union[str, Any] = "huffman",
+                 max_contexts: Optional[int] = None, eviction: str = "lru",
+                 max_count: Optional[int] = None):
         """
         Inicializa o decodificador PPM.
+
+        O decodificador usa o mesmo PPMModel do codificador: os contextos são
+        percorridos e atualizados exatamente como na codificação, e apenas a
+        escolha do símbolo vem do codificador de entropia. O orçamento de
+        memória (max_contexts, eviction, max_count) precisa ser o mesmo usado
+        na codificação.
         """
         self.k_def = k_max
         self.verbose = verbose
-        self.esc_symbol = 'ç'  # Símbolo de escape (ro)
-        self.structure = {k: {} for k in range(-1, k_max + 1)}
-        self.ignore_chars = set()
-        self.discarded_chars = []
-        #self.alphabet = "abcd"
-        self.alphabet = string.ascii_lowercase + "_"
-        self.initialize_alphabet()
-    
-    def initialize_alphabet(self):
-        """Inicializa o alfabeto para k=-1, igual ao modelo."""
-        self.structure[-1]["NO_CONTEXT"] = Context()
-        for letra in self.alphabet:
-            self.structure[-1]["NO_CONTEXT"].add_character(letra)
-        ## self.structure[-1]["NO_CONTEXT"].add_character("_")
-
-    def get_context(self, k: int, context_str: str) -> Context:
-        """Retorna o contexto para um determinado k e string de contexto."""
-        context_key = context_str if context_str else "NO_CONTEXT"
-        if context_key not in self.structure[k]: # Se não existe o contexto, cria um novo
-            self.structure[k][context_key] = Context()
-        return self.structure[k][context_key]
-    
-    def decode_sequence(self, encoded_data: str) -> str:
-        """Decodifica uma sequência de bits concatenada."""
-        context_stack = []
-        cursor = 0
-        decoded_text = ""
-        num_chars = len(self.alphabet) ## +1 para o espaço
-        x_bits = math.ceil(math.log2(num_chars))
-        data = encoded_data[cursor:x_bits]
-        _ , decoded_char = decodificar_ppm(self.structure, -1, "NO_CONTEXT", data, {}, False)
-    
-        if not decoded_char:
-            raise ValueError("Erro ao decodificar o contexto")
-        
-        context = self.get_context(-1, "NO_CONTEXT")
-        context.remove_character(decoded_char)
-        
-        self.get_context(0, "NO_CONTEXT").add_character(decoded_char)
-        self.get_context(0, "NO_CONTEXT").add_character(self.esc_symbol)
-        
-        context_stack.append(decoded_char)
-        decoded_text += decoded_char
-        
-        # print(f"Contexto: {context_stack}")
-        k_max = min(len(context_stack), self.k_def)
-        cursor = x_bits
-
-        k = k_max
-        
-        tamanho_codigo = len(encoded_data)
-        cursor_end = cursor + 1
-        while cursor_end <= tamanho_codigo:
-            bit_atual = encoded_data[cursor:cursor_end]
+        self.model = PPMModel(k_max, verbose, coder, max_contexts=max_contexts,
+                              eviction=eviction, max_count=max_count)
+        self.esc_symbol = self.model.esc_symbol  # Símbolo de escape (ro)
+        self.structure = self.model.structure
+        self.alphabet = self.model.alphabet
 
-            if k > 0:
-                context_str = ''.join(context_stack[-1:-(k+1):-1])
-            else:
-                context_str = "NO_CONTEXT"
-            context = self.get_context(k, context_str)
-            if len(context.char_counts) > 0:
-                codes, decoded_char = decodificar_ppm(self.structure, k, context_str, bit_atual, self.ignore_chars, False)
-                if decoded_char == None:
-                    if k == -1:
-                        cursor_end += 1
-                        k = k_max
-                    else:   
-                        cursor_end += 1
-                else:
-                    for char, count in codes.items():
-                        if char != self.esc_symbol:
-                            self.ignore_chars.add(char)
-
-                if decoded_char == 'ç':
-                    bit_atual = ''
-                    k_max = k - 1
-                    k-=1
-                    if k > 0:
-                        context_str = ''.join(context_stack[-1:-(k+1):-1])
-                    else:
-                        context_str = "NO_CONTEXT"
-                    context = self.get_context(k, context_str)
-                    aux_dict = {c: count for c, count in context.char_counts.items() if c not in self.ignore_chars}
-                    while len(aux_dict) == 1:
-                        aux_char = next(iter(aux_dict.keys()))
-                        if aux_char == self.esc_symbol:
-                            k_max = k - 1
-                            k-=1
-                            if k > 0:
-                                context_str = ''.join(context_stack[-1:-(k+1):-1])
-                            else:
-                                context_str = "NO_CONTEXT"
-                            context = self.get_context(k, context_str)
-                            aux_dict = {c: count for c, count in context.char_counts.items() if c not in self.ignore_chars}
-                        elif aux_char != None:
-                            decoded_char = aux_char
-                            
-                            break
-                    k_max = k
-                    if decoded_char != 'ç' and len(aux_dict) == 1:
-                        pass
-                    else:
-                        cursor = cursor_end
-                        cursor_end = cursor + 1
+    def decode_sequence(self, encoded_data: Union[str, bytes], length: Optional[int] = None,
+                        padding_bits: int = 0) -> str:
+        """
+        Decodifica uma sequência codificada.
 
-                if decoded_char != None and decoded_char != 'ç':
-                    k_max = min(len(context_stack), self.k_def) 
-                    
-                    k = k_max
-                    
-                    while k > 0:
-                        context_str = ''.join(context_stack[-1:-(k+1):-1])
-                        context = self.get_context(k, context_str)
-                        if decoded_char not in context.char_counts:
-                            context.add_character(self.esc_symbol)
-                        context.add_character(decoded_char)
-                        if len(context.char_counts) == len(self.alphabet) + 1:
-                            context.remove_character(self.esc_symbol)
-                        
-                        '''
-                        if k-1 > 0:
-                            context_str = ''.join(context_stack[-1:-(k-1+1):-1])
-                        else:
-                            context_str = "NO_CONTEXT"
-                        context = self.get_context(k-1, context_str)
+        Args:
+            encoded_data: Bytes produzidos pelo codificador (com Huffman também
+                aceita a string de '0'/'1' do formato antigo)
+            length: Número de caracteres do texto original. Obrigatório para o
+                range coder; com Huffman, se omitido, decodifica até acabarem os bits.
+            padding_bits: Bits de preenchimento no fim do último byte
 
-                        if len(context.char_counts) == len(self.alphabet) + 1:
-                            context_str = ''.join(context_stack[-1:-(k+1):-1])
-                            context = self.get_context(k, context_str)
-                            context.remove_character(self.esc_symbol)
-                        '''
-                        
-                        k -= 1
+        Returns:
+            Texto decodificado
+        """
+        coder = self.model.coder
+        if length is None and coder.name != "huffman":
+            raise ValueError("O tamanho do texto é obrigatório para este codificador")
+        coder.start_decoding(encoded_data, padding_bits)
 
-                    if k == 0:
-                        context = self.get_context(k,"NO_CONTEXT") 
-                        if decoded_char not in context.char_counts:
-                            context.add_character(self.esc_symbol)
-                        context.add_character(decoded_char)
-                        if len(context.char_counts) == len(self.alphabet) + 1:
-                            context.remove_character(self.esc_symbol)
-                        #context.add_character(self.esc_symbol)
-                        #if len(context.char_counts) == len(self.alphabet) + 1:
-                        #    context.remove_character(self.esc_symbol)
-                        k -= 1
-                    if k == -1:
-                        context = self.get_context(k,"NO_CONTEXT")
-                        if decoded_char in context.char_counts:
-                            context.remove_character(decoded_char)
-                            '''
-                            if len(context.char_counts) == 0:    
-                                context = self.get_context(0,"NO_CONTEXT")
-                                context.remove_character(self.esc_symbol)
-                            else:
-                                context = self.get_context(0,"NO_CONTEXT")
-                                context.add_character(self.esc_symbol)
-                            '''
-                    '''
-                    if k == -1:
-                        context.remove_character(decoded_char)
-                        decoded_text += decoded_char
-                        if len(context.char_counts) == 0:
-                            context = self.get_context(0, "NO_CONTEXT")
-                            context.remove_character(self.esc_symbol)
-                            context.add_character(decoded_char)
-                            k+=1
-                        k+=1
-                    else:
-                        context.add_character(decoded_char)
-                        decoded_text += decoded_char
-                        if k > 0:
-                            length_context = len(context.char_counts)
-                            if length_context == len(self.alphabet) + 1:
-                                context.remove_character(self.esc_symbol)
-                        k+=1
-                    while k <= k_max:
-                        if k > 0:
-                            context_str = ''.join(context_stack[-1:-(k+1):-1])
-                        else:
-                            context_str = "NO_CONTEXT"
-                        context = self.get_context(k, context_str)
-                        context.add_character(decoded_char)
-                        context.add_character(self.esc_symbol)
-                        length_context = len(context.char_counts)
-                        if length_context == len(self.alphabet) + 1:
-                            context.remove_character(self.esc_symbol)
-                        k += 1
-                    '''
+        decoded_chars = []
+        while (len(decoded_chars) < length) if length is not None else coder.has_data():
+            decoded_chars.append(self.model.decode_character())
 
-                    decoded_text += decoded_char
-                    context_stack.append(decoded_char)
-                    bit_atual = ''
-                    self.ignore_chars.clear()
-                    cursor = cursor_end
-                    cursor_end = cursor + 1
-                    k = k_max
-            else:
-                k-=1
+        return ''.join(decoded_chars)
 
-        return  decoded_text
\ No newline at end of file
+    def decode_stream(self, source: Union[BinaryIO, Iterable[bytes]]) -> Iterator[str]:
+        """
+        Decodifica os quadros produzidos por PPMProcessor.encode_stream, lidos
+        de um arquivo binário ou de um iterável de bytes, e produz o texto de
+        cada quadro.
+        """
+        model = self.model
+        coder = model.coder
+        for n_symbols, payload in read_frames(source):
+            coder.start_decoding(payload)
+            yield ''.join([model.decode_character() for _ in range(n_symbols)])
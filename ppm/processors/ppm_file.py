@@ -0,0 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, TextIO, Tuple
+import os
+import sys
+
+# Garante que os módulos possam ser encontrados diretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from ppm.models.ppm_model import PPMModel
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.utils.file_format import (CHUNK_SIZE, CompressedHeader, load_compressed, pack_header, read_header,
+                                   read_payload, save_compressed, text_crc32)
+from ppm.utils.file_handler import FileHandler
+from ppm.utils.frames import FRAME_HEADER, iter_chunks
+
+# Extensão dos arquivos gerados por compress_files
+EXTENSION = ".ppm"
+
+
+def make_header(model: PPMModel, text: str, payload: bytes, bit_length: int) -> CompressedHeader:
+    """Cabeçalho do arquivo para `text`, codificado pelo `model` em `payload`."""
+    return CompressedHeader(model.k_max, model.coder.name, model.alphabet, model.esc_symbol, len(text),
+                            len(payload) * 8 - bit_length, len(payload), text_crc32(text))
+
+
+def check_header(header: CompressedHeader, model: PPMModel) -> None:
+    """Confere se o alfabeto e o escape do arquivo são os do modelo do decodificador."""
+    if header.alphabet != model.alphabet:
+        raise ValueError(f"Alfabeto do arquivo ({header.alphabet!r}) difere do modelo ({model.alphabet!r})")
+    if header.esc_symbol != model.esc_symbol:
+        raise ValueError(f"Símbolo de escape do arquivo ({header.esc_symbol!r}) difere do modelo "
+                         f"({model.esc_symbol!r})")
+
+
+def restrict_to_alphabet(model: PPMModel, text: str, drop_unknown: bool = False) -> Tuple[str, int]:
+    """
+    Confere se o texto está no alfabeto do modelo. Com `drop_unknown`, os
+    caracteres de fora são descartados (a descompressão não os recupera);
+    senão geram ValueError. Retorna (texto, caracteres descartados).
+    """
+    filtered = model.filter_text(text)
+    dropped = len(text) - len(filtered)
+    if dropped and not drop_unknown:
+        alphabet = set(model.alphabet)
+        unknown = next(char for char in text if char not in alphabet)
+        raise ValueError(f"{dropped} caracteres fora do alfabeto do modelo (o primeiro é {unknown!r}); "
+                         f"use drop_unknown (--drop-unknown) para descartá-los")
+    return filtered, dropped
+
+
+def compress_text(text: str, k_max: int = 2, coder: str = "huffman") -> Tuple[CompressedHeader, bytes]:
+    """Codifica um texto (já restrito ao alfabeto do modelo) e retorna (cabeçalho, carga)."""
+    model = PPMModel(k_max, coder=coder, keep_records=False)
+    process_character = model.process_character
+    for char in text:
+        process_character(char)
+    payload = model.coder.finish()
+    return make_header(model, text, payload, model.coder.bit_length()), payload
+
+
+def decompress_payload(header: CompressedHeader, payload: bytes) -> str:
+    """
+    Decodifica a carga com os parâmetros do cabeçalho e confere o número de
+    caracteres e o CRC32 do texto obtido.
+    """
+    decoder = PPMDecoder(header.k_max, coder=header.coder)
+    check_header(header, decoder.model)
+    text = decoder.decode_sequence(payload, header.n_chars, header.padding_bits)
+    if len(text) != header.n_chars or text_crc32(text) != header.crc:
+        raise ValueError("O texto decodificado não confere com o CRC32 do arquivo")
+    return text
+
+
+def compress_to_file(filename: str, output_filename: str, k_max: int = 2, coder: str = "huffman",
+                     drop_unknown: bool = False) -> Tuple[int, int]:
+    """
+    Comprime um arquivo de texto no formato de ppm.utils.file_format.
+    Caracteres fora do alfabeto do modelo geram ValueError, ou são
+    descartados com `drop_unknown` (ver restrict_to_alphabet). Retorna
+    (caracteres codificados, caracteres descartados).
+    """
+    try:
+        text, dropped = restrict_to_alphabet(PPMModel(k_max), FileHandler.read_file(filename), drop_unknown)
+    except ValueError as error:
+        raise ValueError(f"{filename}: {error}") from None
+    header, payload = compress_text(text, k_max, coder)
+    save_compressed(output_filename, header, payload)
+    return header.n_chars, dropped
+
+
+def decompress_from_file(filename: str, output_filename: Optional[str] = None) -> str:
+    """Descomprime um arquivo de compress_to_file e, se pedido, grava o texto em `output_filename`."""
+    text = decompress_payload(*load_compressed(filename))
+    if output_filename is not None:
+        FileHandler.write_file(output_filename, text)
+    return text
+
+
+def compress_stream(source: TextIO, output: BinaryIO, k_max: int = 2, coder: str = "huffman",
+                    chunk_size: int = CHUNK_SIZE, drop_unknown: bool = False) -> Tuple[int, int]:
+    """
+    Comprime um fluxo de texto (por exemplo, a entrada padrão) sem conhecer
+    seu tamanho: grava o cabeçalho de fluxo e, a cada `chunk_size`
+    caracteres lidos, um quadro (ver PPMProcessor.encode_stream). Caracteres
+    fora do alfabeto são tratados como em compress_to_file. Retorna
+    (caracteres codificados, caracteres descartados).
+    """
+    processor = PPMProcessor(k_max, coder=coder)
+    model = processor.model
+    output.write(pack_header(CompressedHeader(k_max, coder, model.alphabet, model.esc_symbol, 0, 0, 0, 0,
+                                              stream=True)))
+    n_chars = 0
+    dropped = 0
+
+    def chunks():
+        nonlocal dropped
+        for chunk in iter_chunks(source, chunk_size):
+            text, chunk_dropped = restrict_to_alphabet(model, chunk, drop_unknown)
+            dropped += chunk_dropped
+            yield text
+
+    for frame in processor.encode_stream(chunks()):
+        n_chars += FRAME_HEADER.unpack_from(frame)[0]
+        output.write(frame)
+    return n_chars, dropped
+
+
+def decompress_stream(source: BinaryIO, output: TextIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Descomprime um fluxo gravado por compress_stream ou um arquivo de
+    compress_to_file lido de `source` e escreve o texto em `output`, quadro a
+    quadro. Retorna o número de caracteres.
+    """
+    header = read_header(source)
+    if not header.stream:
+        text = decompress_payload(header, read_payload(source, header, chunk_size))
+        output.write(text)
+        return len(text)
+    decoder = PPMDecoder(header.k_max, coder=header.coder)
+    check_header(header, decoder.model)
+    n_chars = 0
+    for text in decoder.decode_stream(source):
+        n_chars += len(text)
+        output.write(text)
+    return n_chars
+
+
+def _compress_task(task: Tuple[str, str, int, str, bool]) -> int:
+    return compress_to_file(*task)[1]
+
+
+def _decompress_task(task: Tuple[str, str]) -> int:
+    return len(decompress_from_file(*task))
+
+
+def _output_name(filename: str, output_dir: Optional[str], old_suffix: str, new_suffix: str) -> str:
+    name = os.path.basename(filename)
+    if old_suffix and name.endswith(old_suffix):
+        name = name[:-len(old_suffix)]
+    if output_dir is None:
+        output_dir = os.path.dirname(filename)
+    return os.path.join(output_dir, name + new_suffix)
+
+
+def _run(function, tasks: List[tuple], workers: Optional[int]) -> List[int]:
+    if workers == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, tasks))
+
+
+def compress_files(filenames: Iterable[str], output_dir: Optional[str] = None, k_max: int = 2,
+                   coder: str = "huffman", workers: Optional[int] = None,
+                   drop_unknown: bool = False) -> List[Tuple[str, int]]:
+    """
+    Comprime vários arquivos de texto (de qualquer diretório) em `output_dir`,
+    um arquivo `<nome>.ppm` por entrada, em paralelo. Sem `output_dir`, cada
+    arquivo comprimido fica ao lado do original. Retorna, para cada entrada,
+    (caminho gerado, caracteres descartados) (ver compress_to_file).
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    filenames = list(filenames)
+    outputs = [_output_name(filename, output_dir, "", EXTENSION) for filename in filenames]
+    dropped = _run(_compress_task, [(filename, output, k_max, coder, drop_unknown)
+                                    for filename, output in zip(filenames, outputs)], workers)
+    return list(zip(outputs, dropped))
+
+
+def decompress_files(filenames: Iterable[str], output_dir: Optional[str] = None,
+                     workers: Optional[int] = None) -> List[str]:
+    """
+    Descomprime vários arquivos de compress_files em `output_dir` (removendo
+    a extensão .ppm) ou ao lado de cada arquivo, em paralelo. Retorna os
+    caminhos gerados.
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    filenames = list(filenames)
+    outputs = [_output_name(filename, output_dir, EXTENSION, "") for filename in filenames]
+    for filename, output in zip(filenames, outputs):
+        if os.path.abspath(filename) == os.path.abspath(output):
+            raise ValueError(f"A saída sobrescreveria a entrada: {filename}")
+    _run(_decompress_task, list(zip(filenames, outputs)), workers)
+    return outputs
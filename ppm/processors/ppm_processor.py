@@ -1,4 +1,5 @@
-from typing import List, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+import json
 import os
 import sys
 
@@ -7,13 +8,20 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
 
 from ppm.models.ppm_model import PPMModel
+from ppm.utils.frames import iter_chunks, pack_frame
 
 class PPMProcessor:
     """Gerencia o processamento do texto usando o modelo PPM."""
     
-    def __init__(self, k_max: int = 2, verbose: bool = False):
-        self.model = PPMModel(k_max, verbose)
-        self.discarded_chars = []  # Pilha de caracteres
+    def __init__(self, k_max: int = 2, verbose: bool = False, coder: Union[str, Any] = "huffman",
+                 max_contexts: Optional[int] = None, eviction: str = "lru",
+                 max_count: Optional[int] = None):
+        # max_contexts/eviction/max_count: orçamento de memória do modelo (ver PPMModel)
+        self.model = PPMModel(k_max, verbose, coder, max_contexts=max_contexts,
+                              eviction=eviction, max_count=max_count)
+        # Últimos k_max caracteres (mais recente primeiro); é o histórico do
+        # próprio modelo, de tamanho fixo, atualizado também na decodificação
+        self.discarded_chars = self.model.history
         self.encoded_sequence = []  # Sequência codificada
         self.verbose = verbose
     
@@ -25,22 +33,143 @@ class PPMProcessor:
     
     def process_character(self, char: str) -> None:
         """Processa um único caractere."""
-        # Processa o caractere no modelo
+        # Processa o caractere no modelo (que também atualiza a pilha de caracteres descartados)
         self.model.process_character(char, self.discarded_chars)
         
-        # Atualiza a pilha de caracteres descartados
-        self.discarded_chars.insert(0, char)
-        
-        if self.verbose:
-            # print("Array descartados:", self.discarded_chars)
-            pass
-        
-        # Limpa os caracteres ignorados
-        self.model.ignore_chars.clear()
-        
         # Atualiza a sequência codificada
         self.encoded_sequence = self.model.get_encoded_bits()
     
     def get_encoded_sequence(self) -> List[Any]:
         """Retorna a sequência codificada."""
-        return self.encoded_sequence 
\ No newline at end of file
+        return self.encoded_sequence
+
+    def train_text(self, text: str) -> None:
+        """
+        Apenas atualiza o modelo com o texto, sem codificar nem medir (por
+        exemplo, para treinar um modelo que depois será congelado).
+        """
+        model = self.model
+        update = model.update
+        symbol_id = model.symbol_id
+        for char in text:
+            update(symbol_id(char))
+
+    def start_trace(self, capacity: int = 1 << 16, filename: Optional[str] = None) -> Any:
+        """
+        Passa a registrar, para cada caractere processado (codificado ou
+        medido), os bits de código e -log2(p) exatos, a ordem que o codificou
+        e o número de escapes em um CodeTrace (na memória ou, com `filename`,
+        em um arquivo .npy). Requer NumPy.
+        """
+        from ppm.utils.trace import CodeTrace
+        self.model.trace = CodeTrace(capacity, filename)
+        return self.model.trace
+
+    def stop_trace(self) -> Any:
+        """Encerra o traço, ajusta-o ao tamanho do texto e o retorna."""
+        trace = self.model.trace
+        self.model.trace = None
+        if trace is not None:
+            trace.close()
+        return trace
+
+    def enable_stats(self, timers: bool = False) -> Any:
+        """
+        Liga os contadores do caminho de codificação (contextos criados,
+        contextos visitados, escapes e símbolos por ordem, códigos de Huffman
+        construídos e seus tamanhos) e, com `timers`, o tempo do codificador
+        por ordem, da construção dos códigos e da atualização do modelo.
+        """
+        from ppm.utils.stats import PPMStats
+        stats = PPMStats(self.model.k_max, timers)
+        self.model.stats = stats
+        self.model.coder.stats = stats
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de enable_stats (vazio se desligados), com o cache de códigos e a memória do modelo."""
+        stats = self.model.stats
+        if stats is None:
+            return {}
+        result = stats.as_dict()
+        cache = getattr(self.model.coder, 'cache', None)
+        if cache is not None:
+            result["codebook_cache"] = cache.stats()
+        result["memory"] = self.model.get_memory_stats()
+        return result
+
+    def dump_stats(self, filename: str, **extra: Any) -> None:
+        """Grava get_stats (mais os campos de `extra`, por exemplo a região) em um arquivo JSON."""
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump({**self.get_stats(), **extra}, file, indent=4, ensure_ascii=False)
+
+    def measure_text(self, text: str, per_order: bool = False, code_lengths: bool = True) -> Dict[str, Any]:
+        """
+        Processa o texto no modo de medição: o modelo é atualizado como na
+        codificação, mas só são acumulados os totais de bits de código e de
+        -log2(p) (ver PPMModel.get_measurement), sem escrever no codificador
+        nem guardar registros por símbolo. Com `code_lengths=False` só -log2(p)
+        é medido e o codificador não calcula tamanhos de código (no Huffman,
+        nenhuma tabela de comprimentos é construída).
+        """
+        model = self.model
+        model.measuring = True
+        model.measure_code_lengths = code_lengths
+        try:
+            for char in text:
+                model.process_character(char)
+                model.measured_chars += 1
+        finally:
+            model.measuring = False
+            model.measure_code_lengths = True
+        return model.get_measurement(per_order, code_lengths)
+
+    def measure_orders(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Avalia em uma única passada todas as ordens k = 0..k_max: para cada
+        uma, os bits de código e a informação que um modelo de ordem k teria
+        produzido, além do número de escapes (ver PPMModel.measure_orders).
+        """
+        model = self.model
+        if model.max_contexts is not None:
+            raise ValueError("A varredura de ordens não é compatível com max_contexts")
+        measure_orders = model.measure_orders
+        for char in text:
+            measure_orders(char)
+        return model.get_order_sweep()
+
+    def finish(self) -> bytes:
+        """Finaliza o codificador de entropia e retorna a saída codificada."""
+        return self.model.coder.finish()
+
+    def bit_length(self) -> int:
+        """Retorna a quantidade de bits produzida pelo codificador."""
+        return self.model.coder.bit_length() 
+
+    def encode_stream(self, source: Union[TextIO, Iterable[str]],
+                      chunk_size: int = 1 << 16) -> Iterator[bytes]:
+        """
+        Codifica um arquivo de texto (ou iterável de blocos de texto) e produz
+        um quadro de bytes por bloco.
+
+        O modelo continua de um bloco para o outro; apenas o codificador de
+        entropia é finalizado e reiniciado a cada quadro. Os registros por
+        símbolo não são guardados durante a codificação, de modo que a memória
+        depende do tamanho do modelo e do bloco, e não do texto. Os quadros são
+        lidos por PPMDecoder.decode_stream.
+        """
+        model = self.model
+        coder = model.coder
+        keep_records = model.keep_records
+        model.keep_records = False
+        try:
+            coder.start_encoding()
+            for chunk in iter_chunks(source, chunk_size):
+                if not chunk:
+                    continue
+                for char in chunk:
+                    model.process_character(char)
+                yield pack_frame(len(chunk), coder.finish())
+                coder.start_encoding()
+        finally:
+            model.keep_records = keep_records
@@ -0,0 +1,277 @@
+from typing import List, Union
+import os
+import sys
+
+import numpy as np
+
+# Garante que os módulos possam ser encontrados diretamente
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(current_dir)))
+
+from ppm.models.ppm_model import PPMModel
+from ppm.models.snapshot import ModelSnapshot
+
+# Posições avaliadas por vez (limita a memória das matrizes de contagens)
+BLOCK_SIZE = 1 << 16
+
+# Número de bits ligados de cada byte
+BYTE_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.int64)
+
+
+def mask_bits(masks: np.ndarray, n_bits: int) -> np.ndarray:
+    """Matriz booleana (máscaras x n_bits) com o bit i de cada máscara (uint64) na coluna i."""
+    as_bytes = masks.astype('<u8').view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, count=n_bits, bitorder='little').view(bool)
+
+
+def popcount(masks: np.ndarray, n_bits: int) -> np.ndarray:
+    """Número de bits ligados de cada máscara (uint64) com até `n_bits` bits."""
+    count = np.zeros(masks.shape, dtype=np.int64)
+    for shift in range(0, n_bits, 8):
+        count += BYTE_POPCOUNT[(masks >> np.uint64(shift)) & np.uint64(0xFF)]
+    return count
+
+
+def text_to_ids(text: str, symbols, alphabet: str) -> np.ndarray:
+    """
+    Converte o texto nos ids de símbolo do modelo, descartando caracteres fora
+    do alfabeto (como PPMApp.run), inclusive o símbolo de escape.
+    """
+    table_size = max(ord(char) for char in symbols) + 1
+    lookup = np.full(table_size, -1, dtype=np.int64)
+    for index, char in enumerate(symbols):
+        if char in alphabet:
+            lookup[ord(char)] = index
+    codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    codepoints = codepoints[codepoints < table_size]
+    ids = lookup[codepoints]
+    return ids[ids >= 0]
+
+
+def context_keys(ids: np.ndarray, k_max: int, base: int) -> List[np.ndarray]:
+    """
+    Chaves inteiras (mesma codificação do snapshot) do contexto de ordem k de
+    cada posição, para k = 0..k_max. Posições com menos de k caracteres
+    anteriores não têm contexto de ordem k (chave sem uso).
+    """
+    ids = ids.astype(np.uint64)
+    keys = [np.zeros(len(ids), dtype=np.uint64)]
+    weight = np.uint64(1)
+    for k in range(1, k_max + 1):
+        key = keys[-1].copy()
+        if len(ids) > k:
+            key[k:] += ids[:-k] * weight
+        keys.append(key)
+        weight *= np.uint64(base)
+    return keys
+
+
+class MultiPPMScorer:
+    """
+    Avalia textos com um ou mais modelos PPM congelados (ModelSnapshot), sem
+    atualizá-los, em uma única passada pelo texto.
+
+    O custo de cada caractere é o -log2 p exato do PPM com exclusão: descendo
+    de k_max até 0, cada contexto existente que não contém o caractere cobra o
+    escape e exclui seus símbolos, e o primeiro que o contém cobra o próprio
+    caractere. No contexto -1 o caractere custa log2 do número de símbolos do
+    alfabeto ainda não excluídos. Como os modelos não mudam, todas as posições
+    são avaliadas juntas, ordem por ordem, com numpy; os comprimentos sem
+    exclusão de cada contexto ficam pré-calculados em tabelas float32.
+
+    Os ids do texto e as chaves de contexto são calculados uma vez. Para cada
+    ordem, as chaves de todos os modelos são unidas em um único vetor ordenado
+    com o índice de cada modelo, de modo que uma busca por posição atende
+    todos os modelos, e as tabelas dos modelos ficam empilhadas, avaliadas
+    como pares (posição, modelo). Os modelos precisam ter a mesma tabela de
+    símbolos. Só a conversão do texto, as chaves e as buscas são
+    compartilhadas: o custo de cada par ainda cresce com o número de modelos
+    (em 100 mil caracteres com k=2 ou k=4, quatro modelos levam cerca de 2,7x
+    o tempo de um, e 1,5x menos que quatro PPMScorer separados).
+    """
+
+    def __init__(self, models: List[Union[ModelSnapshot, PPMModel, str]], names: List[str] = None):
+        snapshots = [self._snapshot(model) for model in models]
+        if not snapshots:
+            raise ValueError("Nenhum modelo para avaliar")
+        first = snapshots[0]
+        for snapshot in snapshots[1:]:
+            if snapshot.symbols != first.symbols or snapshot.alphabet != first.alphabet:
+                raise ValueError("Os modelos precisam ter o mesmo alfabeto e símbolo de escape")
+        self.snapshots = snapshots
+        self.names = list(names) if names is not None else [str(index) for index in range(len(snapshots))]
+        self.n_models = len(snapshots)
+        self.k_max = max(snapshot.k_max for snapshot in snapshots)
+        self.n_symbols = first.n_symbols
+        self.symbols = first.symbols
+        self.esc_id = first.esc_id
+        self.alphabet = first.alphabet
+        self.alphabet_size = len(first.alphabet)
+        self.alphabet_mask = sum(1 << first.symbol_ids[char] for char in first.alphabet)
+
+        # Por ordem k >= 0: chaves da união, índice (união x modelo) nas tabelas
+        # empilhadas (-1 se o modelo não tem o contexto), máscaras, totais,
+        # contagens e comprimentos (log2 total/contagem)
+        self.keys, self.rows, self.masks, self.totals, self.counts, self.code_lengths = [], [], [], [], [], []
+        for k in range(0, self.k_max + 1):
+            sections = [snapshot.orders[k] if k <= snapshot.k_max else None for snapshot in snapshots]
+            model_keys = [np.frombuffer(section[0], dtype=np.uint64) if section else
+                          np.zeros(0, dtype=np.uint64) for section in sections]
+            union = np.unique(np.concatenate(model_keys))
+            rows = np.full((len(union), self.n_models), -1, dtype=np.int64)
+            masks, totals_list, counts, code_lengths = [], [], [], []
+            offset = 0
+            for model, (section, keys) in enumerate(zip(sections, model_keys)):
+                rows[np.searchsorted(union, keys), model] = offset + np.arange(len(keys))
+                offset += len(keys)
+                if section is None:
+                    continue
+                model_counts = np.frombuffer(section[3], dtype=np.uint32).reshape(-1, self.n_symbols)
+                totals = np.frombuffer(section[1], dtype=np.uint32)
+                with np.errstate(divide='ignore'):
+                    code_lengths.append((np.log2(totals, dtype=np.float64)[:, None]
+                                         - np.log2(model_counts, dtype=np.float64)).astype(np.float32))
+                masks.append(np.frombuffer(section[2], dtype=np.uint64))
+                totals_list.append(totals.astype(np.int64))
+                counts.append(model_counts)
+            self.keys.append(union)
+            self.rows.append(rows)
+            self.masks.append(np.concatenate(masks) if masks else np.zeros(0, dtype=np.uint64))
+            self.totals.append(np.concatenate(totals_list) if totals_list else np.zeros(0, dtype=np.int64))
+            self.counts.append(np.concatenate(counts) if counts else
+                               np.zeros((0, self.n_symbols), dtype=np.uint32))
+            self.code_lengths.append(np.concatenate(code_lengths) if code_lengths else
+                                     np.zeros((0, self.n_symbols), dtype=np.float32))
+
+    @staticmethod
+    def _snapshot(model) -> ModelSnapshot:
+        if isinstance(model, str):
+            return ModelSnapshot.load(model)
+        if isinstance(model, ModelSnapshot):
+            return model
+        return ModelSnapshot.from_model(model)
+
+    def text_ids(self, text: str) -> np.ndarray:
+        """Ids dos caracteres do texto no alfabeto dos modelos."""
+        return text_to_ids(text, self.symbols, self.alphabet)
+
+    def code_lengths_for(self, ids: np.ndarray, keys: List[np.ndarray] = None) -> np.ndarray:
+        """Custo em bits de cada posição de `ids` em cada modelo (matriz posições x modelos)."""
+        if keys is None:
+            keys = context_keys(ids, self.k_max, self.n_symbols)
+        costs = np.empty((len(ids), self.n_models), dtype=np.float64)
+        for start in range(0, len(ids), BLOCK_SIZE):
+            end = min(start + BLOCK_SIZE, len(ids))
+            costs[start:end] = self._score_block(ids, keys, start, end)
+        return costs
+
+    def _score_block(self, ids: np.ndarray, keys: List[np.ndarray], start: int, end: int) -> np.ndarray:
+        n = end - start
+        n_models = self.n_models
+        positions = np.arange(start, end)
+        symbols = ids[start:end]
+        # Estado por par (posição, modelo), em vetores planos indexados por posição * n_modelos + modelo
+        cost = np.zeros(n * n_models, dtype=np.float64)
+        exclusion = np.zeros(n * n_models, dtype=np.uint64)
+        pending = np.ones(n * n_models, dtype=bool)
+        open_models = np.full(n, n_models, dtype=np.int64)  # Modelos ainda sem o caractere, por posição
+        esc_id = self.esc_id
+        esc_bit = np.uint64(1 << esc_id)
+        one = np.uint64(1)
+
+        for k in range(self.k_max, -1, -1):
+            union = self.keys[k]
+            if not len(union):
+                continue
+            selected = np.nonzero((positions >= k) & (open_models > 0))[0]
+            if not len(selected):
+                continue
+            # Uma busca por posição atende todos os modelos
+            query = keys[k][start:end][selected]
+            index = np.minimum(np.searchsorted(union, query), len(union) - 1)
+            found = union[index] == query
+            selected, index = selected[found], index[found]
+            table_rows = self.rows[k][index].ravel()
+            pairs = (selected[:, None] * n_models + np.arange(n_models)).ravel()
+            valid = (table_rows >= 0) & pending[pairs]
+            pairs, table_row = pairs[valid], table_rows[valid]
+            if not len(pairs):
+                continue
+
+            mask = self.masks[k][table_row]
+            excluded = exclusion[pairs]
+            candidates = mask & ~excluded
+            symbol = symbols[pairs // n_models]
+            hit = ((mask >> symbol.astype(np.uint64)) & one).astype(bool)
+            coded = np.where(hit, symbol, esc_id)
+
+            # Comprimento pela tabela; com exclusão, o total é recalculado sem os excluídos
+            length = self.code_lengths[k][table_row, coded].astype(np.float64)
+            with_exclusion = np.nonzero(excluded)[0]
+            if len(with_exclusion):
+                rows = table_row[with_exclusion]
+                counts = self.counts[k][rows]
+                # Total do contexto menos as contagens dos símbolos excluídos
+                total = self.totals[k][rows] - np.einsum(
+                    'ij,ij->i', mask_bits(excluded[with_exclusion], self.n_symbols), counts, dtype=np.int64)
+                length[with_exclusion] = np.log2(
+                    total / counts[np.arange(len(with_exclusion)), coded[with_exclusion]])
+            # Um único candidato é determinístico e não custa nada
+            several = (candidates & (candidates - one)) != 0
+            cost[pairs] += np.where(several, length, 0.0)
+
+            pending[pairs[hit]] = False
+            open_models -= np.bincount(pairs[hit] // n_models, minlength=n)
+            exclusion[pairs[~hit]] |= mask[~hit] & ~esc_bit
+
+        # Contexto -1: códigos equiprováveis entre os símbolos do alfabeto não excluídos
+        pairs = np.nonzero(pending)[0]
+        if len(pairs):
+            excluded = exclusion[pairs] & np.uint64(self.alphabet_mask)
+            remaining = self.alphabet_size - popcount(excluded, self.n_symbols)
+            cost[pairs] += np.log2(np.maximum(remaining, 1))
+        return cost.reshape(n, n_models)
+
+    def score_ids(self, ids: np.ndarray) -> np.ndarray:
+        """Comprimento total em bits da sequência de ids em cada modelo."""
+        return self.code_lengths_for(ids).sum(axis=0)
+
+    def score(self, text: str) -> np.ndarray:
+        """Comprimento total em bits do texto em cada modelo (sem atualizá-los)."""
+        return self.score_ids(self.text_ids(text))
+
+    def cross_entropy(self, text: str) -> np.ndarray:
+        """Bits por caractere do texto sob cada modelo congelado."""
+        ids = self.text_ids(text)
+        if not len(ids):
+            return np.zeros(self.n_models)
+        return self.score_ids(ids) / len(ids)
+
+    def classify(self, text: str) -> str:
+        """Nome do modelo que codifica o texto com menos bits."""
+        return self.names[int(np.argmin(self.score(text)))]
+
+
+class PPMScorer(MultiPPMScorer):
+    """Avaliação com um único modelo congelado (ver MultiPPMScorer)."""
+
+    def __init__(self, model: Union[ModelSnapshot, PPMModel, str]):
+        super().__init__([model])
+        self.snapshot = self.snapshots[0]
+
+    def code_lengths_for(self, ids: np.ndarray, keys: List[np.ndarray] = None) -> np.ndarray:
+        """Custo em bits de cada posição de `ids` (float64)."""
+        return super().code_lengths_for(ids, keys)[:, 0]
+
+    def score_ids(self, ids: np.ndarray) -> float:
+        """Comprimento total em bits da sequência de ids."""
+        return float(self.code_lengths_for(ids).sum())
+
+    def score(self, text: str) -> float:
+        """Comprimento total em bits do texto (sem atualizar o modelo)."""
+        return self.score_ids(self.text_ids(text))
+
+    def cross_entropy(self, text: str) -> float:
+        """Bits por caractere do texto sob o modelo congelado."""
+        ids = self.text_ids(text)
+        return self.score_ids(ids) / len(ids) if len(ids) else 0.0
@@ -0,0 +1,78 @@
+from typing import Optional
+
+
+class BitWriter:
+    """
+    Escreve códigos de tamanho variável em um bytearray.
+
+    Os bits pendentes ficam em um acumulador inteiro e são descarregados em
+    bytes completos, sem representar cada bit como caractere.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.accumulator = 0
+        self.pending_bits = 0  # Bits no acumulador ainda não descarregados
+        self.bit_length = 0  # Total de bits escritos
+
+    def write(self, code: int, length: int) -> None:
+        """Escreve os `length` bits menos significativos de `code` (MSB primeiro)."""
+        self.accumulator = (self.accumulator << length) | code
+        self.pending_bits += length
+        self.bit_length += length
+        if self.pending_bits >= 32:
+            self._flush_bytes()
+
+    def _flush_bytes(self) -> None:
+        n_bytes = self.pending_bits >> 3
+        self.pending_bits -= n_bytes << 3
+        self.buffer += (self.accumulator >> self.pending_bits).to_bytes(n_bytes, 'big')
+        self.accumulator &= (1 << self.pending_bits) - 1
+
+    def padding_bits(self) -> int:
+        """Quantidade de zeros necessária para completar o último byte."""
+        return -self.bit_length % 8
+
+    def getvalue(self) -> bytes:
+        """Retorna todos os bits escritos, com o último byte completado com zeros."""
+        self._flush_bytes()
+        data = bytes(self.buffer)
+        if self.pending_bits:
+            data += bytes([self.accumulator << (8 - self.pending_bits)])
+        return data
+
+
+class BitReader:
+    """Lê bits de um objeto bytes-like com peek/skip, sem expandi-lo em strings."""
+
+    def __init__(self, data: bytes, bit_length: Optional[int] = None):
+        self.data = data
+        self.bit_length = len(data) * 8 if bit_length is None else bit_length
+        self.position = 0  # Posição atual em bits
+
+    def peek(self, n: int) -> int:
+        """Retorna os próximos n bits como inteiro, completando com zeros após o fim."""
+        if not n:
+            return 0
+        start = self.position >> 3
+        offset = self.position & 7
+        n_bytes = (offset + n + 7) >> 3
+        chunk_bytes = self.data[start:start + n_bytes]
+        chunk = int.from_bytes(chunk_bytes, 'big') << ((n_bytes - len(chunk_bytes)) * 8)
+        return (chunk >> (n_bytes * 8 - offset - n)) & ((1 << n) - 1)
+
+    def skip(self, n: int) -> None:
+        """Avança n bits."""
+        if self.position + n > self.bit_length:
+            raise ValueError("Fim inesperado da sequência codificada")
+        self.position += n
+
+    def read(self, n: int) -> int:
+        """Lê e consome n bits."""
+        value = self.peek(n)
+        self.skip(n)
+        return value
+
+    def remaining(self) -> int:
+        """Quantidade de bits ainda não lidos."""
+        return self.bit_length - self.position
@@ -0,0 +1,150 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+Symbol = Union[str, int]
+
+# Bits indexados de uma vez na tabela de decodificação
+TABLE_BITS = 8
+
+
+def tie_break(symbol: Symbol) -> int:
+    """
+    Ordem de desempate entre folhas de mesma frequência ('ç' antes de 'a').
+    Ids inteiros (PPMModel.symbols) já seguem essa ordem e são usados diretamente.
+    """
+    return symbol if isinstance(symbol, int) else -ord(symbol)
+
+
+def huffman_code_lengths(frequency_dict: Dict[Symbol, int]) -> Dict[Symbol, int]:
+    """
+    Calcula o comprimento do código de cada símbolo com uma heap, em O(n log n).
+
+    A ordem da heap reproduz a de `stable_sort`: frequência crescente, folhas
+    antes de nós internos, folhas por ordem de `tie_break` e nós internos
+    pela ordem de criação, de modo que os comprimentos são os mesmos da
+    árvore original do projeto.
+    """
+    if len(frequency_dict) == 1:
+        return {char: 0 for char in frequency_dict}
+
+    # Folhas são os nós 0..n-1 e os nós internos recebem ids em ordem de criação
+    chars = list(frequency_dict)
+    n = len(chars)
+    if isinstance(chars[0], int):
+        # Ids já estão na ordem de desempate
+        heap = [(frequency_dict[char], 0, char, index) for index, char in enumerate(chars)]
+    else:
+        heap = [(frequency_dict[char], 0, -ord(char), index) for index, char in enumerate(chars)]
+    heapq.heapify(heap)
+    parent = [0] * (2 * n - 1)
+    node = n
+    while len(heap) > 1:
+        freq1, _, _, right = heapq.heappop(heap)
+        freq2, _, _, left = heapq.heappop(heap)
+        parent[right] = parent[left] = node
+        heapq.heappush(heap, (freq1 + freq2, 1, node, node))
+        node += 1
+
+    # Profundidade de cada nó, da raiz (último nó criado) para as folhas
+    depth = [0] * (2 * n - 1)
+    for index in range(2 * n - 3, -1, -1):
+        depth[index] = depth[parent[index]] + 1
+    return {char: depth[index] for index, char in enumerate(chars)}
+
+
+class CanonicalCodebook:
+    """
+    Código de Huffman canônico definido apenas pelos comprimentos.
+
+    Os códigos são atribuídos em ordem de (comprimento, símbolo). A
+    decodificação usa uma tabela de 2^TABLE_BITS entradas indexada pelos
+    próximos bits: códigos de até TABLE_BITS bits saem em uma única consulta
+    e os mais longos caem no caminho canônico por comprimento. A tabela só é
+    montada quando o código é reutilizado (por exemplo, vindo do cache); no
+    primeiro uso o caminho canônico é mais barato que montá-la.
+    """
+
+    def __init__(self, lengths: Dict[Symbol, int]):
+        self.lengths = lengths
+        ordered = sorted((length, char) for char, length in lengths.items())
+        self.symbols = [char for _, char in ordered]
+        self.max_length = ordered[-1][0] if ordered else 0
+        self.codes: Dict[Symbol, Tuple[int, int]] = {}
+        # Para cada comprimento: primeiro código, índice do primeiro símbolo e quantidade
+        self.first_code = [0] * (self.max_length + 1)
+        self.first_index = [0] * (self.max_length + 1)
+        self.count = [0] * (self.max_length + 1)
+        code = 0
+        previous_length = 0
+        for index, (length, char) in enumerate(ordered):
+            code <<= length - previous_length
+            if not self.count[length]:
+                self.first_code[length] = code
+                self.first_index[length] = index
+            self.count[length] += 1
+            self.codes[char] = (code, length)
+            code += 1
+            previous_length = length
+        self.table: Optional[List[Tuple[Optional[Symbol], int]]] = None
+        self.table_bits = 0
+        self.decodes = 0
+
+    @classmethod
+    def from_frequencies(cls, frequency_dict: Dict[Symbol, int]) -> "CanonicalCodebook":
+        """Constrói o código canônico de Huffman para as frequências."""
+        return cls(huffman_code_lengths(frequency_dict))
+
+    @classmethod
+    def equiprovable(cls, symbols: Iterable[Symbol]) -> "CanonicalCodebook":
+        """Códigos de comprimento fixo ceil(log2 n), na ordem dos símbolos."""
+        symbols = list(symbols)
+        length = math.ceil(math.log2(len(symbols))) if len(symbols) > 1 else 0
+        return cls({char: length for char in symbols})
+
+    def code_string(self, char: Symbol) -> str:
+        """Retorna o código de um símbolo como string de '0'/'1'."""
+        code, length = self.codes[char]
+        return format(code, f'0{length}b') if length else ''
+
+    def build_table(self) -> List[Tuple[Optional[Symbol], int]]:
+        """Monta a tabela de decodificação (símbolo, comprimento) por prefixo de TABLE_BITS."""
+        bits = min(self.max_length, TABLE_BITS)
+        table: List[Tuple[Optional[Symbol], int]] = [(None, 0)] * (1 << bits)
+        for char, (code, length) in self.codes.items():
+            if length <= bits:
+                start = code << (bits - length)
+                for index in range(start, start + (1 << (bits - length))):
+                    table[index] = (char, length)
+        self.table_bits = bits
+        self.table = table
+        return table
+
+    def decode(self, reader) -> Symbol:
+        """
+        Decodifica um símbolo de `reader`, que precisa oferecer peek(n) (próximos
+        n bits como inteiro, completados com zeros) e skip(n).
+        """
+        if self.table is None and self.decodes:
+            self.build_table()
+        self.decodes += 1
+        bits = self.table_bits
+        if self.table is not None:
+            char, length = self.table[reader.peek(bits)]
+            if char is not None:
+                reader.skip(length)
+                return char
+
+        # Caminho canônico para códigos maiores que a tabela
+        window = reader.peek(self.max_length)
+        for length in range(bits + 1, self.max_length + 1):
+            if not self.count[length]:
+                continue
+            code = window >> (self.max_length - length)
+            offset = code - self.first_code[length]
+            if 0 <= offset < self.count[length]:
+                reader.skip(length)
+                return self.symbols[self.first_index[length] + offset]
+        if not self.max_length:
+            return self.symbols[0]
+        raise ValueError("Código de Huffman inválido")
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CodebookCache:
+    """
+    Cache LRU de dicionários de códigos por contexto.
+
+    A chave principal é (ordem e chave do contexto, versão do contexto,
+    assinatura de exclusão), sem referências aos objetos de contexto: enquanto as contagens do contexto e os símbolos excluídos não mudam, o
+    mesmo dicionário de códigos é reaproveitado em vez de reconstruir a árvore.
+    Uma chave compartilhada opcional (as próprias frequências candidatas)
+    permite reaproveitar dicionários entre contextos com as mesmas contagens.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o dicionário em cache para a chave ou None."""
+        codebook = self.entries.get(key)
+        if codebook is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return codebook
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any],
+                     shared_key: Optional[Callable[[], Hashable]] = None) -> Any:
+        """
+        Retorna o dicionário da chave, procurando depois pela chave compartilhada
+        e, por fim, construindo-o com `build`. Conta um acerto ou uma falha por chamada.
+        """
+        codebook = self.entries.get(key)
+        if codebook is None and shared_key is not None:
+            content_key = shared_key()
+            codebook = self.entries.get(content_key)
+            if codebook is not None:
+                self.put(key, codebook)
+        if codebook is None:
+            self.misses += 1
+            codebook = build()
+            self.put(key, codebook)
+            if shared_key is not None:
+                self.put(content_key, codebook)
+        else:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return codebook
+
+    def put(self, key: Hashable, codebook: Any) -> None:
+        """Armazena um dicionário, descartando o menos usado recentemente se necessário."""
+        if self.max_size <= 0:
+            return
+        self.entries[key] = codebook
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove todas as entradas (os contadores são mantidos)."""
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Retorna acertos, falhas, tamanho atual e taxa de acerto do cache."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -2,6 +2,8 @@ import heapq
 import math
 from collections import defaultdict
 
+from ppm.models.context import NO_CONTEXT
+
 # class Node:
 #     def __init__(self, char, freq, order):
 #         self.char = char
@@ -72,38 +74,42 @@ def stable_sort(lst):
     return sorted(lst, key=lambda x: (x[1], x[0] is None, -ord(x[0]) if x[0] is not None else float('inf')))
 
 def build_huffman_tree(frequency_dict, verbose):
-    # Criar uma lista de nós e ordenar por frequência (crescendo), mantendo ordem alfabética
-    nodes = [(char, freq, Node(char, freq)) for char, freq in frequency_dict.items()]
-    nodes = stable_sort(nodes)  # Ordenação inicial
-    
-    #(f"Lista de nós antes da construção da árvore: {[f'({node[0]}, {node[1]})' for node in nodes]}")
-
-    while len(nodes) > 1:
-        # Pegamos os dois primeiros elementos (menores frequências)
-        (char1, freq1, right) = nodes.pop(0)
-        (char2, freq2, left) = nodes.pop(0)
+    # Heap com a mesma ordem de stable_sort: frequência crescente, folhas antes
+    # de nós internos, folhas por ordem alfabética ('ç' antes de 'a') e nós
+    # internos pela ordem de criação. Cada união custa O(log n).
+    heap = [(freq, 0, -ord(char), Node(char, freq)) for char, freq in frequency_dict.items()]
+    heapq.heapify(heap)
+    created = 0
+
+    while len(heap) > 1:
+        # Pegamos os dois menores elementos
+        (freq1, _, _, right) = heapq.heappop(heap)
+        (freq2, _, _, left) = heapq.heappop(heap)
 
         # Criamos um novo nó que agrupa os dois
         merged = Node(None, freq1 + freq2)
         merged.left = left
         merged.right = right
 
-        # Inserimos na posição correta para manter estabilidade
-        nodes.append((None, freq1 + freq2, merged))
-        nodes = stable_sort(nodes)  # Manter ordenação estável
+        heapq.heappush(heap, (freq1 + freq2, 1, created, merged))
+        created += 1
 
-        #print(f"Unindo '{char1}' e '{char2}' com frequências {freq1} e {freq2} para formar um nó com frequência {freq1 + freq2}")
-        #print(f"Lista de nós após união: {[f'({node[0]}, {node[1]})' for node in nodes]}")
-    
-    return nodes[0][2]  # Retorna a raiz da árvore
+    return heap[0][3]  # Retorna a raiz da árvore
 
 
-def generate_huffman_codes(node, prefix="", codebook={}):
-    if node is not None:
+def generate_huffman_codes(node, prefix="", codebook=None):
+    if codebook is None:
+        codebook = {}
+    # Percorre a árvore com uma pilha explícita em vez de recursão
+    stack = [(node, prefix)]
+    while stack:
+        node, prefix = stack.pop()
+        if node is None:
+            continue
         if node.char is not None:
             codebook[node.char] = prefix
-        generate_huffman_codes(node.left, prefix + "0", codebook)
-        generate_huffman_codes(node.right, prefix + "1", codebook)
+        stack.append((node.right, prefix + "1"))
+        stack.append((node.left, prefix + "0"))
     return codebook
 
 def huffman_encoding(frequency_dict, verbose=False):
@@ -114,18 +120,35 @@ def huffman_encoding(frequency_dict, verbose=False):
     codes = generate_huffman_codes(tree_root, "", {})
     return codes
 
+def structure_context(ppm_structure, k, context):
+    """
+    Contexto de ordem k da estrutura do modelo. `context` é a chave inteira
+    ou a string do contexto (convertida como em PPMModel.context_key, com os
+    símbolos guardados nos próprios contextos).
+    """
+    if k <= 0:
+        return ppm_structure[k][NO_CONTEXT]
+    if isinstance(context, str):
+        symbols = ppm_structure[-1][NO_CONTEXT].symbols
+        symbol_ids = {char: index for index, char in enumerate(symbols)}
+        key = 0
+        for char in context[-k:]:
+            key = key * len(symbols) + symbol_ids[char]
+        context = key
+    return ppm_structure[k][context]
+
 def codificar_ppm(ppm_structure, k, context, char, ignore_chars, verbose=False):
     # Implementação da decodificação PPM (não fornecida no código original)
     freq_dict = {}
         
     if k == -1:
 
-        contexts_dict = ppm_structure[k]["NO_CONTEXT"].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
         if len(contexts_dict) == 1:
             return None
         codes = equiprovable_huffman(contexts_dict)
     elif k == 0:
-        contexts_dict = ppm_structure[k]["NO_CONTEXT"].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
             
         freq_dict = {c: count for c, count in contexts_dict.items() if c not in ignore_chars}
             
@@ -135,7 +158,7 @@ def codificar_ppm(ppm_structure, k, context, char, ignore_chars, verbose=False):
 
         codes = huffman_encoding(freq_dict, verbose)
     else:
-        contexts_dict = ppm_structure[k][context].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
             
         freq_dict = {c: count for c, count in contexts_dict.items() if c not in ignore_chars}
         if len(freq_dict) == 1:
@@ -149,16 +172,16 @@ def decodificar_ppm(ppm_structure, k, context, code, ignore_chars, verbose=False
     freq_dict = {}
     
     if k == -1:
-        contexts_dict = ppm_structure[k]["NO_CONTEXT"].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
         codes = equiprovable_huffman(contexts_dict)
     elif k == 0:
-        contexts_dict = ppm_structure[k]["NO_CONTEXT"].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
 
         freq_dict = {c: count for c, count in contexts_dict.items() if c not in ignore_chars}
         
         codes = huffman_encoding(freq_dict, verbose)
     else:
-        contexts_dict = ppm_structure[k][context].char_counts
+        contexts_dict = structure_context(ppm_structure, k, context).char_counts
             
         freq_dict = {c: count for c, count in contexts_dict.items() if c not in ignore_chars}
         codes = huffman_encoding(freq_dict, verbose)
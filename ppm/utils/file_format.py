@@ -0,0 +1,131 @@
+import struct
+import zlib
+from typing import BinaryIO, NamedTuple, Tuple, Union
+
+# Formato do arquivo comprimido (little-endian):
+#   cabeçalho  MAGIC, versão, k_max, codificador, bits de preenchimento,
+#              tamanhos em bytes do alfabeto e do escape, caracteres do texto
+#              original, bytes da carga e CRC32 do texto original (UTF-8)
+#   alfabeto   símbolos do modelo em UTF-8, seguidos do símbolo de escape
+#   carga      saída do codificador de entropia
+# O arquivo descreve sozinho como foi codificado: o decodificador não
+# precisa receber k_max, codificador nem preenchimento por fora.
+# Na codificação em fluxo (STREAM_MAGIC) o tamanho do texto não é conhecido
+# de antemão: o cabeçalho leva zeros nos campos de tamanho e CRC e é seguido
+# pelos quadros de ppm.utils.frames até o fim do arquivo.
+MAGIC = b"PPMF"
+STREAM_MAGIC = b"PPMT"  # PPMS é o snapshot do modelo (ppm.models.snapshot)
+VERSION = 1
+HEADER = struct.Struct('<4sHHBBHHQQI')
+CODERS = ("huffman", "range")
+CHUNK_SIZE = 1 << 16
+
+
+class CompressedHeader(NamedTuple):
+    k_max: int
+    coder: str
+    alphabet: str
+    esc_symbol: str
+    n_chars: int  # Caracteres do texto original
+    padding_bits: int  # Bits de preenchimento no fim do último byte da carga
+    payload_size: int
+    crc: int  # CRC32 do texto original em UTF-8
+    stream: bool = False  # Se True, a carga são quadros (ver STREAM_MAGIC)
+
+
+def text_crc32(text: str) -> int:
+    """CRC32 do texto em UTF-8 (conferido após a decodificação)."""
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def pack_header(header: CompressedHeader) -> bytes:
+    """Serializa o cabeçalho, incluindo alfabeto e escape."""
+    if header.coder not in CODERS:
+        raise ValueError(f"Codificador desconhecido: {header.coder}")
+    if not 0 <= header.padding_bits < 8:
+        raise ValueError(f"Bits de preenchimento inválidos: {header.padding_bits}")
+    alphabet = header.alphabet.encode('utf-8')
+    esc_symbol = header.esc_symbol.encode('utf-8')
+    magic = STREAM_MAGIC if header.stream else MAGIC
+    return HEADER.pack(magic, VERSION, header.k_max, CODERS.index(header.coder), header.padding_bits,
+                       len(alphabet), len(esc_symbol), header.n_chars, header.payload_size,
+                       header.crc) + alphabet + esc_symbol
+
+
+def _read_exact(source: BinaryIO, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("Arquivo comprimido truncado")
+    return data
+
+
+def read_header(source: BinaryIO) -> CompressedHeader:
+    """Lê e valida o cabeçalho no início de um arquivo binário aberto."""
+    fields = HEADER.unpack(_read_exact(source, HEADER.size))
+    magic, version, k_max, coder, padding_bits, alphabet_size, esc_size, n_chars, payload_size, crc = fields
+    if magic not in (MAGIC, STREAM_MAGIC):
+        raise ValueError("Arquivo não é um arquivo PPM comprimido")
+    if version != VERSION:
+        raise ValueError(f"Versão de arquivo não suportada: {version}")
+    if coder >= len(CODERS):
+        raise ValueError(f"Codificador desconhecido no cabeçalho: {coder}")
+    if padding_bits >= 8:
+        raise ValueError(f"Bits de preenchimento inválidos: {padding_bits}")
+    alphabet = _read_exact(source, alphabet_size).decode('utf-8')
+    esc_symbol = _read_exact(source, esc_size).decode('utf-8')
+    return CompressedHeader(k_max, CODERS[coder], alphabet, esc_symbol, n_chars, padding_bits,
+                            payload_size, crc, magic == STREAM_MAGIC)
+
+
+def read_payload(source: BinaryIO, header: CompressedHeader, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """
+    Lê a carga logo após o cabeçalho, em blocos de `chunk_size` direto em um
+    buffer pré-alocado. Falha se a carga estiver truncada ou houver bytes
+    sobrando no fim do arquivo.
+    """
+    if header.stream:
+        raise ValueError("Arquivo codificado em fluxo: a carga são quadros (ver read_frames)")
+    payload = bytearray(header.payload_size)
+    view = memoryview(payload)
+    position = 0
+    while position < header.payload_size:
+        n = source.readinto(view[position:position + chunk_size])
+        if not n:
+            raise ValueError("Arquivo comprimido truncado")
+        position += n
+    if source.read(1):
+        raise ValueError("Dados extras após a carga do arquivo comprimido")
+    return bytes(payload)
+
+
+def write_compressed(output: BinaryIO, header: CompressedHeader, payload: bytes,
+                     chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Grava cabeçalho e carga em um arquivo binário aberto, a carga em fatias
+    de `chunk_size` (sem cópias). Retorna o número de bytes gravados.
+    """
+    if header.payload_size != len(payload):
+        raise ValueError("O tamanho da carga não confere com o cabeçalho")
+    data = pack_header(header)
+    output.write(data)
+    view = memoryview(payload)
+    for start in range(0, len(view), chunk_size):
+        output.write(view[start:start + chunk_size])
+    return len(data) + len(payload)
+
+
+def save_compressed(filename: str, header: CompressedHeader, payload: bytes,
+                    chunk_size: int = CHUNK_SIZE) -> int:
+    """Grava um arquivo comprimido (ver write_compressed)."""
+    with open(filename, 'wb', buffering=chunk_size) as output:
+        return write_compressed(output, header, payload, chunk_size)
+
+
+def load_compressed(source: Union[str, BinaryIO],
+                    chunk_size: int = CHUNK_SIZE) -> Tuple[CompressedHeader, bytes]:
+    """Lê um arquivo comprimido (caminho ou arquivo aberto) e retorna (cabeçalho, carga)."""
+    if isinstance(source, str):
+        with open(source, 'rb', buffering=chunk_size) as file:
+            return load_compressed(file, chunk_size)
+    header = read_header(source)
+    return header, read_payload(source, header, chunk_size)
@@ -0,0 +1,50 @@
+import struct
+from typing import BinaryIO, Iterable, Iterator, Tuple, Union
+
+# Cabeçalho de cada quadro: número de símbolos e tamanho da carga em bytes
+FRAME_HEADER = struct.Struct('>II')
+
+
+def pack_frame(n_symbols: int, payload: bytes) -> bytes:
+    """Monta um quadro (cabeçalho + bytes do codificador) para `n_symbols` símbolos."""
+    return FRAME_HEADER.pack(n_symbols, len(payload)) + payload
+
+
+def iter_chunks(source: Union[BinaryIO, Iterable], chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Percorre os blocos de uma fonte: objetos com read() são lidos em blocos de
+    `chunk_size`; qualquer outro iterável (lista de strings, gerador, ...) é
+    repassado como está.
+    """
+    read = getattr(source, 'read', None)
+    if read is None:
+        yield from source
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_frames(source: Union[BinaryIO, Iterable[bytes]]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Lê quadros em sequência de um arquivo binário ou de um iterável de bytes
+    (divididos em qualquer ponto) e produz (n_símbolos, carga).
+    """
+    buffer = bytearray()
+    position = 0
+    for chunk in iter_chunks(source):
+        buffer += chunk
+        while len(buffer) - position >= FRAME_HEADER.size:
+            n_symbols, n_bytes = FRAME_HEADER.unpack_from(buffer, position)
+            end = position + FRAME_HEADER.size + n_bytes
+            if end > len(buffer):
+                break
+            yield n_symbols, bytes(buffer[position + FRAME_HEADER.size:end])
+            position = end
+        # Descarta o que já foi consumido para manter o buffer do tamanho de um quadro
+        del buffer[:position]
+        position = 0
+    if buffer:
+        raise ValueError("Quadro incompleto no fim da sequência codificada")
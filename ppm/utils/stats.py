@@ -0,0 +1,65 @@
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+
+class PPMStats:
+    """
+    Contadores (e, opcionalmente, cronômetros) do caminho de codificação.
+
+    Ligados com PPMProcessor.enable_stats; enquanto `PPMModel.stats` é None o
+    modelo e o codificador apenas testam o atributo. Os vetores por ordem são
+    indexados por k+1 (k = -1..k_max), como no modo de medição.
+    """
+
+    def __init__(self, k_max: int, timers: bool = False):
+        self.k_max = k_max
+        self.timers = timers  # Se True, mede também o tempo de cada etapa
+        self.chars = 0  # Caracteres processados
+        self.contexts_created = 0  # Contextos criados na trie (ordem >= 1)
+        self.lookups = [0] * (k_max + 2)  # Contextos visitados por ordem
+        self.escapes = [0] * (k_max + 2)  # Escapes por ordem
+        self.coded = [0] * (k_max + 2)  # Símbolos codificados por ordem
+        self.deterministic = [0] * (k_max + 2)  # Eventos com um único candidato (nada emitido)
+        self.huffman_builds = 0  # Códigos de Huffman construídos (falhas do cache)
+        self.codebook_sizes = Counter()  # Número de candidatos -> códigos construídos
+        # Tempos em segundos (só com timers): codificador por ordem, construção
+        # dos códigos de Huffman e atualização do modelo
+        self.encode_time = [0.0] * (k_max + 2)
+        self.build_time = 0.0
+        self.update_time = 0.0
+
+    def record_build(self, n_symbols: int, start: Optional[float] = None) -> None:
+        """Registra a construção de um código com `n_symbols` símbolos (iniciada em `start`)."""
+        self.huffman_builds += 1
+        self.codebook_sizes[n_symbols] += 1
+        if start is not None:
+            self.build_time += perf_counter() - start
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Retorna os contadores em um dicionário serializável (chaves das ordens como texto)."""
+        orders = range(-1, self.k_max + 1)
+        stats = {
+            "chars": self.chars,
+            "contexts_created": self.contexts_created,
+            "huffman_builds": self.huffman_builds,
+            "codebook_sizes": {str(size): count for size, count in sorted(self.codebook_sizes.items())},
+            "per_order": {
+                str(k): {
+                    "lookups": self.lookups[k + 1],
+                    "escapes": self.escapes[k + 1],
+                    "coded": self.coded[k + 1],
+                    "deterministic": self.deterministic[k + 1],
+                }
+                for k in orders
+            },
+        }
+        if self.timers:
+            for k in orders:
+                stats["per_order"][str(k)]["encode_time"] = self.encode_time[k + 1]
+            stats["time"] = {
+                "encode": sum(self.encode_time),
+                "huffman_build": self.build_time,
+                "update": self.update_time,
+            }
+        return stats
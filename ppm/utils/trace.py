@@ -0,0 +1,113 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+# Registro por posição do texto: bits do código (símbolo e escapes), -log2(p)
+# exato, ordem do contexto que codificou o símbolo e número de escapes
+TRACE_DTYPE = np.dtype([
+    ("code_bits", "<f4"),
+    ("info_bits", "<f4"),
+    ("order", "i1"),
+    ("escapes", "u1"),
+])
+
+
+class CodeTrace:
+    """
+    Traço por símbolo da codificação (ou medição), em um vetor estruturado
+    pré-alocado (TRACE_DTYPE) na memória ou em um arquivo .npy mapeado com
+    np.memmap.
+
+    Ao contrário dos registros de PPMModel.encoded_bits, os valores não são
+    arredondados e o traço pode ser salvo e fatiado: qualquer prefixo, janela
+    ou tamanho de lote das métricas sai de uma soma acumulada, sem codificar
+    o texto de novo. O vetor dobra de tamanho quando a capacidade acaba.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, filename: Optional[str] = None):
+        self.filename = filename
+        self.n = 0
+        self.records = self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int, filename: Optional[str] = None) -> np.ndarray:
+        filename = filename or self.filename
+        if filename is None:
+            return np.zeros(capacity, dtype=TRACE_DTYPE)
+        return np.lib.format.open_memmap(filename, mode='w+', dtype=TRACE_DTYPE, shape=(capacity,))
+
+    def _resize(self, capacity: int) -> None:
+        """Realoca o vetor com outra capacidade (no arquivo, via cópia e troca)."""
+        if self.filename is None:
+            records = self._allocate(capacity)
+            records[:self.n] = self.records[:self.n]
+            self.records = records
+            return
+        temporary = self.filename + ".tmp"
+        records = self._allocate(capacity, temporary)
+        records[:self.n] = self.records[:self.n]
+        records.flush()
+        del records
+        self.records.flush()
+        self.records = None
+        os.replace(temporary, self.filename)
+        self.records = np.load(self.filename, mmap_mode='r+')
+
+    def append(self, code_bits: float, info_bits: float, order: int, escapes: int) -> None:
+        """Registra a próxima posição do texto."""
+        if self.n == len(self.records):
+            self._resize(2 * len(self.records))
+        self.records[self.n] = (code_bits, info_bits, order, escapes)
+        self.n += 1
+
+    def __len__(self) -> int:
+        return self.n
+
+    def view(self) -> np.ndarray:
+        """Registros preenchidos (sem cópia)."""
+        return self.records[:self.n]
+
+    def cumulative(self, field: str = "code_bits") -> np.ndarray:
+        """Soma acumulada (float64) de um campo, com 0 na frente: bits das posições i..j = c[j] - c[i]."""
+        return np.concatenate(([0.0], np.cumsum(self.view()[field], dtype=np.float64)))
+
+    def prefix_mean(self, n: int, field: str = "code_bits") -> float:
+        """Média por caractere de um campo nas n primeiras posições."""
+        n = min(n, self.n)
+        return float(self.cumulative(field)[n] / n) if n else 0.0
+
+    def batch_means(self, batch_size: int, field: str = "code_bits") -> np.ndarray:
+        """Média por caractere em lotes consecutivos de `batch_size` posições (o resto é ignorado)."""
+        cumulative = self.cumulative(field)[::batch_size]
+        return np.diff(cumulative) / batch_size
+
+    def window_means(self, window: int, field: str = "code_bits") -> np.ndarray:
+        """Média por caractere em janelas deslizantes de `window` posições."""
+        cumulative = self.cumulative(field)
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    def order_counts(self, k_max: int) -> np.ndarray:
+        """Número de símbolos codificados em cada ordem k = -1..k_max (índice k+1)."""
+        return np.bincount(self.view()["order"].astype(np.int64) + 1, minlength=k_max + 2)
+
+    def close(self) -> None:
+        """Ajusta o vetor ao número de posições registradas e grava o arquivo, se houver."""
+        if len(self.records) != self.n:
+            if self.n == 0 and self.filename is not None:
+                # np.memmap não mapeia arquivos vazios
+                self.records = None
+                np.save(self.filename, np.zeros(0, dtype=TRACE_DTYPE))
+                self.records = np.zeros(0, dtype=TRACE_DTYPE)
+                return
+            self._resize(self.n)
+        if self.filename is not None:
+            self.records.flush()
+
+    @staticmethod
+    def load(filename: str) -> "CodeTrace":
+        """Abre um traço salvo (somente leitura, com mmap)."""
+        trace = CodeTrace.__new__(CodeTrace)
+        trace.filename = filename
+        trace.records = np.load(filename, mmap_mode='r')
+        trace.n = len(trace.records)
+        return trace
@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.processors.ppm_scorer import MultiPPMScorer
+from ppm.models.snapshot import save_snapshot
+
+# Constants for the analysis
+REGIONS = ["nordeste", "norte", "sul", "sudeste"]
+RESULTS_DIR = "results/ppm_cross_entropy"
+
+def load_text(filepath):
+    """Load text from a file."""
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return file.read()
+
+def batch_files(region, split_type, batch_limit=None, db_root="db"):
+    """Return the batch files of a region split, ordered by batch number."""
+    split_path = Path(db_root) / region / "splits" / split_type
+    files = sorted(split_path.glob(f"{split_type}_batch_*.txt"),
+                   key=lambda path: int(path.stem.rsplit("_", 1)[-1]))
+    return files[:batch_limit] if batch_limit else files
+
+def train_region_model(region, k_max=3, split_type="train", batch_limit=None, db_root="db",
+                       snapshot_dir=RESULTS_DIR):
+    """
+    Train an adaptive PPM model on a region's split and freeze it into a
+    binary snapshot. Returns the snapshot path.
+    """
+    processor = PPMProcessor(k_max)
+    model = processor.model
+    files = batch_files(region, split_type, batch_limit, db_root)
+    print(f"Training {region} model (k={k_max}) on {len(files)} {split_type} batches...")
+    for filepath in files:
+        processor.train_text(model.filter_text(load_text(filepath)))
+
+    ensure_dir(snapshot_dir)
+    snapshot_path = os.path.join(snapshot_dir, f"{region}_k{k_max}.snap")
+    save_snapshot(model, snapshot_path)
+    return snapshot_path
+
+def cross_entropy_matrix(regions=REGIONS, k_max=3, train_split="train", test_split="test",
+                         train_batch_limit=None, test_batch_limit=None, db_root="db"):
+    """
+    Score every test batch of every region with the frozen model of every
+    region.
+
+    Returns a DataFrame with one row per (target_region, target_file) and one
+    column per source (model) region, holding bits per character, plus the
+    region x region matrix of average cross-entropies.
+    """
+    snapshot_paths = [train_region_model(region, k_max, train_split, train_batch_limit, db_root)
+                      for region in regions]
+    # All regional models are scored in a single pass over each test batch
+    scorer = MultiPPMScorer(snapshot_paths, names=regions)
+
+    rows = []
+    for target_region in regions:
+        for filepath in batch_files(target_region, test_split, test_batch_limit, db_root):
+            cross_entropies = scorer.cross_entropy(load_text(filepath))
+            row = {"target_region": target_region, "target_file": filepath.name}
+            row.update(zip(regions, cross_entropies))
+            rows.append(row)
+
+    batch_matrix = pd.DataFrame(rows)
+    region_matrix = batch_matrix.groupby("target_region")[list(regions)].mean().reindex(regions)
+    return batch_matrix, region_matrix
+
+def ensure_dir(directory):
+    """Make sure a directory exists, creating it if necessary"""
+    os.makedirs(directory, exist_ok=True)
+
+if __name__ == "__main__":
+    K_MAX = 3
+
+    batch_matrix, region_matrix = cross_entropy_matrix(k_max=K_MAX)
+
+    ensure_dir(RESULTS_DIR)
+    batch_matrix.to_csv(f"{RESULTS_DIR}/batch_cross_entropy_k{K_MAX}.csv", index=False)
+    region_matrix.to_csv(f"{RESULTS_DIR}/cross_entropy_matrix_k{K_MAX}.csv")
+
+    # Fraction of test batches whose lowest cross-entropy model is their own region
+    predicted = batch_matrix[REGIONS].astype(float).idxmin(axis=1)
+    accuracy = np.mean(predicted == batch_matrix["target_region"])
+
+    print("\nCross-Entropy Matrix (rows: target region, columns: model region):")
+    print(region_matrix)
+    print(f"\nRegion classification accuracy: {accuracy:.3f}")
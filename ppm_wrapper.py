@@ -1,62 +1,211 @@
+import hashlib
 import os
 import sys
-import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Adiciona o diretório raiz ao PATH para importações
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Compressor de cada processo do pool (criado uma vez por processo, ver _init_worker)
+_worker_compressor = None
+
+# Número máximo de textos memorizados por PPMCompressor (por resumo, não pelo texto)
+CACHE_SIZE = 1 << 16
+
+
+def text_digest(text):
+    """Resumo de 16 bytes de um texto (str ou bytes), usado como chave das memórias."""
+    data = text.encode('utf-8') if isinstance(text, str) else bytes(text)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _init_worker(k_max, coder):
+    """Inicializa o compressor reutilizado por um processo do pool."""
+    global _worker_compressor
+    _worker_compressor = PPMCompressor(k_max, coder)
+
+
+def _compress_size_worker(filtered_text):
+    """Comprime um texto já filtrado em um processo do pool e retorna o tamanho."""
+    compressed, bits = _worker_compressor.compress_filtered(filtered_text)
+    return len(compressed), bits
+
 
 class PPMCompressor:
     """
     Wrapper para o compressor PPM que encapsula as importações problemáticas
     e fornece uma interface limpa para compressão de textos.
+
+    A compressão é feita em memória. Os tamanhos comprimidos são memorizados,
+    pois nas varreduras de NCD o mesmo texto é comprimido muitas vezes; as
+    memórias guardam só resumos dos textos (ver text_digest) e descartam os
+    mais antigos após `cache_size` textos, de modo que não crescem com os
+    textos concatenados de uma matriz de distâncias inteira.
     """
-    
-    def __init__(self, k_max=2):
+
+    def __init__(self, k_max=2, coder="huffman", cache_size=CACHE_SIZE):
         """Inicializa o compressor PPM."""
         self.k_max = k_max
-        
-        # Adiciona o diretório raiz ao PATH para importações
-        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-        
+        self.coder = coder
+        self.cache_size = cache_size
+
         # Importa diretamente os módulos necessários
-        from ppm.app import PPMApp
-        self.app_class = PPMApp
-    
+        from ppm.processors.ppm_processor import PPMProcessor
+        self.processor_class = PPMProcessor
+        self.filter_model = PPMProcessor(k_max).model  # Apenas para filter_text
+
+        self._filtered = OrderedDict()  # resumo do texto original -> resumo do texto filtrado
+        self._sizes = OrderedDict()  # resumo do texto filtrado -> (bytes comprimidos, bits por caractere)
+        self._executor = None
+        self._workers = None
+
+    def _remember(self, cache, key, value):
+        """Guarda um valor em uma memória LRU, descartando o mais antigo se passar de cache_size."""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _cached_size(self, digest):
+        """Tamanho memorizado do texto original com resumo `digest` (ou None)."""
+        filtered_digest = self._filtered.get(digest)
+        size = self._sizes.get(filtered_digest) if filtered_digest is not None else None
+        if size is not None:
+            self._filtered.move_to_end(digest)
+            self._sizes.move_to_end(filtered_digest)
+        return size
+
+    def filter_text(self, text):
+        """
+        Restringe o texto ao alfabeto do modelo: letras em minúsculas, espaços
+        como '_' e demais caracteres descartados. Aceita str ou bytes (UTF-8).
+        """
+        decoded = bytes(text).decode('utf-8') if isinstance(text, (bytes, bytearray)) else text
+        # Filtrar caracteres não reconhecidos - manter apenas letras minúsculas, espaços e pontuação básica
+        filtered_text = ''.join(c.lower() if c.isalpha() else '_' if c.isspace() else c
+                                for c in decoded if c.isalpha() or c.isspace() or c in '.,;:!?')
+        return self.filter_model.filter_text(filtered_text)
+
+    def compress_filtered(self, filtered_text):
+        """Comprime um texto já restrito ao alfabeto do modelo (ver filter_text)."""
+        processor = self.processor_class(self.k_max, coder=self.coder)
+        model = processor.model
+        model.keep_records = False  # Só interessam os bytes e o total de bits
+        process_character = model.process_character
+        for char in filtered_text:
+            process_character(char)
+        compressed = processor.finish()
+        return compressed, processor.bit_length() / max(len(filtered_text), 1)
+
     def compress(self, text):
         """
         Comprime o texto usando o algoritmo PPM.
-        
+
         Args:
-            text: Texto a ser comprimido
-            
+            text: Texto a ser comprimido (str ou bytes em UTF-8)
+
         Returns:
-            Tupla (texto_codificado, taxa_compressão)
+            Tupla (bytes_comprimidos, bits_por_caractere)
         """
         try:
-            # Filtrar caracteres não reconhecidos - manter apenas letras minúsculas, espaços e pontuação básica
-            filtered_text = ''.join(c.lower() if c.isalpha() else '_' if c.isspace() else c 
-                                  for c in text if c.isalpha() or c.isspace() or c in '.,;:!?')
-            
-            # Cria um arquivo temporário para o texto
-            with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False) as temp_file:
-                temp_file_name = temp_file.name
-                temp_file.write(filtered_text)
-            
-            # Configura e executa o PPM
-            app = self.app_class(k_max=self.k_max)
-            encoded_sequence = app.run(temp_file_name)
-            
-            # Calcula o comprimento médio da codificação
-            string_encoded = ''
-            for i in encoded_sequence:
-                string_encoded += i[3]
-            
-            compression_ratio = len(string_encoded) / len(filtered_text)
-            
-            # Limpa o arquivo temporário
-            if os.path.exists(temp_file_name):
-                os.remove(temp_file_name)
-            
-            # Retorna os dados codificados e a taxa de compressão
-            return string_encoded, compression_ratio
+            return self.compress_filtered(self.filter_text(text))
         except Exception as e:
             print(f"Erro ao comprimir com PPM: {e}")
             # Retornar uma sequência vazia e uma taxa de compressão de 1 (sem compressão)
-            return "", 1.0 
\ No newline at end of file
+            return b"", 1.0
+
+    def compressed_size(self, text):
+        """Tamanho comprimido em bytes e bits por caractere do texto (memorizado)."""
+        digest = text_digest(text)
+        size = self._cached_size(digest)
+        if size is None:
+            filtered_text = self.filter_text(text)
+            filtered_digest = text_digest(filtered_text)
+            size = self._sizes.get(filtered_digest)
+            if size is None:
+                compressed, bits = self.compress_filtered(filtered_text)
+                size = (len(compressed), bits)
+            self._remember(self._sizes, filtered_digest, size)
+            self._remember(self._filtered, digest, filtered_digest)
+        return size
+
+    def compress_many(self, texts, workers=None):
+        """
+        Tamanhos comprimidos de vários textos, em paralelo.
+
+        Os textos são filtrados uma única vez, repetições (inclusive de
+        chamadas anteriores ainda memorizadas) não são comprimidas de novo, e
+        os processos do pool são reutilizados entre chamadas até close().
+
+        Args:
+            texts: Lista de textos (str ou bytes em UTF-8)
+            workers: Número de processos (padrão: número de CPUs); 1 comprime
+                no próprio processo
+
+        Returns:
+            Lista de tuplas (tamanho_em_bytes, bits_por_caractere), na ordem de texts
+        """
+        digests = [text_digest(text) for text in texts]
+        sizes = {}  # resumo do texto original -> tamanho, nesta chamada
+        filtered_digests = {}  # resumo do texto original -> resumo do texto filtrado
+        filtered_sizes = {}  # resumo do texto filtrado -> tamanho, nesta chamada
+        pending = {}  # resumo do texto filtrado -> texto filtrado a comprimir
+        for text, digest in zip(texts, digests):
+            if digest in sizes or digest in filtered_digests:
+                continue
+            size = self._cached_size(digest)
+            if size is not None:
+                sizes[digest] = size
+                continue
+            filtered_text = self.filter_text(text)
+            filtered_digest = filtered_digests[digest] = text_digest(filtered_text)
+            size = self._sizes.get(filtered_digest)
+            if size is None:
+                pending[filtered_digest] = filtered_text
+            else:
+                filtered_sizes[filtered_digest] = size
+
+        if pending:
+            if workers == 1:
+                computed = [self.compress_filtered(text) for text in pending.values()]
+                computed = [(len(compressed), bits) for compressed, bits in computed]
+            else:
+                computed = self._get_executor(workers).map(_compress_size_worker, pending.values())
+            filtered_sizes.update(zip(pending, computed))
+
+        for digest, filtered_digest in filtered_digests.items():
+            size = sizes[digest] = filtered_sizes[filtered_digest]
+            self._remember(self._sizes, filtered_digest, size)
+            self._remember(self._filtered, digest, filtered_digest)
+        return [sizes[digest] for digest in digests]
+
+    def _get_executor(self, workers):
+        """Retorna o pool de processos, recriando-o só se o número de processos mudar."""
+        if self._executor is None or workers != self._workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                 initargs=(self.k_max, self.coder))
+            self._workers = workers
+        return self._executor
+
+    def clear_cache(self):
+        """Descarta os tamanhos memorizados."""
+        self._filtered.clear()
+        self._sizes.clear()
+
+    def close(self):
+        """Encerra o pool de processos de compress_many."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, text):
+        """Permite usar o compressor como as funções compress_* (retorna bytes e taxa)."""
+        return self.compress(text)
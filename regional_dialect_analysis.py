@@ -73,20 +73,28 @@ def compress_static(text):
         print(f"Erro ao aplicar modelo estático: {e}")
         return b"", 1.0
 
+# Função para obter o tamanho comprimido de um texto
+def compressed_size(text, compressor):
+    # Compressores com tamanhos memorizados (ex.: ppm_wrapper.PPMCompressor)
+    if hasattr(compressor, "compressed_size"):
+        return compressor.compressed_size(text)[0]
+    compressed, _ = compressor(text)
+    return len(compressed)
+
+# Função para concatenar dois textos para a NCD
+def concatenate_texts(x, y):
+    return x + "\n###DELIMITADOR###\n" + y  # Delimitador claro para o compressor
+
 # Função para calcular a distância de compressão normalizada (NCD) com ajustes
 def normalized_compression_distance(x, y, compressor):
     # Comprimir x
-    x_compressed, _ = compressor(x)
-    x_size = len(x_compressed)
+    x_size = compressed_size(x, compressor)
     
     # Comprimir y
-    y_compressed, _ = compressor(y)
-    y_size = len(y_compressed)
+    y_size = compressed_size(y, compressor)
     
     # Concatenar e comprimir com delimitador adequado
-    xy = x + "\n###DELIMITADOR###\n" + y  # Delimitador claro para o compressor
-    xy_compressed, _ = compressor(xy)
-    xy_size = len(xy_compressed)
+    xy_size = compressed_size(concatenate_texts(x, y), compressor)
     
     # Calcular NCD com correção
     ncd = (xy_size - min(x_size, y_size)) / max(x_size, y_size)
@@ -143,6 +151,11 @@ def process_region_files(region_path, compressor, sample_size=100000):
     
     return batches
 
+# Função para escolher os batches comparados entre duas regiões
+def sample_batches(region_batches, max_comparisons=10):
+    # Limitando o número de comparações para não demorar demais
+    return region_batches[:max_comparisons] if len(region_batches) > max_comparisons else region_batches
+
 # Função para calcular NCD entre regiões usando batches
 def calculate_batch_ncd(region1_batches, region2_batches, compressor_func):
     if not region1_batches or not region2_batches:
@@ -150,10 +163,8 @@ def calculate_batch_ncd(region1_batches, region2_batches, compressor_func):
     
     ncd_values = []
     
-    # Limitando o número de comparações para não demorar demais
-    max_comparisons = 10
-    r1_samples = region1_batches[:max_comparisons] if len(region1_batches) > max_comparisons else region1_batches
-    r2_samples = region2_batches[:max_comparisons] if len(region2_batches) > max_comparisons else region2_batches
+    r1_samples = sample_batches(region1_batches)
+    r2_samples = sample_batches(region2_batches)
     
     # Calcular NCD para cada par de batches
     for batch1 in r1_samples:
@@ -164,20 +175,43 @@ def calculate_batch_ncd(region1_batches, region2_batches, compressor_func):
     # Retornar a média dos valores de NCD
     return np.mean(ncd_values) if ncd_values else 1.0
 
+# Função para comprimir de uma vez todos os textos usados na matriz de distância
+def precompute_sizes(regions_data, compressor, workers=None):
+    # Para compressores com compress_many (ex.: ppm_wrapper.PPMCompressor), os
+    # tamanhos ficam memorizados no compressor e a NCD só consulta a memória
+    texts = []
+    for i in range(len(regions_data)):
+        for j in range(i + 1, len(regions_data)):
+            if not regions_data[i] or not regions_data[j]:
+                continue
+            for batch1 in sample_batches(regions_data[i]):
+                for batch2 in sample_batches(regions_data[j]):
+                    texts.extend((batch1, batch2, concatenate_texts(batch1, batch2)))
+    compressor.compress_many(texts, workers=workers)
+
 # Função para criar matriz de distância entre regiões usando batches
-def create_distance_matrix(regions_data, compressor_func, labels):
+def create_distance_matrix(regions_data, compressor_func, labels, workers=None):
     n = len(regions_data)
     distance_matrix = np.zeros((n, n))
     
-    for i in range(n):
-        for j in range(i, n):
-            if i == j:
-                distance_matrix[i, j] = 0
-            else:
-                # Calcular NCD entre batches de regiões
-                ncd = calculate_batch_ncd(regions_data[i], regions_data[j], compressor_func)
-                distance_matrix[i, j] = ncd
-                distance_matrix[j, i] = ncd  # Matriz simétrica
+    try:
+        # Compressores em lote comprimem todos os textos em paralelo antes da NCD
+        if hasattr(compressor_func, "compress_many"):
+            precompute_sizes(regions_data, compressor_func, workers)
+        
+        for i in range(n):
+            for j in range(i, n):
+                if i == j:
+                    distance_matrix[i, j] = 0
+                else:
+                    # Calcular NCD entre batches de regiões
+                    ncd = calculate_batch_ncd(regions_data[i], regions_data[j], compressor_func)
+                    distance_matrix[i, j] = ncd
+                    distance_matrix[j, i] = ncd  # Matriz simétrica
+    finally:
+        # Encerra o pool de processos de compress_many (recriado se o compressor for reutilizado)
+        if hasattr(compressor_func, "close"):
+            compressor_func.close()
     
     return distance_matrix
 
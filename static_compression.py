@@ -7,6 +7,8 @@ from collections import Counter
 import pandas as pd
 from pathlib import Path
 
+from entropy_analysis import text_entropy_spectrum
+
 # Constants for the analysis
 REGIONS = ["nordeste", "norte", "sul", "sudeste"]
 SPLIT_TYPES = ["train", "valid", "test"]
@@ -21,12 +23,10 @@ def load_text(filepath):
         return ""
 
 def calculate_entropy(text):
-    """Calculate Shannon entropy of a text."""
-    counter = Counter(text)
-    length = len(text)
-    probabilities = [count / length for count in counter.values()]
-    entropy = -sum(p * math.log2(p) for p in probabilities)
-    return entropy
+    """Calculate Shannon (order-0) entropy of a text."""
+    if not text:
+        return 0
+    return text_entropy_spectrum(text, 0)["block_entropy"].iloc[0]
 
 def static_compress(text, model_text):
     """
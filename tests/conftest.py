@@ -0,0 +1,18 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Garante que o pacote ppm possa ser importado a partir da raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("o", "a", "de", "que", "nao", "uma", "para", "com", "rato", "roeu", "roupa", "rei", "roma", "oxente",
+         "bah", "tche", "uai", "mano", "xique", "jeito", "quizomba", "vixe", "zabumba", "kiwi", "whisky")
+
+
+@pytest.fixture(scope="session")
+def sample_text():
+    """Texto pseudoaleatório no alfabeto do modelo (a-z e _), igual em toda execução."""
+    rng = random.Random(2024)
+    return "_".join(rng.choice(WORDS) for _ in range(900))
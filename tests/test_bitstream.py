@@ -0,0 +1,33 @@
+"""BitWriter e BitReader (ppm.utils.bitstream)."""
+import random
+
+import pytest
+
+from ppm.utils.bitstream import BitReader, BitWriter
+
+
+def test_round_trip_variable_lengths():
+    rng = random.Random(3)
+    codes = [(rng.getrandbits(length), length) for length in (rng.randint(0, 40) for _ in range(500))]
+    writer = BitWriter()
+    for code, length in codes:
+        writer.write(code, length)
+    data = writer.getvalue()
+    total = sum(length for _, length in codes)
+    assert writer.bit_length == total and len(data) == (total + 7) // 8
+    assert writer.padding_bits() == len(data) * 8 - total
+    reader = BitReader(data, total)
+    assert [reader.read(length) for _, length in codes] == [code for code, _ in codes]
+    assert reader.remaining() == 0
+
+
+def test_bit_order_and_padding():
+    writer = BitWriter()
+    writer.write(0b101, 3)
+    assert writer.getvalue() == bytes([0b10100000])
+    reader = BitReader(b"\xa0", 3)
+    assert reader.peek(8) == 0b10100000
+    assert reader.read(3) == 0b101
+    with pytest.raises(ValueError):
+        reader.skip(1)
+    assert BitReader(b"\xff").peek(12) == 0xff0
@@ -0,0 +1,85 @@
+"""Contêiner em blocos independentes (formato PPMB)."""
+import pytest
+
+from ppm.models.snapshot import save_snapshot
+from ppm.processors.ppm_blocks import BlockReader, decode_blocks, encode_blocks, read_block_table
+from ppm.processors.ppm_processor import PPMProcessor
+
+
+@pytest.fixture
+def primer(tmp_path, sample_text):
+    processor = PPMProcessor(3)
+    processor.train_text(sample_text[:1500])
+    filename = str(tmp_path / "primer.snap")
+    save_snapshot(processor.model, filename)
+    return filename
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_round_trip(sample_text, coder):
+    data = encode_blocks(sample_text, 3, coder, block_size=1000, workers=1)
+    header, entries = read_block_table(data)
+    assert (header.k_max, header.coder, header.block_size, header.primer_crc) == (3, coder, 1000, None)
+    assert [entry.n_chars for entry in entries] == [1000] * 4 + [len(sample_text) - 4000]
+    assert decode_blocks(data, workers=1) == sample_text
+
+
+def test_parallel_matches_serial(sample_text):
+    serial = encode_blocks(sample_text, 2, block_size=1500, workers=1)
+    assert encode_blocks(sample_text, 2, block_size=1500, workers=2) == serial
+    assert decode_blocks(serial, workers=2) == sample_text
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_primed_round_trip(sample_text, primer, coder):
+    text = sample_text[1500:]
+    data = encode_blocks(text, 3, coder, block_size=800, primer=primer, workers=1)
+    assert decode_blocks(data, primer=primer, workers=1) == text
+    assert len(data) < len(encode_blocks(text, 3, coder, block_size=800, workers=1))
+
+
+def test_primer_must_match(sample_text, primer, tmp_path):
+    data = encode_blocks(sample_text, 3, block_size=2000, primer=primer, workers=1)
+    with pytest.raises(ValueError):
+        decode_blocks(data, workers=1)
+    other = PPMProcessor(3)
+    other.train_text(sample_text[-500:])
+    save_snapshot(other.model, str(tmp_path / "outro.snap"))
+    with pytest.raises(ValueError):
+        decode_blocks(data, primer=str(tmp_path / "outro.snap"), workers=1)
+    with pytest.raises(ValueError):
+        decode_blocks(encode_blocks(sample_text, 3, block_size=2000, workers=1), primer=primer, workers=1)
+
+
+def test_rejects_damaged_containers(sample_text):
+    data = encode_blocks(sample_text, 2, block_size=2000, workers=1)
+    with pytest.raises(ValueError):
+        read_block_table(data[:-1])
+    with pytest.raises(ValueError):
+        read_block_table(b"PPMF" + data[4:])
+    with pytest.raises(ValueError):
+        read_block_table(data[:10])
+
+
+@pytest.mark.parametrize("use_primer", [False, True])
+def test_random_access_reads(tmp_path, sample_text, primer, use_primer):
+    primer = primer if use_primer else None
+    filename = tmp_path / "texto.ppmb"
+    filename.write_bytes(encode_blocks(sample_text, 3, "range", block_size=700, primer=primer, workers=1))
+    reads = [(0, 10), (695, 10), (1400, 0), (650, 1500), (len(sample_text) - 5, 50), (len(sample_text), 3)]
+    with BlockReader.open(str(filename), primer=primer, cache_size=2) as reader:
+        assert len(reader) == len(sample_text)
+        for offset, length in reads + reads[::-1]:
+            assert reader.read(offset, length) == sample_text[offset:offset + length]
+        assert len(reader.cache) <= 2
+        assert reader.read(0, len(sample_text)) == sample_text
+        with pytest.raises(ValueError):
+            reader.read(-1, 5)
+
+
+def test_reader_checks_primer(sample_text, primer):
+    data = encode_blocks(sample_text, 3, block_size=2000, primer=primer, workers=1)
+    with pytest.raises(ValueError):
+        BlockReader(data)
+    with BlockReader(data, primer=primer) as reader:
+        assert reader.read(1990, 20) == sample_text[1990:2010]
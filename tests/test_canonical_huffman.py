@@ -0,0 +1,59 @@
+"""Códigos de Huffman canônicos (ppm.utils.canonical_huffman)."""
+import random
+
+import pytest
+
+from ppm.utils.bitstream import BitReader, BitWriter
+from ppm.utils.canonical_huffman import TABLE_BITS, CanonicalCodebook, huffman_code_lengths
+from ppm.utils.encoder import huffman_encoding
+
+SYMBOLS = "çzyxwvutsrqponmlkjihgfedcba_"
+
+
+def random_frequencies(rng):
+    symbols = rng.sample(SYMBOLS, rng.randint(2, len(SYMBOLS)))
+    return {char: rng.choice((1, 1, 2, 3, 5, 8, 40, 100)) for char in symbols}
+
+
+def test_lengths_match_original_tree():
+    rng = random.Random(7)
+    for _ in range(200):
+        frequencies = random_frequencies(rng)
+        original = {char: len(code) for char, code in huffman_encoding(frequencies).items()}
+        assert huffman_code_lengths(frequencies) == original
+
+
+def test_codes_are_prefix_free_and_complete():
+    rng = random.Random(11)
+    for _ in range(50):
+        codebook = CanonicalCodebook.from_frequencies(random_frequencies(rng))
+        codes = [codebook.code_string(char) for char in codebook.lengths]
+        assert sum(2 ** -len(code) for code in codes) == 1
+        assert not any(a != b and b.startswith(a) for a in codes for b in codes)
+
+
+@pytest.mark.parametrize("reuse", [False, True])
+def test_decode_round_trip_with_long_codes(reuse):
+    # Frequências de Fibonacci geram códigos maiores que a tabela de decodificação
+    frequencies = {}
+    a, b = 1, 1
+    for char in SYMBOLS[:20]:
+        frequencies[char] = a
+        a, b = b, a + b
+    codebook = CanonicalCodebook.from_frequencies(frequencies)
+    assert codebook.max_length > TABLE_BITS
+    if reuse:
+        codebook.build_table()
+    message = [char for char in frequencies for _ in range(3)] + list("hijklmnopq")
+    writer = BitWriter()
+    for char in message:
+        writer.write(*codebook.codes[char])
+    reader = BitReader(writer.getvalue(), writer.bit_length)
+    assert [codebook.decode(reader) for _ in message] == message
+    assert reader.remaining() == 0
+
+
+def test_equiprovable():
+    codebook = CanonicalCodebook.equiprovable("abcde")
+    assert set(codebook.lengths.values()) == {3}
+    assert CanonicalCodebook.equiprovable("a").lengths == {"a": 0}
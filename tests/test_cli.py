@@ -0,0 +1,67 @@
+"""Testes de fumaça da linha de comando (python -m ppm), nos exemplos documentados."""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEXT = "o_rato_roeu_a_roupa_do_rei_de_roma_" * 40
+
+
+def run_ppm(*args, cwd, stdin=b""):
+    return subprocess.run([sys.executable, "-m", "ppm", *args], cwd=cwd, input=stdin, capture_output=True,
+                          env={**os.environ, "PYTHONPATH": ROOT})
+
+
+def test_bench_documented_command(tmp_path):
+    (tmp_path / "texto.txt").write_text(TEXT, encoding="utf-8")
+    result = run_ppm("bench", "-k", "2", "--block-size", "512,1024", "--workers", "1", "texto.txt", cwd=tmp_path)
+    assert result.returncode == 0, result.stderr.decode()
+    lines = result.stdout.decode().splitlines()
+    assert lines[0].split("\t")[:2] == ["file", "block_size"]
+    assert [line.split("\t")[1] for line in lines[1:]] == ["512", "1024"]
+    assert all(line.endswith("True") for line in lines[1:])
+
+
+def test_bench_rejects_invalid_block_sizes(tmp_path):
+    result = run_ppm("bench", "--block-size", "512,x", "texto.txt", cwd=tmp_path)
+    assert result.returncode == 2
+
+
+def test_stdin_round_trip(tmp_path):
+    compressed = run_ppm("compress", "-k", "3", cwd=tmp_path, stdin=TEXT.encode())
+    assert compressed.returncode == 0, compressed.stderr.decode()
+    restored = run_ppm("decompress", cwd=tmp_path, stdin=compressed.stdout)
+    assert restored.returncode == 0, restored.stderr.decode()
+    assert restored.stdout.decode() == TEXT
+
+
+def test_files_round_trip(tmp_path):
+    (tmp_path / "texto.txt").write_text(TEXT, encoding="utf-8")
+    compressed = run_ppm("compress", "--coder", "range", "--workers", "1", "-o", "out", "texto.txt", cwd=tmp_path)
+    assert compressed.returncode == 0, compressed.stderr.decode()
+    restored = run_ppm("decompress", "--workers", "1", "-o", "back", "out/texto.txt.ppm", cwd=tmp_path)
+    assert restored.returncode == 0, restored.stderr.decode()
+    assert (tmp_path / "back" / "texto.txt").read_text(encoding="utf-8") == TEXT
+
+
+def test_compress_rejects_characters_outside_alphabet(tmp_path):
+    (tmp_path / "texto.txt").write_text(TEXT + "2024", encoding="utf-8")
+    for args, stdin in ((("texto.txt",), b""), ((), (TEXT + "2024").encode())):
+        result = run_ppm("compress", *args, cwd=tmp_path, stdin=stdin)
+        assert result.returncode == 1
+        assert "4 caracteres fora do alfabeto" in result.stderr.decode()
+        assert len(result.stderr.decode().strip().splitlines()) == 1
+
+
+def test_compress_drop_unknown_reports_dropped_characters(tmp_path):
+    compressed = run_ppm("compress", "--drop-unknown", cwd=tmp_path, stdin=(TEXT + "2024").encode())
+    assert compressed.returncode == 0, compressed.stderr.decode()
+    assert "4 caracteres fora do alfabeto descartados" in compressed.stderr.decode()
+    restored = run_ppm("decompress", cwd=tmp_path, stdin=compressed.stdout)
+    assert restored.stdout.decode() == TEXT
+
+
+def test_decompress_invalid_file_fails_in_one_line(tmp_path):
+    result = run_ppm("decompress", cwd=tmp_path, stdin=b"not a ppm file at all, just bytes")
+    assert result.returncode == 1
+    assert result.stderr.decode().startswith("ppm decompress: ")
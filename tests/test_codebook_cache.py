@@ -0,0 +1,43 @@
+"""Cache de códigos do codificador de Huffman (ppm.utils.codebook_cache)."""
+import pytest
+
+from ppm.coders.huffman_coder import HuffmanCoder
+from ppm.models.context import Context
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.utils.codebook_cache import CodebookCache
+
+
+def test_lru_and_shared_keys():
+    cache = CodebookCache(max_size=3)
+    builds = []
+
+    def build(value):
+        return lambda: builds.append(value) or value
+
+    assert cache.get_or_build("a", build(1), lambda: "content") == 1
+    # Outra chave com o mesmo conteúdo reaproveita o dicionário sem construir
+    assert cache.get_or_build("b", build(2), lambda: "content") == 1
+    assert builds == [1]
+    cache.get_or_build("c", build(3))
+    cache.get_or_build("d", build(4))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+    assert cache.get("content") is None and len(cache.entries) == 3
+    cache.clear()
+    assert not cache.entries
+    CodebookCache(max_size=0).put("a", 1)
+
+
+@pytest.mark.parametrize("options", [{}, {"max_contexts": 150, "eviction": "lru"},
+                                     {"max_contexts": 150, "eviction": "restart"}])
+def test_cache_does_not_change_output(sample_text, options):
+    outputs = []
+    for cache_size in (0, 64, 4096):
+        processor = PPMProcessor(4, coder=HuffmanCoder(cache_size), **options)
+        processor.process_text(sample_text)
+        outputs.append(processor.finish())
+        keys = processor.model.coder.cache.entries
+        assert not any(isinstance(part, Context) for key in keys for part in key)
+    assert outputs[0] == outputs[1] == outputs[2]
+    decoder = PPMDecoder(4, coder=HuffmanCoder(64), **options)
+    assert decoder.decode_sequence(outputs[2], len(sample_text)) == sample_text
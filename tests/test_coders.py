@@ -0,0 +1,41 @@
+"""Codificação e decodificação com cada codificador de entropia."""
+import pytest
+
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_processor import PPMProcessor
+
+
+def round_trip(text, k_max, coder, **options):
+    processor = PPMProcessor(k_max, coder=coder, **options)
+    processor.process_text(text)
+    data = processor.finish()
+    decoded = PPMDecoder(k_max, coder=coder, **options).decode_sequence(data, len(text))
+    return data, decoded
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+@pytest.mark.parametrize("k_max", [0, 1, 3, 5])
+def test_round_trip(sample_text, coder, k_max):
+    data, decoded = round_trip(sample_text, k_max, coder)
+    assert decoded == sample_text
+    assert len(data) * 8 < len(sample_text) * 4.75  # Menos que log2(27) bits por caractere
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+@pytest.mark.parametrize("text", ["", "a", "aaaaaaaa", "zq_x"])
+def test_round_trip_short_texts(coder, text):
+    assert round_trip(text, 2, coder)[1] == text
+
+
+def test_range_coder_beats_huffman(sample_text):
+    huffman, _ = round_trip(sample_text, 3, "huffman")
+    range_coded, _ = round_trip(sample_text, 3, "range")
+    assert len(range_coded) < len(huffman)
+
+
+def test_rejects_characters_outside_alphabet():
+    processor = PPMProcessor(2)
+    with pytest.raises(ValueError):
+        processor.process_text("abc1")
+    with pytest.raises(ValueError):
+        processor.process_text(processor.model.esc_symbol)
@@ -0,0 +1,27 @@
+"""Contagens, máscaras e total sob exclusão de Context."""
+from ppm.models.context import Context, iter_symbols
+
+SYMBOLS = ("c", "b", "a")
+
+
+def test_counts_mask_and_masked_total():
+    context = Context(SYMBOLS)
+    for symbol, amount in ((0, 3), (1, 5), (2, 1)):
+        context.add_symbol(symbol, amount)
+    assert context.total == 9 and context.mask == 0b111
+    assert context.masked_total(0b111) == 9
+    assert context.masked_total(0b101) == 4
+    assert context.masked_total(0b1000) == 0
+    context.remove_symbol(1)
+    assert context.total == 4 and list(iter_symbols(context.mask)) == [0, 2]
+    assert context.char_counts == {"c": 3, "a": 1}
+
+
+def test_halve_keeps_every_symbol():
+    context = Context(SYMBOLS)
+    context.add_symbol(0, 7)
+    context.add_symbol(2, 1)
+    version = context.version
+    context.halve()
+    assert list(context.counts) == [4, 0, 1] and context.total == 5
+    assert context.version > version
@@ -0,0 +1,27 @@
+"""Funções de Huffman originais (ppm.utils.encoder) sobre a estrutura de chaves inteiras do modelo."""
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.utils.encoder import codificar_ppm, decodificar_ppm, structure_context
+
+
+def trained_model():
+    processor = PPMProcessor(2)
+    processor.process_text("abracadabra_abracadabra")
+    return processor.model
+
+
+def test_structure_context_accepts_string_and_integer_keys():
+    model = trained_model()
+    context = model.get_context(2, "ab")
+    assert structure_context(model.structure, 2, "ab") is context
+    assert structure_context(model.structure, 2, model.context_key("ab")) is context
+    assert structure_context(model.structure, 0, "ab") is model.get_context(0, "")
+
+
+def test_codificar_and_decodificar_round_trip():
+    model = trained_model()
+    for k, context in ((2, "ab"), (1, "a"), (0, "")):
+        for char in dict(structure_context(model.structure, k, context).char_counts):
+            code = codificar_ppm(model.structure, k, context, char, set())
+            if code is None:
+                continue
+            assert decodificar_ppm(model.structure, k, context, code, set())[1] == char
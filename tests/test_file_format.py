@@ -0,0 +1,74 @@
+"""Arquivo comprimido autodescritivo (formato PPMF) e seus erros."""
+import io
+
+import pytest
+
+from ppm.processors.ppm_file import (compress_files, compress_text, compress_to_file, decompress_files,
+                                     decompress_from_file, decompress_payload)
+from ppm.utils.file_format import (CompressedHeader, load_compressed, pack_header, read_header,
+                                   save_compressed, write_compressed)
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+@pytest.mark.parametrize("k_max", [1, 4])
+def test_file_round_trip(tmp_path, sample_text, coder, k_max):
+    source = tmp_path / "texto.txt"
+    source.write_text(sample_text, encoding="utf-8")
+    assert compress_to_file(str(source), str(tmp_path / "texto.ppm"), k_max, coder) == (len(sample_text), 0)
+    header, _ = load_compressed(str(tmp_path / "texto.ppm"))
+    assert (header.k_max, header.coder, header.n_chars, header.stream) == (k_max, coder, len(sample_text), False)
+    assert decompress_from_file(str(tmp_path / "texto.ppm"), str(tmp_path / "saida.txt")) == sample_text
+    assert (tmp_path / "saida.txt").read_text(encoding="utf-8") == sample_text
+
+
+def test_header_round_trip():
+    header = CompressedHeader(3, "range", "abc_", "ç", 10, 5, 7, 1234)
+    assert read_header(io.BytesIO(pack_header(header))) == header
+    with pytest.raises(ValueError):
+        pack_header(header._replace(coder="lzma"))
+    with pytest.raises(ValueError):
+        pack_header(header._replace(padding_bits=8))
+
+
+def test_rejects_damaged_files(tmp_path, sample_text):
+    header, payload = compress_text(sample_text[:2000], 2)
+    buffer = io.BytesIO()
+    write_compressed(buffer, header, payload)
+    data = buffer.getvalue()
+    for damaged in (data[:-1], data + b"\0", b"PPMX" + data[4:], data[:8]):
+        with pytest.raises(ValueError):
+            load_compressed(io.BytesIO(damaged))
+    with pytest.raises(ValueError):
+        decompress_payload(header._replace(crc=header.crc ^ 1), payload)
+    with pytest.raises(ValueError):
+        decompress_payload(header._replace(alphabet=header.alphabet[:-1]), payload)
+    with pytest.raises(ValueError):
+        save_compressed(str(tmp_path / "x.ppm"), header._replace(payload_size=1), payload)
+
+
+def test_rejects_characters_outside_alphabet(tmp_path, sample_text):
+    source = tmp_path / "texto.txt"
+    source.write_text("ano_2024_" + sample_text[:300], encoding="utf-8")
+    with pytest.raises(ValueError, match="4 caracteres"):
+        compress_to_file(str(source), str(tmp_path / "texto.ppm"))
+    n_chars, dropped = compress_to_file(str(source), str(tmp_path / "texto.ppm"), drop_unknown=True)
+    assert (n_chars, dropped) == (305, 4)
+    assert decompress_from_file(str(tmp_path / "texto.ppm")) == "ano__" + sample_text[:300]
+
+
+def test_batches(tmp_path, sample_text):
+    sources = []
+    for index in range(3):
+        source = tmp_path / "entrada" / f"lote_{index}.txt"
+        source.parent.mkdir(exist_ok=True)
+        source.write_text(sample_text[index * 1000:(index + 2) * 1000], encoding="utf-8")
+        sources.append(str(source))
+    results = compress_files(sources, str(tmp_path / "comprimidos"), k_max=2, workers=1)
+    assert [dropped for _, dropped in results] == [0, 0, 0]
+    outputs = decompress_files([output for output, _ in results], str(tmp_path / "saida"), workers=1)
+    for source, output in zip(sources, outputs):
+        assert open(output, encoding="utf-8").read() == open(source, encoding="utf-8").read()
+    # Sem a extensão .ppm, a saída sobrescreveria a própria entrada
+    (tmp_path / "comprimidos" / "lote_0.txt.ppm").rename(tmp_path / "comprimidos" / "lote")
+    with pytest.raises(ValueError):
+        decompress_files([str(tmp_path / "comprimidos" / "lote")], workers=1)
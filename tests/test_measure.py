@@ -0,0 +1,31 @@
+"""Modo de medição e varredura de ordens (PPMProcessor.measure_text / measure_orders)."""
+import pytest
+
+from ppm.processors.ppm_processor import PPMProcessor
+
+TEXT = "o_rato_roeu_a_roupa_do_rei_de_roma_e_a_rainha_com_raiva_resolveu_remendar_" * 8
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_order_sweep_matches_separate_runs(coder):
+    sweep = PPMProcessor(4, coder=coder).measure_orders(TEXT)
+    for k, result in enumerate(sweep):
+        separate = PPMProcessor(k, coder=coder).measure_text(TEXT)
+        assert result["k"] == k
+        assert result["mean_code_length"] == pytest.approx(separate["mean_code_length"], abs=1e-9)
+        assert result["entropy"] == pytest.approx(separate["entropy"], abs=1e-9)
+
+
+def test_measure_matches_encoding():
+    processor = PPMProcessor(3)
+    processor.process_text(TEXT)
+    processor.finish()
+    measurement = PPMProcessor(3).measure_text(TEXT)
+    assert measurement["code_bits"] == processor.bit_length()
+
+
+def test_entropy_only_measurement():
+    full = PPMProcessor(3).measure_text(TEXT, per_order=True)
+    entropy_only = PPMProcessor(3).measure_text(TEXT, per_order=True, code_lengths=False)
+    assert entropy_only["entropy"] == full["entropy"]
+    assert "mean_code_length" not in entropy_only and "code_bits" not in entropy_only["per_order"][0]
@@ -0,0 +1,45 @@
+"""Orçamento de memória do modelo: descarte de contextos, reinício e divisão de contagens."""
+import pytest
+
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_processor import PPMProcessor
+
+OPTIONS = [
+    {"max_contexts": 300, "eviction": "lru"},
+    {"max_contexts": 300, "eviction": "least_count"},
+    {"max_contexts": 300, "eviction": "restart"},
+    {"max_count": 30},
+    {"max_contexts": 200, "eviction": "lru", "max_count": 15},
+]
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+@pytest.mark.parametrize("options", OPTIONS, ids=lambda options: "-".join(f"{k}={v}" for k, v in options.items()))
+def test_round_trip_with_memory_budget(sample_text, coder, options):
+    processor = PPMProcessor(4, coder=coder, **options)
+    processor.process_text(sample_text)
+    data = processor.finish()
+    assert PPMDecoder(4, coder=coder, **options).decode_sequence(data, len(sample_text)) == sample_text
+
+    stats = processor.model.get_memory_stats()
+    if "max_contexts" in options:
+        assert stats["contexts"] <= options["max_contexts"]
+        assert stats["evictions"] + stats["restarts"] > 0
+    if "max_count" in options:
+        assert stats["halvings"] > 0
+        # A divisão arredonda para cima (nenhum símbolo some): no máximo um a mais por símbolo
+        assert all(context.total <= options["max_count"] + bin(context.mask).count("1")
+                   for contexts in processor.model.structure.values() for context in contexts.values())
+
+
+def test_unbounded_model_keeps_every_context(sample_text):
+    processor = PPMProcessor(4)
+    processor.process_text(sample_text)
+    stats = processor.model.get_memory_stats()
+    assert stats["evictions"] == stats["restarts"] == stats["halvings"] == 0
+    assert stats["contexts"] > 300
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        PPMProcessor(2, max_contexts=10, eviction="fifo")
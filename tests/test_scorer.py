@@ -0,0 +1,60 @@
+"""Avaliação com modelos congelados (PPMScorer e MultiPPMScorer)."""
+import math
+
+import numpy as np
+import pytest
+
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.processors.ppm_scorer import MultiPPMScorer, PPMScorer
+
+TRAIN = ["o_rato_roeu_a_roupa_do_rei_de_roma_" * 6, "a_aranha_arranha_a_ra_a_ra_arranha_a_aranha_" * 6,
+         "tres_pratos_de_trigo_para_tres_tigres_tristes_" * 6]
+TEST = "o_rei_de_roma_arranha_tres_tigres_e_a_rainha_ri_"
+
+
+def trained_model(text, k_max=3):
+    processor = PPMProcessor(k_max)
+    processor.train_text(text)
+    return processor.model
+
+
+def reference_bits(model, text):
+    """-log2 p de cada caractere percorrendo a trie, sem atualizar o modelo."""
+    total = 0.0
+    for position, char in enumerate(text):
+        symbol = model.symbol_ids[char]
+        exclusion = 0
+        for k in range(min(position, model.k_max), -1, -1):
+            context = model.get_context(k, text[position - k:position])
+            if context is None or not context.mask:
+                continue
+            candidates = context.mask & ~exclusion
+            coded = symbol if context.mask >> symbol & 1 else model.esc_id
+            if bin(candidates).count("1") > 1:
+                total += math.log2(context.masked_total(candidates) / context.counts[coded])
+            if coded == symbol:
+                break
+            exclusion |= context.mask & ~model.esc_mask
+        else:
+            remaining = len(model.alphabet) - bin(exclusion & model.alphabet_mask).count("1")
+            total += math.log2(max(remaining, 1))
+    return total
+
+
+def test_scorer_matches_reference():
+    model = trained_model(TRAIN[0])
+    assert PPMScorer(model).score(TEST) == pytest.approx(reference_bits(model, TEST), rel=1e-6)
+
+
+def test_multi_scorer_matches_single_scorers():
+    models = [trained_model(text) for text in TRAIN]
+    scorer = MultiPPMScorer(models, names=["rato", "aranha", "tigres"])
+    expected = [PPMScorer(model).cross_entropy(TEST) for model in models]
+    assert np.allclose(scorer.cross_entropy(TEST), expected)
+    assert scorer.classify(TRAIN[2]) == "tigres"
+
+
+def test_scorer_ignores_characters_outside_alphabet():
+    model = trained_model(TRAIN[0])
+    scorer = PPMScorer(model)
+    assert scorer.score("o_rei_2024_" + model.esc_symbol) == pytest.approx(scorer.score("o_rei__"))
@@ -0,0 +1,80 @@
+"""Snapshot binário do modelo (ModelSnapshot, formato PPMS)."""
+import pickle
+
+import pytest
+
+from ppm.models.snapshot import ModelSnapshot, save_snapshot
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_processor import PPMProcessor
+
+
+def trained_model(text, k_max=3):
+    processor = PPMProcessor(k_max)
+    processor.train_text(text)
+    return processor.model
+
+
+def assert_same_counts(snapshot, model):
+    for k in range(-1, model.k_max + 1):
+        assert snapshot.n_contexts(k) == len(model.structure[k])
+        for key, context in model.structure[k].items():
+            index = snapshot.find(k, key)
+            assert index >= 0
+            assert list(snapshot.counts(k, index)) == list(context.counts)
+            assert snapshot.total(k, index) == context.total and snapshot.mask(k, index) == context.mask
+
+
+def test_save_and_load(tmp_path, sample_text):
+    model = trained_model(sample_text)
+    filename = str(tmp_path / "modelo.snap")
+    save_snapshot(model, filename)
+    snapshot = ModelSnapshot.load(filename)
+    try:
+        assert (snapshot.k_max, snapshot.symbols, snapshot.alphabet) == (model.k_max, model.symbols, model.alphabet)
+        assert_same_counts(snapshot, model)
+        assert snapshot.char_counts(2, "ra") == model.get_context(2, "ra").char_counts
+        assert snapshot.char_counts(3, "qqq") == {}
+    finally:
+        snapshot.close()
+
+
+def test_pickle_by_filename_and_by_bytes(tmp_path, sample_text):
+    model = trained_model(sample_text)
+    in_memory = ModelSnapshot.from_model(model)
+    on_disk = ModelSnapshot.from_model(model, str(tmp_path / "modelo.snap"))
+    for snapshot in (in_memory, on_disk):
+        assert_same_counts(pickle.loads(pickle.dumps(snapshot)), model)
+    on_disk.close()
+
+
+def test_rejects_other_files():
+    with pytest.raises(ValueError):
+        ModelSnapshot(b"PPMF" + bytes(64))
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_primed_round_trip(sample_text, coder):
+    half = len(sample_text) // 2
+    snapshot = ModelSnapshot.from_model(trained_model(sample_text[:half]))
+    text = sample_text[half:]
+    outputs = []
+    for prime in ("load_snapshot", "attach_primer"):
+        processor = PPMProcessor(3, coder=coder)
+        getattr(processor.model, prime)(snapshot)
+        processor.process_text(text)
+        outputs.append(processor.finish())
+    assert outputs[0] == outputs[1]
+
+    decoder = PPMDecoder(3, coder=coder)
+    decoder.model.load_snapshot(snapshot)
+    assert decoder.decode_sequence(outputs[0], len(text)) == text
+
+    cold = PPMProcessor(3, coder=coder)
+    cold.process_text(text)
+    assert len(outputs[0]) < len(cold.finish())
+
+
+def test_incompatible_snapshot(sample_text):
+    snapshot = ModelSnapshot.from_model(trained_model(sample_text, k_max=2))
+    with pytest.raises(ValueError):
+        PPMProcessor(3).model.load_snapshot(snapshot)
@@ -0,0 +1,80 @@
+"""Codificação em quadros (encode_stream / decode_stream) e fluxos com cabeçalho."""
+import io
+
+import pytest
+
+from ppm.app import PPMApp
+from ppm.processors.ppm_decoder import PPMDecoder
+from ppm.processors.ppm_file import compress_stream, compress_text, decompress_stream
+from ppm.processors.ppm_processor import PPMProcessor
+from ppm.utils.file_format import MAGIC, STREAM_MAGIC, read_header, write_compressed
+from ppm.utils.frames import FRAME_HEADER, read_frames
+
+
+def split(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_frames_round_trip(sample_text, coder):
+    chunks = split(sample_text, 700)
+    frames = list(PPMProcessor(3, coder=coder).encode_stream(chunks))
+    assert [FRAME_HEADER.unpack_from(frame)[0] for frame in frames] == [len(chunk) for chunk in chunks]
+    # Os quadros podem chegar divididos em qualquer ponto
+    data = b"".join(frames)
+    decoded = list(PPMDecoder(3, coder=coder).decode_stream(split(data, 37)))
+    assert decoded == chunks
+
+
+def test_model_continues_across_frames(sample_text):
+    streamed = b"".join(PPMProcessor(3).encode_stream(split(sample_text, 500)))
+    separate = b"".join(b"".join(PPMProcessor(3).encode_stream([chunk])) for chunk in split(sample_text, 500))
+    assert len(streamed) < len(separate)
+
+
+def test_incomplete_frame():
+    data = b"".join(PPMProcessor(2).encode_stream(["abracadabra"]))
+    with pytest.raises(ValueError):
+        list(read_frames([data[:-1]]))
+
+
+def test_app_compress_file(tmp_path, sample_text):
+    source = tmp_path / "texto.txt"
+    source.write_text(sample_text, encoding="utf-8")
+    app = PPMApp(3, coder="range")
+    assert app.compress_file(str(source), str(tmp_path / "texto.bin"), chunk_size=1000) == len(sample_text)
+    assert PPMApp(3, coder="range").decompress_file(str(tmp_path / "texto.bin"),
+                                                    str(tmp_path / "saida.txt")) == len(sample_text)
+    assert (tmp_path / "saida.txt").read_text(encoding="utf-8") == sample_text
+
+
+@pytest.mark.parametrize("coder", ["huffman", "range"])
+def test_stream_round_trip(sample_text, coder):
+    compressed = io.BytesIO()
+    assert compress_stream(io.StringIO(sample_text), compressed, 3, coder, chunk_size=900) == (len(sample_text), 0)
+    data = compressed.getvalue()
+    assert data.startswith(STREAM_MAGIC)
+    header = read_header(io.BytesIO(data))
+    assert (header.stream, header.k_max, header.coder) == (True, 3, coder)
+    output = io.StringIO()
+    assert decompress_stream(io.BytesIO(data), output, chunk_size=100) == len(sample_text)
+    assert output.getvalue() == sample_text
+
+
+def test_decompress_stream_reads_plain_files(sample_text):
+    compressed = io.BytesIO()
+    write_compressed(compressed, *compress_text(sample_text, 2))
+    assert compressed.getvalue().startswith(MAGIC)
+    output = io.StringIO()
+    decompress_stream(io.BytesIO(compressed.getvalue()), output)
+    assert output.getvalue() == sample_text
+
+
+def test_stream_rejects_characters_outside_alphabet(sample_text):
+    with pytest.raises(ValueError):
+        compress_stream(io.StringIO(sample_text + "1"), io.BytesIO())
+    compressed = io.BytesIO()
+    assert compress_stream(io.StringIO("1" + sample_text), compressed, drop_unknown=True)[1] == 1
+    output = io.StringIO()
+    decompress_stream(io.BytesIO(compressed.getvalue()), output)
+    assert output.getvalue() == sample_text